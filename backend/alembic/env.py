@@ -21,6 +21,9 @@ from app.models.confirmation import Confirmation
 from app.models.dispute import Dispute
 from app.models.blockchain_log import BlockchainLog
 from app.models.payment_log import PaymentLog
+from app.models.user_daily_escrow_stats import UserDailyEscrowStats
+from app.models.webhook_event import InboundWebhookEvent
+from app.models.outbox_event import OutboxEvent
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
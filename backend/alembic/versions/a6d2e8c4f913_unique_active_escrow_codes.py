@@ -0,0 +1,57 @@
+"""unique_active_escrow_codes
+
+Revision ID: a6d2e8c4f913
+Revises: f3a9d1c07b28
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2e8c4f913'
+down_revision: Union[str, None] = 'f3a9d1c07b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Settled escrows, and expired ones that were never funded, give their codes back
+    op.execute(
+        "UPDATE escrows SET is_code_active = false "
+        "WHERE is_code_active AND (status NOT IN ('INITIATED', 'HELD', 'DISPUTED') "
+        "OR (status = 'INITIATED' AND expires_at < now()))"
+    )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_escrows_active_escrow_code',
+            'escrows',
+            ['escrow_code'],
+            unique=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('is_code_active'),
+        )
+        op.create_index(
+            'ix_escrows_active_code_expires_at',
+            'escrows',
+            ['expires_at'],
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('is_code_active'),
+        )
+        # Inactive codes may now repeat; keep a plain index for lookups
+        op.drop_index('ix_escrows_escrow_code', table_name='escrows', postgresql_concurrently=True)
+        op.create_index('ix_escrows_escrow_code', 'escrows', ['escrow_code'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    # Fails if a code has been reused since the upgrade
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_escrows_escrow_code', table_name='escrows', postgresql_concurrently=True)
+        op.create_index('ix_escrows_escrow_code', 'escrows', ['escrow_code'], unique=True, postgresql_concurrently=True)
+        op.drop_index('ix_escrows_active_code_expires_at', table_name='escrows', postgresql_concurrently=True)
+        op.drop_index('uq_escrows_active_escrow_code', table_name='escrows', postgresql_concurrently=True)
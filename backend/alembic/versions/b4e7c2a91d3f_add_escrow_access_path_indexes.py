@@ -0,0 +1,58 @@
+"""add_escrow_access_path_indexes
+
+Revision ID: b4e7c2a91d3f
+Revises: 217b9790c741
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e7c2a91d3f'
+down_revision: Union[str, None] = '217b9790c741'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_STATUSES = sa.text("status IN ('INITIATED', 'HELD', 'DISPUTED')")
+
+# (name, table, columns, partial where clause)
+INDEXES = [
+    ('ix_escrows_payer_id_created_at', 'escrows', ['payer_id', sa.text('created_at DESC')], None),
+    ('ix_escrows_payee_id_created_at', 'escrows', ['payee_id', sa.text('created_at DESC')], None),
+    ('ix_escrows_payee_vpa_created_at', 'escrows', ['payee_vpa', sa.text('created_at DESC')], None),
+    ('ix_escrows_payer_id_active', 'escrows', ['payer_id', 'status'], ACTIVE_STATUSES),
+    ('ix_escrows_payee_id_active', 'escrows', ['payee_id', 'status'], ACTIVE_STATUSES),
+    ('ix_escrows_razorpay_payment_id', 'escrows', ['razorpay_payment_id'], sa.text('razorpay_payment_id IS NOT NULL')),
+    ('ix_confirmations_escrow_id', 'confirmations', ['escrow_id'], None),
+    ('ix_payment_logs_escrow_id', 'payment_logs', ['escrow_id'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
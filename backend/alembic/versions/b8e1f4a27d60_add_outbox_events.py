@@ -0,0 +1,44 @@
+"""add_outbox_events
+
+Revision ID: b8e1f4a27d60
+Revises: a6d2e8c4f913
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1f4a27d60'
+down_revision: Union[str, None] = 'a6d2e8c4f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OPEN_EVENTS = sa.text("status IN ('pending', 'processing')")
+
+
+def upgrade() -> None:
+    op.create_table('outbox_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=False),
+    sa.Column('escrow_id', sa.UUID(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_open', 'outbox_events', ['available_at'],
+                    postgresql_where=OPEN_EVENTS)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_open', table_name='outbox_events')
+    op.drop_table('outbox_events')
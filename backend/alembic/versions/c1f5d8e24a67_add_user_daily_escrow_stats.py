@@ -0,0 +1,41 @@
+"""add_user_daily_escrow_stats
+
+Revision ID: c1f5d8e24a67
+Revises: b4e7c2a91d3f
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1f5d8e24a67'
+down_revision: Union[str, None] = 'b4e7c2a91d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_daily_escrow_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('volume', sa.BigInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('initiated_count', sa.Integer(), nullable=False),
+    sa.Column('held_count', sa.Integer(), nullable=False),
+    sa.Column('released_count', sa.Integer(), nullable=False),
+    sa.Column('refunded_count', sa.Integer(), nullable=False),
+    sa.Column('disputed_count', sa.Integer(), nullable=False),
+    sa.Column('expired_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    # Populate with: python backfill_escrow_stats.py
+
+
+def downgrade() -> None:
+    op.drop_table('user_daily_escrow_stats')
@@ -0,0 +1,26 @@
+"""add_escrow_version
+
+Revision ID: c4f7a9d2e815
+Revises: b8e1f4a27d60
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f7a9d2e815'
+down_revision: Union[str, None] = 'b8e1f4a27d60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('escrows', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('escrows', 'version')
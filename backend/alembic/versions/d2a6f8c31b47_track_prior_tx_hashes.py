@@ -0,0 +1,37 @@
+"""track_prior_tx_hashes
+
+Revision ID: d2a6f8c31b47
+Revises: c4f7a9d2e815
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f8c31b47'
+down_revision: Union[str, None] = 'c4f7a9d2e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blockchain_logs', sa.Column('prior_tx_hashes', postgresql.ARRAY(sa.String(length=66)), nullable=True))
+    op.execute(
+        "UPDATE blockchain_logs SET prior_tx_hashes = ARRAY[replaces_tx_hash] "
+        "WHERE replaces_tx_hash IS NOT NULL"
+    )
+    op.drop_column('blockchain_logs', 'replaces_tx_hash')
+
+
+def downgrade() -> None:
+    op.add_column('blockchain_logs', sa.Column('replaces_tx_hash', sa.String(length=66), nullable=True))
+    op.execute(
+        "UPDATE blockchain_logs SET replaces_tx_hash = prior_tx_hashes[array_upper(prior_tx_hashes, 1)] "
+        "WHERE prior_tx_hashes IS NOT NULL"
+    )
+    op.drop_column('blockchain_logs', 'prior_tx_hashes')
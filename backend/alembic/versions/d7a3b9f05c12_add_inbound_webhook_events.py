@@ -0,0 +1,50 @@
+"""add_inbound_webhook_events
+
+Revision ID: d7a3b9f05c12
+Revises: c1f5d8e24a67
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3b9f05c12'
+down_revision: Union[str, None] = 'c1f5d8e24a67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OPEN_EVENTS = sa.text("status IN ('pending', 'processing')")
+
+
+def upgrade() -> None:
+    op.create_table('inbound_webhook_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('provider', sa.String(length=20), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('ordering_key', sa.String(length=100), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('headers', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_inbound_webhook_events_open', 'inbound_webhook_events', ['received_at'],
+                    postgresql_where=OPEN_EVENTS)
+    op.create_index('ix_inbound_webhook_events_ordering_key', 'inbound_webhook_events', ['ordering_key', 'received_at'],
+                    postgresql_where=OPEN_EVENTS)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inbound_webhook_events_ordering_key', table_name='inbound_webhook_events')
+    op.drop_index('ix_inbound_webhook_events_open', table_name='inbound_webhook_events')
+    op.drop_table('inbound_webhook_events')
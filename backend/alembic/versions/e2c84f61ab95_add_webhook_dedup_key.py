@@ -0,0 +1,28 @@
+"""add_webhook_dedup_key
+
+Revision ID: e2c84f61ab95
+Revises: d7a3b9f05c12
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c84f61ab95'
+down_revision: Union[str, None] = 'd7a3b9f05c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('inbound_webhook_events', sa.Column('dedup_key', sa.String(length=128), nullable=True))
+    op.create_index('uq_inbound_webhook_events_dedup', 'inbound_webhook_events', ['provider', 'dedup_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_inbound_webhook_events_dedup', table_name='inbound_webhook_events')
+    op.drop_column('inbound_webhook_events', 'dedup_key')
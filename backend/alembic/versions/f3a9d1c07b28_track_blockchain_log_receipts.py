@@ -0,0 +1,47 @@
+"""track_blockchain_log_receipts
+
+Revision ID: f3a9d1c07b28
+Revises: e2c84f61ab95
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9d1c07b28'
+down_revision: Union[str, None] = 'e2c84f61ab95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blockchain_logs', sa.Column('status', sa.String(length=20), server_default='submitted', nullable=False))
+    op.add_column('blockchain_logs', sa.Column('nonce', sa.BigInteger(), nullable=True))
+    op.add_column('blockchain_logs', sa.Column('gas_limit', sa.BigInteger(), nullable=True))
+    op.add_column('blockchain_logs', sa.Column('gas_price', sa.BigInteger(), nullable=True))
+    op.add_column('blockchain_logs', sa.Column('call_data', sa.Text(), nullable=True))
+    op.add_column('blockchain_logs', sa.Column('attempts', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('blockchain_logs', sa.Column('replaces_tx_hash', sa.String(length=66), nullable=True))
+    op.add_column('blockchain_logs', sa.Column('submitted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('blockchain_logs', sa.Column('confirmed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_blockchain_logs_escrow_id', 'blockchain_logs', ['escrow_id'], unique=False)
+    op.create_index('ix_blockchain_logs_submitted', 'blockchain_logs', ['tx_hash'], unique=False,
+                    postgresql_where=sa.text("status = 'submitted'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blockchain_logs_submitted', table_name='blockchain_logs')
+    op.drop_index('ix_blockchain_logs_escrow_id', table_name='blockchain_logs')
+    op.drop_column('blockchain_logs', 'confirmed_at')
+    op.drop_column('blockchain_logs', 'submitted_at')
+    op.drop_column('blockchain_logs', 'replaces_tx_hash')
+    op.drop_column('blockchain_logs', 'attempts')
+    op.drop_column('blockchain_logs', 'call_data')
+    op.drop_column('blockchain_logs', 'gas_price')
+    op.drop_column('blockchain_logs', 'gas_limit')
+    op.drop_column('blockchain_logs', 'nonce')
+    op.drop_column('blockchain_logs', 'status')
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from app.core.database import get_db
 from app.core.security import get_current_user
@@ -9,14 +9,32 @@ from app.services.analytics_service import AnalyticsService
 
 router = APIRouter()
 
+DASHBOARD_SECTIONS = {"distribution", "history"}
+
 @router.get("/stats")
 async def get_dashboard_stats(
+    include: Optional[str] = Query(
+        None,
+        description="Comma-separated extra sections to embed: distribution, history"
+    ),
+    days: int = 30,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get high-level dashboard statistics"""
+    """Get high-level dashboard statistics, optionally with distribution and history"""
     service = AnalyticsService(db)
-    return await service.get_dashboard_stats(current_user.id)
+    
+    sections = {part.strip() for part in include.split(",") if part.strip()} if include else set()
+    unknown = sections - DASHBOARD_SECTIONS
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include section(s): {', '.join(sorted(unknown))}"
+        )
+    
+    if not sections:
+        return await service.get_dashboard_stats(current_user.id)
+    return await service.get_dashboard(current_user.id, sections, days)
 
 @router.get("/history")
 async def get_transaction_history(
@@ -4,7 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, get_password_hash
+from app.core.security import verify_password_async, create_access_token, get_password_hash_async
+from app.core.hashing import PasswordHasherBusy
 from app.core.config import settings
 from app.models.user import User
 from app.schemas.auth import Token, LoginRequest
@@ -35,6 +36,16 @@ async def register(
                 detail="UPI ID already registered"
             )
     
+    # Hash password on the worker pool
+    try:
+        hashed_password = await get_password_hash_async(user_data.password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy. Please try again.",
+            headers={"Retry-After": "1"}
+        )
+    
     # Create new user
     try:
         user = User(
@@ -42,7 +53,7 @@ async def register(
             email=user_data.email,
             vpa=user_data.vpa,
             phone=user_data.phone,
-            hashed_password=get_password_hash(user_data.password)
+            hashed_password=hashed_password
         )
         
         db.add(user)
@@ -89,7 +100,7 @@ async def login(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        if not verify_password(login_data.password, user.hashed_password):
+        if not await verify_password_async(login_data.password, user.hashed_password):
             print(f"Invalid password for user: {login_data.email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -114,6 +125,13 @@ async def login(
     
     except HTTPException:
         raise
+    except PasswordHasherBusy as e:
+        print(f"Login rejected, hashing pool saturated: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy. Please try again.",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         print(f"Login error: {str(e)}")
         raise HTTPException(
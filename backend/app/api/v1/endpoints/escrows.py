@@ -1,24 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
-from app.schemas.escrow import EscrowCreate, EscrowResponse, EscrowWithPaymentOrder, EscrowCodeJoin
-from app.services.escrow_service import EscrowService
+from app.schemas.escrow import EscrowCreate, EscrowResponse, EscrowSummary, EscrowWithPaymentOrder, EscrowCodeJoin
+from app.services.escrow_service import EscrowService, EscrowTransitionError
+from app.services.blockchain_service import BlockchainService
+from app.services.razorpay_service import RazorpayService
+from app.services.registry import get_blockchain_service, get_razorpay_service
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def get_escrow_service(
+    db: AsyncSession = Depends(get_db),
+    blockchain_service: BlockchainService = Depends(get_blockchain_service),
+    razorpay_service: RazorpayService = Depends(get_razorpay_service)
+) -> EscrowService:
+    """Build an EscrowService around the shared service clients"""
+    return EscrowService(db, blockchain_service, razorpay_service)
+
 @router.post("/create", response_model=EscrowWithPaymentOrder)
 async def create_escrow(
     escrow_data: EscrowCreate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    escrow_service: EscrowService = Depends(get_escrow_service)
 ):
     """Create a new escrow transaction with Razorpay payment order"""
-    escrow_service = EscrowService(db)
     escrow, payment_order = await escrow_service.create_escrow(current_user.id, escrow_data)
     
     return {
@@ -26,14 +39,63 @@ async def create_escrow(
         "payment_order": payment_order
     }
 
+async def _list_escrow_page(
+    escrow_service: EscrowService,
+    current_user: User,
+    response: Response,
+    limit: int,
+    cursor: Optional[str],
+    summary: bool
+):
+    """Fetch one keyset page and expose the next cursor in X-Next-Cursor"""
+    try:
+        escrows = await escrow_service.get_user_escrows(
+            current_user.id,
+            current_user.vpa,
+            limit=limit,
+            cursor=cursor,
+            summary=summary
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if len(escrows) == limit:
+        response.headers["X-Next-Cursor"] = escrow_service.encode_cursor(escrows[-1])
+    
+    return escrows
+
+@router.get("/", response_model=List[EscrowResponse])
+async def list_escrows(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    current_user: User = Depends(get_current_user),
+    escrow_service: EscrowService = Depends(get_escrow_service)
+):
+    """List user's escrows (as payer or payee), newest first, one page at a time"""
+    return await _list_escrow_page(escrow_service, current_user, response, limit, cursor, summary=False)
+
+@router.get("/summary", response_model=List[EscrowSummary])
+async def list_escrow_summaries(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    current_user: User = Depends(get_current_user),
+    escrow_service: EscrowService = Depends(get_escrow_service)
+):
+    """List user's escrows as compact summaries, paginated like GET /escrows/"""
+    return await _list_escrow_page(escrow_service, current_user, response, limit, cursor, summary=True)
+
 @router.get("/{escrow_id}", response_model=EscrowResponse)
 async def get_escrow(
     escrow_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    escrow_service: EscrowService = Depends(get_escrow_service)
 ):
     """Get escrow details"""
-    escrow_service = EscrowService(db)
     escrow = await escrow_service.get_escrow(escrow_id)
     
     if not escrow:
@@ -51,23 +113,14 @@ async def get_escrow(
     
     return escrow
 
-@router.get("/", response_model=List[EscrowResponse])
-async def list_escrows(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """List user's escrows (as payer or payee)"""
-    escrow_service = EscrowService(db)
-    return await escrow_service.get_user_escrows(current_user.id, current_user.vpa)
 
 @router.post("/join-by-code", response_model=EscrowResponse)
 async def join_escrow_by_code(
     join_data: EscrowCodeJoin,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    escrow_service: EscrowService = Depends(get_escrow_service)
 ):
     """Join an existing escrow using its 6-character code"""
-    escrow_service = EscrowService(db)
     
     try:
         escrow = await escrow_service.join_escrow_by_code(
@@ -86,32 +139,41 @@ async def join_escrow_by_code(
 async def confirm_escrow(
     escrow_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    escrow_service: EscrowService = Depends(get_escrow_service)
 ):
     """Confirm escrow completion"""
-    escrow_service = EscrowService(db)
-    return await escrow_service.confirm_escrow(escrow_id, current_user.id)
+    try:
+        return await escrow_service.confirm_escrow(escrow_id, current_user.id)
+    except EscrowTransitionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
 
 @router.post("/{escrow_id}/dispute")
 async def raise_dispute(
     escrow_id: UUID,
     reason: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    escrow_service: EscrowService = Depends(get_escrow_service)
 ):
     """Raise a dispute for escrow"""
-    escrow_service = EscrowService(db)
-    return await escrow_service.raise_dispute(escrow_id, current_user.id, reason)
+    try:
+        return await escrow_service.raise_dispute(escrow_id, current_user.id, reason)
+    except EscrowTransitionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
 
 
 @router.get("/{escrow_id}/payment-status")
 async def get_payment_status(
     escrow_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    escrow_service: EscrowService = Depends(get_escrow_service)
 ):
     """Get payment status for an escrow"""
-    escrow_service = EscrowService(db)
     escrow = await escrow_service.get_escrow(escrow_id)
     
     if not escrow:
@@ -149,15 +211,49 @@ async def get_payment_status(
     }
 
 
+@router.get("/{escrow_id}/proof")
+async def get_anchor_proof(
+    escrow_id: UUID,
+    current_user: User = Depends(get_current_user),
+    escrow_service: EscrowService = Depends(get_escrow_service)
+):
+    """
+    Get Merkle inclusion proofs for an escrow's on-chain anchored events
+    
+    Each proof verifies `leaf` (keccak256 of 0x00 followed by the canonical
+    event JSON) against the batch `root` anchored by `tx_hash`; each level
+    hashes 0x01 followed by the sorted pair, as the contract's
+    verifyInclusion does.
+    """
+    escrow = await escrow_service.get_escrow(escrow_id)
+    
+    if not escrow:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Escrow not found"
+        )
+    
+    # Check if user has access to this escrow
+    if escrow.payer_id != current_user.id and escrow.payee_vpa != current_user.vpa:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return {
+        "escrow_id": str(escrow_id),
+        "proofs": await escrow_service.get_anchor_proofs(escrow_id)
+    }
+
+
 @router.post("/{escrow_id}/cancel")
 async def cancel_escrow(
     escrow_id: UUID,
     reason: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    escrow_service: EscrowService = Depends(get_escrow_service)
 ):
     """Cancel escrow and initiate refund"""
-    escrow_service = EscrowService(db)
     escrow = await escrow_service.get_escrow(escrow_id)
     
     if not escrow:
@@ -182,27 +278,13 @@ async def cancel_escrow(
         )
     
     try:
-        # Process refund if payment was made
-        if escrow.razorpay_payment_id:
-            refund = await escrow_service.process_refund(
-                escrow_id=escrow_id,
-                reason=reason
-            )
-            return {
-                "message": "Escrow cancelled and refund initiated",
-                "escrow_id": str(escrow_id),
-                "refund_id": refund.get("id"),
-                "status": "refunded"
-            }
-        else:
-            # No payment made, just cancel
-            escrow.status = EscrowStatus.REFUNDED
-            await db.commit()
-            return {
-                "message": "Escrow cancelled (no payment to refund)",
-                "escrow_id": str(escrow_id),
-                "status": "cancelled"
-            }
+        return await escrow_service.cancel_escrow(escrow_id, reason)
+    except EscrowTransitionError as e:
+        # Another request settled the escrow since it was read
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.security import get_current_user
+from app.core.user_cache import user_cache
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
 
@@ -22,14 +23,23 @@ async def update_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Update current user information"""
+    # current_user may be a detached cache snapshot, so load the row to update
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
     if user_update.name is not None:
-        current_user.name = user_update.name
+        user.name = user_update.name
     if user_update.vpa is not None:
-        current_user.vpa = user_update.vpa
+        user.vpa = user_update.vpa
     if user_update.phone is not None:
-        current_user.phone = user_update.phone
+        user.phone = user_update.phone
     
     await db.commit()
-    await db.refresh(current_user)
+    await db.refresh(user)
+    await user_cache.invalidate(user.id)
     
-    return current_user
+    return user
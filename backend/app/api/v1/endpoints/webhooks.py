@@ -5,19 +5,64 @@ from app.core.database import get_db
 from app.models.escrow import Escrow
 from app.services.razorpay_service import RazorpayService
 from app.services.escrow_service import EscrowService
+from app.services.registry import get_razorpay_service
+from app.services.webhook_queue import enqueue_webhook, webhook_workers
+from app.models.webhook_event import InboundWebhookEvent
+from typing import Optional
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Razorpay events we process; anything else is acknowledged and dropped
+RAZORPAY_HANDLERS = {}
+
+async def _razorpay_ordering_key(db: AsyncSession, event: str, payload: dict) -> Optional[str]:
+    """
+    Key that serializes events for the same escrow
+    
+    Payment, payout and refund events of one escrow must share a key, so
+    every event resolves to the escrow id. Refunds created outside
+    TrustPay carry no escrow notes and are matched by their payment id;
+    the payment id itself is only the key when no escrow can be found.
+    """
+    if event.startswith("payment."):
+        entity = payload.get("payment", {}).get("entity", {})
+        return (entity.get("notes") or {}).get("escrow_id") or entity.get("id")
+    if event.startswith("payout."):
+        reference_id = payload.get("payout", {}).get("entity", {}).get("reference_id", "")
+        if reference_id.startswith("escrow_"):
+            return reference_id.replace("escrow_", "")
+        return None
+    if event.startswith("refund."):
+        entity = payload.get("refund", {}).get("entity", {})
+        escrow_id = (entity.get("notes") or {}).get("escrow_id")
+        if escrow_id:
+            return escrow_id
+        payment_id = entity.get("payment_id")
+        if not payment_id:
+            return None
+        escrow_id = await db.scalar(
+            select(Escrow.id).where(Escrow.razorpay_payment_id == payment_id)
+        )
+        return str(escrow_id) if escrow_id else payment_id
+    return None
+
 @router.post("/razorpay")
 async def razorpay_webhook(
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    razorpay_service: RazorpayService = Depends(get_razorpay_service)
 ):
     """
-    Handle Razorpay webhook events
+    Receive Razorpay webhook events
+    
+    Verified events are stored in inbound_webhook_events and acknowledged
+    immediately; the webhook worker pool processes them asynchronously.
+    Redeliveries (same X-Razorpay-Event-Id, or same payload when the header
+    is missing) are acknowledged without being stored again.
     
     Supported events:
     - payment.captured: Payment successful
@@ -33,7 +78,6 @@ async def razorpay_webhook(
     logger.info(f"Received webhook with signature: {signature[:20]}...")
     
     # Verify webhook signature
-    razorpay_service = RazorpayService()
     is_valid = await razorpay_service.verify_webhook_signature(body, signature)
     
     if not is_valid:
@@ -42,7 +86,7 @@ async def razorpay_webhook(
     
     # Parse webhook data
     try:
-        data = await request.json()
+        data = json.loads(body)
     except Exception as e:
         logger.error(f"Failed to parse webhook JSON: {e}")
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
@@ -50,32 +94,43 @@ async def razorpay_webhook(
     event = data.get("event")
     payload = data.get("payload", {})
     
-    logger.info(f"Processing webhook event: {event}")
+    if event not in RAZORPAY_HANDLERS:
+        logger.warning(f"Unhandled webhook event: {event}")
+        # Return 200 even for unhandled events to prevent retries
+        return {"status": "ok", "message": f"Event {event} not handled"}
     
     try:
-        # Route to appropriate handler
-        if event == "payment.captured":
-            await handle_payment_captured(payload, db)
-        elif event == "payment.failed":
-            await handle_payment_failed(payload, db)
-        elif event == "payout.processed":
-            await handle_payout_processed(payload, db)
-        elif event == "payout.failed":
-            await handle_payout_failed(payload, db)
-        elif event == "refund.processed":
-            await handle_refund_processed(payload, db)
-        else:
-            logger.warning(f"Unhandled webhook event: {event}")
-            # Return 200 even for unhandled events to prevent retries
-            return {"status": "ok", "message": f"Event {event} not handled"}
-    
+        queued = await enqueue_webhook(
+            db,
+            provider="razorpay",
+            event_type=event,
+            body=body,
+            headers=dict(request.headers),
+            ordering_key=await _razorpay_ordering_key(db, event, payload),
+            event_id=request.headers.get("X-Razorpay-Event-Id")
+        )
     except Exception as e:
-        logger.error(f"Error processing webhook {event}: {e}", exc_info=True)
+        logger.error(f"Failed to store webhook {event}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Webhook processing failed")
     
+    if not queued:
+        logger.info(f"Duplicate webhook delivery ignored: {event}")
+        return {"status": "ok", "event": event, "duplicate": True}
+    
+    logger.info(f"Queued webhook event: {event}")
     return {"status": "ok", "event": event}
 
 
+async def process_razorpay_event(stored_event: InboundWebhookEvent, db: AsyncSession):
+    """Run the handler for a stored Razorpay event (called by the worker pool)"""
+    data = json.loads(stored_event.body)
+    event = data.get("event")
+    payload = data.get("payload", {})
+    
+    logger.info(f"Processing webhook event: {event}")
+    await RAZORPAY_HANDLERS[event](payload, db)
+
+
 
 async def handle_payment_captured(payload: dict, db: AsyncSession):
     """Handle successful payment capture"""
@@ -283,8 +338,7 @@ async def handle_refund_processed(payload: dict, db: AsyncSession):
     
     # Update escrow
     from app.models.escrow import EscrowStatus
-    escrow.status = EscrowStatus.REFUNDED
-    escrow.razorpay_refund_id = refund_id
+    await EscrowService(db).update_status(escrow, EscrowStatus.REFUNDED, razorpay_refund_id=refund_id)
     
     # Create payment log
     from app.models.payment_log import PaymentLog
@@ -303,3 +357,14 @@ async def handle_refund_processed(payload: dict, db: AsyncSession):
     logger.info(f"Escrow {escrow.id} marked as REFUNDED")
     
     # TODO: Send notification to payer about successful refund
+
+
+RAZORPAY_HANDLERS.update({
+    "payment.captured": handle_payment_captured,
+    "payment.failed": handle_payment_failed,
+    "payout.processed": handle_payout_processed,
+    "payout.failed": handle_payout_failed,
+    "refund.processed": handle_refund_processed,
+})
+
+webhook_workers.register_handler("razorpay", process_razorpay_event)
@@ -1,6 +1,11 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
 from app.services.websocket_manager import manager
+from app.services.escrow_service import EscrowService
+from app.core.database import AsyncSessionLocal
 from app.core.security import get_current_user_ws
+from app.models.user import User
+from typing import Dict, List, Optional
+from uuid import UUID
 import logging
 import json
 
@@ -8,27 +13,93 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Upper bound on escrow ids accepted in one subscribe_many message
+MAX_SUBSCRIBE_MANY = 500
+
+
+def _parse_escrow_ids(raw_ids) -> List[UUID]:
+    """Validate client-supplied escrow ids (raises ValueError)"""
+    if not isinstance(raw_ids, list):
+        raise ValueError("escrow_ids must be a list")
+    if len(raw_ids) > MAX_SUBSCRIBE_MANY:
+        raise ValueError(f"At most {MAX_SUBSCRIBE_MANY} escrow_ids per message")
+    try:
+        return list({UUID(str(escrow_id)) for escrow_id in raw_ids})
+    except ValueError:
+        raise ValueError("Invalid escrow id")
+
+
+async def _party_escrow_ids(user: User, escrow_ids: List[UUID]) -> List[str]:
+    """Requested escrows the user is a party to (one query)"""
+    async with AsyncSessionLocal() as db:
+        allowed = await EscrowService(db).filter_party_escrow_ids(user.id, escrow_ids, user.vpa)
+    return [str(escrow_id) for escrow_id in allowed]
+
+
+async def _replay(connection, last_seqs: Dict[str, int]):
+    """Resend missed messages; ask the client to refetch streams that fell out of the buffer"""
+    if not last_seqs:
+        return
+    resync = await manager.replay(connection, last_seqs)
+    if resync:
+        connection.send({"type": "resync_required", "streams": resync})
+
+
+def _escrow_last_seqs(escrow_ids: List[str], raw_seqs) -> Dict[str, int]:
+    """Replay positions sent with a subscribe, for the escrows actually subscribed"""
+    if not isinstance(raw_seqs, dict):
+        return {}
+    return {
+        f"escrow:{escrow_id}": int(raw_seqs[escrow_id])
+        for escrow_id in escrow_ids
+        if raw_seqs.get(escrow_id) is not None
+    }
+
+
+async def _active_escrow_ids(user: User) -> List[str]:
+    """All of the user's active escrows (one indexed query)"""
+    async with AsyncSessionLocal() as db:
+        escrow_ids = await EscrowService(db).get_active_escrow_ids(user.id, user.vpa)
+    return [str(escrow_id) for escrow_id in escrow_ids]
+
 
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
-    token: str = Query(...)
+    token: str = Query(...),
+    auto_subscribe: bool = Query(False),
+    last_seq: Optional[int] = Query(None)
 ):
     """
     WebSocket endpoint for real-time escrow updates
     
     Client should connect with: ws://backend-url/api/v1/ws?token=<jwt_token>
+    Add &auto_subscribe=true to be subscribed to all of the user's active escrows.
+    
+    Subscriptions are only granted for escrows the user is a party to.
+    
+    Updates carry "stream" ("escrow:<id>" or "user:<id>") and a per-stream "seq".
+    On reconnect, pass the last seq seen on the user stream as &last_seq=<n>
+    and per escrow with the subscribe messages; only missed messages are
+    resent, ahead of any live message on that stream. Drop any message whose
+    seq is not above the last one handled on its stream (a replayed message
+    can also arrive live); a seq that skips ahead means messages were lost,
+    so refetch that stream.
     
     Message types from client:
-    - {"type": "subscribe", "escrow_id": "uuid"} - Subscribe to escrow updates
+    - {"type": "subscribe", "escrow_id": "uuid", "last_seq": n} - Subscribe to escrow updates (last_seq optional)
+    - {"type": "subscribe_many", "escrow_ids": ["uuid", ...], "last_seqs": {"uuid": n}} - Subscribe to several escrows at once
     - {"type": "unsubscribe", "escrow_id": "uuid"} - Unsubscribe from escrow
     - {"type": "ping"} - Keep connection alive
     
     Message types from server:
     - {"type": "connected", "user_id": "uuid"} - Connection established
+    - {"type": "subscribed", "escrow_id": "uuid"} - Subscription confirmed
+    - {"type": "subscribed_many", "escrow_ids": [...], "denied": [...]} - Bulk (or auto) subscription result
     - {"type": "escrow_update", "escrow_id": "uuid", "data": {...}} - Escrow updated
     - {"type": "payment_status", "escrow_id": "uuid", "status": "..."} - Payment status changed
     - {"type": "status_change", "escrow_id": "uuid", "old_status": "...", "new_status": "..."} - Escrow status changed
+    - {"type": "resync_required", "streams": [...]} - Missed messages no longer buffered; refetch these
     - {"type": "pong"} - Response to ping
     - {"type": "error", "message": "..."} - Error occurred
     """
@@ -42,17 +113,29 @@ async def websocket_endpoint(
         await websocket.close(code=1008, reason="Authentication failed")
         return
     
-    # Connect the user
-    await manager.connect(websocket, user_id)
+    # Connect the user (live user messages wait for the replay below)
+    user_seqs = {f"user:{user_id}": last_seq} if last_seq is not None else {}
+    connection = await manager.connect(websocket, user_id, hold=user_seqs)
     
     try:
         # Send connection confirmation
-        await websocket.send_json({
+        connection.send({
             "type": "connected",
             "user_id": user_id,
             "message": "WebSocket connection established"
         })
         
+        if auto_subscribe:
+            escrow_ids = await _active_escrow_ids(user)
+            manager.subscribe_many(user_id, escrow_ids)
+            connection.send({
+                "type": "subscribed_many",
+                "escrow_ids": escrow_ids,
+                "denied": []
+            })
+        
+        await _replay(connection, user_seqs)
+        
         # Listen for messages
         while True:
             data = await websocket.receive_text()
@@ -64,45 +147,69 @@ async def websocket_endpoint(
                 if message_type == "subscribe":
                     escrow_id = message.get("escrow_id")
                     if escrow_id:
-                        await manager.subscribe_to_escrow(user_id, escrow_id)
-                        await websocket.send_json({
-                            "type": "subscribed",
-                            "escrow_id": escrow_id
-                        })
+                        allowed = await _party_escrow_ids(user, _parse_escrow_ids([escrow_id]))
+                        if allowed:
+                            last_seqs = _escrow_last_seqs(allowed, {allowed[0]: message.get("last_seq")})
+                            connection.hold(last_seqs)
+                            await manager.subscribe_to_escrow(user_id, allowed[0])
+                            connection.send({
+                                "type": "subscribed",
+                                "escrow_id": allowed[0]
+                            })
+                            await _replay(connection, last_seqs)
+                        else:
+                            connection.send({
+                                "type": "error",
+                                "message": f"Not a party to escrow {escrow_id}"
+                            })
+                
+                elif message_type == "subscribe_many":
+                    requested = _parse_escrow_ids(message.get("escrow_ids", []))
+                    allowed = await _party_escrow_ids(user, requested)
+                    last_seqs = _escrow_last_seqs(allowed, message.get("last_seqs"))
+                    connection.hold(last_seqs)
+                    manager.subscribe_many(user_id, allowed)
+                    allowed_set = set(allowed)
+                    connection.send({
+                        "type": "subscribed_many",
+                        "escrow_ids": allowed,
+                        "denied": [str(e) for e in requested if str(e) not in allowed_set]
+                    })
+                    await _replay(connection, last_seqs)
                 
                 elif message_type == "unsubscribe":
                     escrow_id = message.get("escrow_id")
                     if escrow_id:
                         manager.unsubscribe_from_escrow(user_id, escrow_id)
-                        await websocket.send_json({
+                        connection.send({
                             "type": "unsubscribed",
                             "escrow_id": escrow_id
                         })
                 
                 elif message_type == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    connection.send({"type": "pong"})
                 
                 else:
-                    await websocket.send_json({
+                    connection.send({
                         "type": "error",
                         "message": f"Unknown message type: {message_type}"
                     })
             
             except json.JSONDecodeError:
-                await websocket.send_json({
+                connection.send({
                     "type": "error",
                     "message": "Invalid JSON format"
                 })
             except Exception as e:
                 logger.error(f"Error processing message: {e}")
-                await websocket.send_json({
+                connection.send({
                     "type": "error",
                     "message": str(e)
                 })
     
     except WebSocketDisconnect:
-        manager.disconnect(websocket, user_id)
+        manager.disconnect(connection, user_id)
         logger.info(f"User {user_id} disconnected")
     except Exception as e:
         logger.error(f"WebSocket error for user {user_id}: {e}")
-        manager.disconnect(websocket, user_id)
+        manager.disconnect(connection, user_id)
@@ -18,10 +18,27 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing pool (bcrypt runs off the event loop)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued + running jobs before rejecting
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0  # Seconds to wait for a free worker
+    
     # Blockchain
     POLYGON_RPC_URL: str = "https://polygon-rpc.com"
     PRIVATE_KEY: Optional[str] = None
     CONTRACT_ADDRESS: Optional[str] = None
+    BLOCKCHAIN_WORKER_CONCURRENCY: int = 16  # Anchoring transactions in flight at once
+    BLOCKCHAIN_NONCE_RESYNC_SECONDS: float = 60.0  # Re-read the pending nonce when idle this long
+    BLOCKCHAIN_ANCHOR_MODE: str = "per_event"  # "per_event" (one tx per transition) or "batch" (Merkle root)
+    BLOCKCHAIN_ANCHOR_WINDOW_SECONDS: float = 30.0  # Max time an event waits for its batch
+    BLOCKCHAIN_ANCHOR_BATCH_SIZE: int = 500  # Events per Merkle batch
+    BLOCKCHAIN_RECEIPT_POLL_SECONDS: float = 5.0
+    BLOCKCHAIN_RECEIPT_BATCH_SIZE: int = 100  # Transactions checked per JSON-RPC batch request
+    BLOCKCHAIN_CONFIRMATIONS: int = 3  # Blocks (including its own) before a tx is confirmed
+    BLOCKCHAIN_DROP_AFTER_SECONDS: float = 120.0  # Rebroadcast with a fee bump if still unmined
+    BLOCKCHAIN_MAX_REBROADCASTS: int = 5
+    BLOCKCHAIN_QUEUE_MAX_SIZE: int = 10000  # Queued chain operations before dropping
     
     # UPI Gateway (Setu) - PRIMARY PAYMENT PROVIDER
     SETU_CLIENT_ID: Optional[str] = None
@@ -31,11 +48,40 @@ class Settings(BaseSettings):
     SETU_MERCHANT_VPA: Optional[str] = None
     SETU_WEBHOOK_SECRET: Optional[str] = None
     SETU_SCHEME_ID: Optional[str] = None  # Setu scheme ID for UPI
+    SETU_TOKEN_REFRESH_MARGIN_SECONDS: float = 60.0  # Refresh the token this long before it expires
     
     # Razorpay Integration (LEGACY - Optional, for backward compatibility)
     RAZORPAY_KEY_ID: Optional[str] = None
     RAZORPAY_KEY_SECRET: Optional[str] = None
     RAZORPAY_WEBHOOK_SECRET: Optional[str] = None
+    RAZORPAY_BASE_URL: str = "https://api.razorpay.com/v1"
+    
+    # Outbound HTTP client pool (shared per process)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 30.0
+    HTTP2_ENABLED: bool = True  # Needs the h2 package (httpx[http2])
+    
+    # Inbound webhook queue
+    WEBHOOK_WORKER_CONCURRENCY: int = 4
+    WEBHOOK_MAX_ATTEMPTS: int = 5  # Dead-letter after this many failures
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 1.0
+    WEBHOOK_LEASE_SECONDS: float = 60.0  # A crashed worker's claim is retried after this
+    WEBHOOK_DEDUP_CACHE_SIZE: int = 50000  # Recently seen event ids kept in memory
+    
+    # Outbox (side effects of escrow state changes)
+    OUTBOX_BATCH_SIZE: int = 100  # Events claimed per dispatch
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 0.5
+    OUTBOX_MAX_ATTEMPTS: int = 8  # Kept as dead after this many failures
+    OUTBOX_LEASE_SECONDS: float = 60.0  # A crashed dispatcher's claim is retried after this; keep above BLOCKCHAIN_ANCHOR_WINDOW_SECONDS
+    OUTBOX_NOTIFY_CONCURRENCY: int = 50  # WebSocket notifications in flight
+    OUTBOX_CHAIN_CONCURRENCY: int = 16  # Per-event anchors in flight (batch mode allows BLOCKCHAIN_ANCHOR_BATCH_SIZE)
+    OUTBOX_GATEWAY_CONCURRENCY: int = 4  # Razorpay payouts/refunds in flight
+    
+    # Escrow join codes
+    ESCROW_CODE_SWEEP_INTERVAL_SECONDS: float = 300.0  # Release codes of expired escrows for reuse
+    ESCROW_CODE_SWEEP_BATCH_SIZE: int = 1000
     
     # Frontend URL
     FRONTEND_URL: str = "http://localhost:3000"
@@ -43,6 +89,22 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Authenticated user cache
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_REDIS_ENABLED: bool = False  # Share entries across workers via REDIS_URL
+    
+    # WebSocket delivery
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 100  # Queued messages per connection before it is dropped
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = 10.0
+    WEBSOCKET_BACKPLANE: str = "memory"  # "memory" (single worker) or "redis" (REDIS_URL pub/sub)
+    WEBSOCKET_BACKPLANE_CHANNEL: str = "trustpay:ws"
+    WEBSOCKET_PER_MESSAGE_DEFLATE: bool = True  # Negotiated per connection; costs CPU per socket
+    WEBSOCKET_COMPACTION_INTERVAL_SECONDS: float = 300.0  # Sweep for stale connections/subscriptions
+    WEBSOCKET_REPLAY_BUFFER_SIZE: int = 200  # Recent messages kept per escrow/user stream for reconnects
+    WEBSOCKET_REPLAY_TTL_SECONDS: int = 3600  # Redis replay keys expire after this much stream inactivity
+    WEBSOCKET_REPLAY_MAX_STREAMS: int = 10000  # In-memory replay only (least recently used evicted)
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated and a job cannot be queued"""
+
+
+def _hash_password(password: str) -> str:
+    """Hash a password using bcrypt (runs inside the worker pool)"""
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return hashed.decode('utf-8')
+
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a bcrypt hash (runs inside the worker pool)"""
+    return bcrypt.checkpw(
+        plain_password.encode('utf-8'),
+        hashed_password.encode('utf-8')
+    )
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded worker pool so the event loop never blocks on it.
+
+    At most `workers` jobs run at once. Up to `max_pending` jobs may be queued
+    or running; anything beyond that, or anything that waits longer than
+    `queue_timeout` for a worker, is rejected with PasswordHasherBusy.
+    """
+
+    def __init__(
+        self,
+        executor_type: str = "thread",
+        workers: int = 4,
+        max_pending: int = 64,
+        queue_timeout: float = 5.0
+    ):
+        self.executor_type = executor_type
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.queue_timeout = queue_timeout
+
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Saturation metrics
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._total_wait = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="bcrypt"
+                )
+            logger.info(f"Password hashing pool started: {self.executor_type} x{self.workers}")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+        return self._semaphore
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        self._pending += 1
+        queued_at = time.monotonic()
+        try:
+            semaphore = self._get_semaphore()
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._timed_out += 1
+                raise PasswordHasherBusy("Timed out waiting for a password hashing worker")
+
+            self._total_wait += time.monotonic() - queued_at
+            self._running += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+            finally:
+                self._running -= 1
+                self._completed += 1
+                semaphore.release()
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await self._run(_hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        return await self._run(_check_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool saturation metrics"""
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "running": self._running,
+            "queued": self._pending - self._running,
+            "saturation": round(self._pending / self.max_pending, 3),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "avg_wait_ms": round(self._total_wait / self._completed * 1000, 2) if self._completed else 0.0
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT
+)
@@ -0,0 +1,45 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (installed by httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def create_async_client(base_url: str = "", timeout: Optional[float] = None) -> httpx.AsyncClient:
+    """
+    Build a long-lived pooled httpx client for an external API
+
+    Connections are kept alive and reused across requests, so only the first
+    call to a host pays the TCP/TLS handshake. Pool limits come from the
+    HTTP_* settings; HTTP/2 is used when enabled and the h2 package is present.
+
+    Args:
+        base_url: Prefix for relative request URLs
+        timeout: Per-request timeout in seconds (defaults to HTTP_TIMEOUT_SECONDS)
+
+    Returns:
+        An AsyncClient the caller owns and must close with `aclose()`
+    """
+    http2 = settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+    if settings.HTTP2_ENABLED and not HTTP2_AVAILABLE:
+        logger.warning("HTTP2_ENABLED is set but h2 is not installed; using HTTP/1.1")
+
+    return httpx.AsyncClient(
+        base_url=base_url,
+        http2=http2,
+        timeout=timeout if timeout is not None else settings.HTTP_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+    )
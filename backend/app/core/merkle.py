@@ -0,0 +1,69 @@
+import json
+from typing import Any, Dict, List
+
+from eth_utils import keccak
+
+# Domain separation: a leaf can never be passed off as an internal node
+# (or the other way round), since the two are hashed under different prefixes
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def hash_event(event: Dict[str, Any]) -> bytes:
+    """
+    Canonical leaf hash for an anchored event
+
+    The event is serialized as compact JSON with sorted keys, so the same
+    event always hashes to the same leaf and anyone holding the event data
+    can recompute it as keccak256(0x00 || json).
+    """
+    canonical = json.dumps(event, sort_keys=True, separators=(",", ":"), default=str)
+    return keccak(LEAF_PREFIX + canonical.encode("utf-8"))
+
+
+def _hash_pair(a: bytes, b: bytes) -> bytes:
+    # Pairs are sorted before hashing, so proofs need no left/right flags
+    # (same convention as OpenZeppelin's MerkleProof)
+    return keccak(NODE_PREFIX + a + b) if a < b else keccak(NODE_PREFIX + b + a)
+
+
+def build_tree(leaves: List[bytes]) -> List[List[bytes]]:
+    """
+    Build all levels of a Merkle tree
+
+    Args:
+        leaves: Leaf hashes, in batch order
+
+    Returns:
+        Levels from the leaves (index 0) up to the root (last level)
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])  # Odd node is promoted unchanged
+        levels.append(parents)
+    return levels
+
+
+def get_proof(levels: List[List[bytes]], index: int) -> List[bytes]:
+    """Sibling hashes from leaf `index` up to the root"""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: List[bytes], root: bytes) -> bool:
+    """Check that `leaf` is included under `root`"""
+    node = leaf
+    for sibling in proof:
+        node = _hash_pair(node, sibling)
+    return node == root
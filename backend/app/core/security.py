@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,22 +8,27 @@ from sqlalchemy import select
 
 from .config import settings
 from .database import get_db
+from .hashing import password_hasher, _hash_password, _check_password
+from .user_cache import user_cache
 from app.models.user import User
 
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a bcrypt hash"""
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    """Verify a password against a bcrypt hash (blocking - for scripts only)"""
+    return _check_password(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    """Hash a password using bcrypt (blocking - for scripts only)"""
+    return _hash_password(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop"""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop"""
+    return await password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -54,10 +58,15 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
+    user = await user_cache.get(user_id)
+    if user is not None:
+        return user
+    
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
+    await user_cache.set(user)
     return user
 
 
@@ -81,6 +90,10 @@ async def get_current_user_ws(token: str) -> User:
     except JWTError:
         raise credentials_exception
     
+    user = await user_cache.get(user_id)
+    if user is not None:
+        return user
+    
     async with AsyncSessionLocal() as db:
         result = await db.execute(select(User).where(User.id == user_id))
         user = result.scalar_one_or_none()
@@ -88,4 +101,5 @@ async def get_current_user_ws(token: str) -> User:
         if user is None:
             raise credentials_exception
         
+        await user_cache.set(user)
         return user
@@ -0,0 +1,19 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib encoder is used without it
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """
+    Encode to compact JSON text
+
+    Uses orjson when installed. Values the encoder does not know natively
+    are rendered with str(), matching the json.dumps(default=str) fallback.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+    return json.dumps(obj, default=str, separators=(",", ":"))
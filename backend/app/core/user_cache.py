@@ -0,0 +1,169 @@
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import UUID
+
+from .config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Never cache credentials, they are only needed by the login path
+EXCLUDED_COLUMNS = {"hashed_password"}
+
+
+def _user_to_dict(user: User) -> Dict[str, Any]:
+    """Snapshot the column values of a user"""
+    return {
+        column.key: getattr(user, column.key)
+        for column in User.__table__.columns
+        if column.key not in EXCLUDED_COLUMNS
+    }
+
+
+def _dict_to_user(data: Dict[str, Any]) -> User:
+    """Build a detached User from a snapshot"""
+    return User(**data)
+
+
+def _encode(data: Dict[str, Any]) -> str:
+    return json.dumps(
+        {k: (v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, uuid.UUID) else v)
+         for k, v in data.items()}
+    )
+
+
+def _decode(raw: str) -> Dict[str, Any]:
+    data = json.loads(raw)
+    for column in User.__table__.columns:
+        value = data.get(column.key)
+        if value is None:
+            continue
+        if isinstance(column.type, UUID):
+            data[column.key] = uuid.UUID(value)
+        elif isinstance(column.type, DateTime):
+            data[column.key] = datetime.fromisoformat(value)
+    return data
+
+
+class UserCache:
+    """
+    LRU + TTL cache of authenticated user records keyed by user id.
+
+    Entries are column snapshots, not session-bound ORM objects, so every hit
+    returns a fresh detached User. When a Redis URL is given the cache is
+    two-tier: the local LRU is checked first, then Redis, so workers share
+    entries and an invalidation clears the record everywhere within the local
+    TTL.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0, redis_url: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._redis = None
+
+        if redis_url:
+            try:
+                import redis.asyncio as redis
+                self._redis = redis.from_url(redis_url, decode_responses=True)
+                logger.info("User cache backed by Redis")
+            except Exception as e:
+                logger.warning(f"Redis unavailable for user cache, using local cache only: {e}")
+                self._redis = None
+
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _redis_key(user_id: str) -> str:
+        return f"user_cache:{user_id}"
+
+    async def get(self, user_id: str) -> Optional[User]:
+        """Return a cached user or None"""
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, data = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _dict_to_user(data)
+            del self._entries[key]
+
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"User cache Redis read failed: {e}")
+                raw = None
+            if raw:
+                data = _decode(raw)
+                self._store_local(key, data)
+                self.hits += 1
+                self.redis_hits += 1
+                return _dict_to_user(data)
+
+        self.misses += 1
+        return None
+
+    async def set(self, user: User):
+        """Cache a user loaded from the database"""
+        key = str(user.id)
+        data = _user_to_dict(user)
+        self._store_local(key, data)
+
+        if self._redis is not None:
+            try:
+                await self._redis.set(self._redis_key(key), _encode(data), ex=max(1, int(self.ttl)))
+            except Exception as e:
+                logger.warning(f"User cache Redis write failed: {e}")
+
+    async def invalidate(self, user_id: str):
+        """Drop a user from the cache after it has been modified"""
+        key = str(user_id)
+        self._entries.pop(key, None)
+        self.invalidations += 1
+
+        if self._redis is not None:
+            try:
+                await self._redis.delete(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"User cache Redis delete failed: {e}")
+
+    def _store_local(self, key: str, data: Dict[str, Any]):
+        self._entries[key] = (time.monotonic() + self.ttl, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "backend": "redis" if self._redis is not None else "local",
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
+
+
+# Global user cache instance
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    redis_url=settings.REDIS_URL if settings.USER_CACHE_REDIS_ENABLED else None
+)
@@ -3,5 +3,11 @@ from .escrow import Escrow
 from .confirmation import Confirmation
 from .dispute import Dispute
 from .blockchain_log import BlockchainLog
+from .user_daily_escrow_stats import UserDailyEscrowStats
+from .webhook_event import InboundWebhookEvent
+from .outbox_event import OutboxEvent
 
-__all__ = ["User", "Escrow", "Confirmation", "Dispute", "BlockchainLog"]
+__all__ = [
+    "User", "Escrow", "Confirmation", "Dispute", "BlockchainLog",
+    "UserDailyEscrowStats", "InboundWebhookEvent", "OutboxEvent"
+]
@@ -1,11 +1,17 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer, BigInteger, Text, Index
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 
 from app.core.database import Base
 
+class BlockchainTxStatus:
+    SUBMITTED = "submitted"  # Broadcast, waiting for a receipt
+    CONFIRMED = "confirmed"  # Mined with enough confirmations
+    FAILED = "failed"        # Mined but reverted
+    DROPPED = "dropped"      # Never mined after BLOCKCHAIN_MAX_REBROADCASTS fee bumps
+
 class BlockchainLog(Base):
     __tablename__ = "blockchain_logs"
     
@@ -16,7 +22,26 @@ class BlockchainLog(Base):
     payload_json = Column(JSON, nullable=True)
     block_number = Column(String(20), nullable=True)
     
+    # Receipt tracking (rows of a Merkle batch share one transaction)
+    status = Column(String(20), nullable=False, default=BlockchainTxStatus.SUBMITTED)
+    nonce = Column(BigInteger, nullable=True)
+    gas_limit = Column(BigInteger, nullable=True)
+    gas_price = Column(BigInteger, nullable=True)  # Wei; raised on each rebroadcast
+    call_data = Column(Text, nullable=True)  # Hex calldata, re-signed on rebroadcast
+    attempts = Column(Integer, nullable=False, default=1)
+    prior_tx_hashes = Column(ARRAY(String(66)), nullable=True)  # Hashes replaced by fee bumps, oldest first
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    submitted_at = Column(DateTime(timezone=True), server_default=func.now())
+    confirmed_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     escrow = relationship("Escrow", back_populates="blockchain_logs")
+    
+    __table_args__ = (
+        Index("ix_blockchain_logs_escrow_id", escrow_id),
+        Index(
+            "ix_blockchain_logs_submitted", tx_hash,
+            postgresql_where=status == BlockchainTxStatus.SUBMITTED
+        ),
+    )
@@ -10,7 +10,7 @@ class Confirmation(Base):
     __tablename__ = "confirmations"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    escrow_id = Column(UUID(as_uuid=True), ForeignKey("escrows.id"), nullable=False)
+    escrow_id = Column(UUID(as_uuid=True), ForeignKey("escrows.id"), nullable=False, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     vpa = Column(String(100), nullable=True)
     role = Column(String(20), nullable=False)  # payer or payee
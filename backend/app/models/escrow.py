@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -15,6 +15,19 @@ class EscrowStatus(str, enum.Enum):
     DISPUTED = "DISPUTED"
     EXPIRED = "EXPIRED"
 
+# Statuses counted as "active" on the dashboard
+ACTIVE_ESCROW_STATUSES = [EscrowStatus.INITIATED, EscrowStatus.HELD, EscrowStatus.DISPUTED]
+
+# Allowed status changes; EscrowService.update_status rejects anything else
+ESCROW_TRANSITIONS = {
+    EscrowStatus.INITIATED: {EscrowStatus.HELD, EscrowStatus.DISPUTED, EscrowStatus.REFUNDED, EscrowStatus.EXPIRED},
+    EscrowStatus.HELD: {EscrowStatus.RELEASED, EscrowStatus.DISPUTED, EscrowStatus.REFUNDED},
+    EscrowStatus.DISPUTED: {EscrowStatus.RELEASED, EscrowStatus.REFUNDED},
+    EscrowStatus.RELEASED: set(),
+    EscrowStatus.REFUNDED: set(),
+    EscrowStatus.EXPIRED: {EscrowStatus.REFUNDED},  # A payment captured after expiry is returned
+}
+
 class Escrow(Base):
     __tablename__ = "escrows"
     
@@ -25,9 +38,10 @@ class Escrow(Base):
     amount = Column(Integer, nullable=False)  # Amount in paise
     currency =Column(String(3), default="INR")
     status = Column(Enum(EscrowStatus), default=EscrowStatus.INITIATED)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped by every status transition
     
     # Escrow Matching System
-    escrow_code = Column(String(6), unique=True, nullable=False, index=True)  # 6-char code like 67A9G2
+    escrow_code = Column(String(6), nullable=False, index=True)  # 6-char code like 67A9G2, unique while active
     escrow_name = Column(String(100), nullable=True)  # Random friendly name
     is_code_active = Column(Boolean, default=True)  # Whether code can be used to join
     
@@ -77,3 +91,31 @@ class Escrow(Base):
     disputes = relationship("Dispute", back_populates="escrow")
     blockchain_logs = relationship("BlockchainLog", back_populates="escrow")
     payment_logs = relationship("PaymentLog", back_populates="escrow")
+    
+    # Indexes matched to the participant / status / time access paths
+    __table_args__ = (
+        Index("ix_escrows_payer_id_created_at", payer_id, created_at.desc()),
+        Index("ix_escrows_payee_id_created_at", payee_id, created_at.desc()),
+        Index("ix_escrows_payee_vpa_created_at", payee_vpa, created_at.desc()),
+        Index(
+            "ix_escrows_payer_id_active", payer_id, status,
+            postgresql_where=status.in_(ACTIVE_ESCROW_STATUSES)
+        ),
+        Index(
+            "ix_escrows_payee_id_active", payee_id, status,
+            postgresql_where=status.in_(ACTIVE_ESCROW_STATUSES)
+        ),
+        # Codes are unique only among active escrows, so inactive codes are reused
+        Index(
+            "uq_escrows_active_escrow_code", escrow_code, unique=True,
+            postgresql_where=is_code_active
+        ),
+        Index(
+            "ix_escrows_active_code_expires_at", expires_at,
+            postgresql_where=is_code_active
+        ),
+        Index(
+            "ix_escrows_razorpay_payment_id", razorpay_payment_id,
+            postgresql_where=razorpay_payment_id.isnot(None)
+        ),
+    )
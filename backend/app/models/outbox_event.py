@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+
+from app.core.database import Base
+
+class OutboxEventStatus:
+    PENDING = "pending"        # Waiting for the dispatcher (or for its retry time)
+    PROCESSING = "processing"  # Claimed by a dispatcher until locked_until
+    DEAD = "dead"              # Gave up after OUTBOX_MAX_ATTEMPTS failures
+    # Delivered events are deleted
+
+class OutboxEventType:
+    NOTIFY = "escrow.notify"          # WebSocket update to the escrow's subscribers
+    ANCHOR = "chain.anchor"           # On-chain anchoring of a state transition
+    PAYOUT = "razorpay.payout"        # Release funds to the payee
+    REFUND = "razorpay.refund"        # Refund the payer
+
+class OutboxEvent(Base):
+    """Side effect of an escrow state change, written in the same transaction"""
+    __tablename__ = "outbox_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_type = Column(String(50), nullable=False)
+    escrow_id = Column(UUID(as_uuid=True), nullable=True)  # Events of one escrow run in order within a batch
+    payload = Column(JSON, nullable=False)
+
+    # Delivery state
+    status = Column(String(20), nullable=False, default=OutboxEventStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_events_open", available_at,
+            postgresql_where=status.in_([OutboxEventStatus.PENDING, OutboxEventStatus.PROCESSING])
+        ),
+    )
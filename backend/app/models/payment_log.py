@@ -11,7 +11,7 @@ class PaymentLog(Base):
     __tablename__ = "payment_logs"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    escrow_id = Column(UUID(as_uuid=True), ForeignKey("escrows.id"), nullable=False)
+    escrow_id = Column(UUID(as_uuid=True), ForeignKey("escrows.id"), nullable=False, index=True)
     
     # Event details
     event_type = Column(String(50), nullable=False)  # "payment", "payout", "refund"
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class UserDailyEscrowStats(Base):
+    """Per-user, per-day escrow rollup maintained by EscrowService"""
+    __tablename__ = "user_daily_escrow_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day the escrows were created
+
+    # Totals for escrows created that day
+    volume = Column(BigInteger, nullable=False, default=0)  # Amount in paise
+    count = Column(Integer, nullable=False, default=0)
+
+    # Current status of those escrows
+    initiated_count = Column(Integer, nullable=False, default=0)
+    held_count = Column(Integer, nullable=False, default=0)
+    released_count = Column(Integer, nullable=False, default=0)
+    refunded_count = Column(Integer, nullable=False, default=0)
+    disputed_count = Column(Integer, nullable=False, default=0)
+    expired_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+
+from app.core.database import Base
+
+class WebhookEventStatus:
+    PENDING = "pending"        # Waiting for a worker (or for its retry time)
+    PROCESSING = "processing"  # Claimed by a worker until locked_until
+    DONE = "done"
+    DEAD = "dead"              # Gave up after WEBHOOK_MAX_ATTEMPTS failures
+
+class InboundWebhookEvent(Base):
+    """Raw inbound webhook delivery, persisted before it is processed"""
+    __tablename__ = "inbound_webhook_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    provider = Column(String(20), nullable=False)  # "razorpay"
+    event_type = Column(String(100), nullable=False)  # e.g. "payment.captured"
+    ordering_key = Column(String(100), nullable=True)  # Events with the same key run in order (escrow id)
+    dedup_key = Column(String(128), nullable=True)  # Gateway event id, or "sha256:<body hash>"
+
+    # Raw delivery
+    body = Column(Text, nullable=False)
+    headers = Column(JSON, nullable=True)
+
+    # Processing state
+    status = Column(String(20), nullable=False, default=WebhookEventStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("uq_inbound_webhook_events_dedup", provider, dedup_key, unique=True),
+        Index(
+            "ix_inbound_webhook_events_open", received_at,
+            postgresql_where=status.in_([WebhookEventStatus.PENDING, WebhookEventStatus.PROCESSING])
+        ),
+        Index(
+            "ix_inbound_webhook_events_ordering_key", ordering_key, received_at,
+            postgresql_where=status.in_([WebhookEventStatus.PENDING, WebhookEventStatus.PROCESSING])
+        ),
+    )
@@ -1,9 +1,9 @@
-from .escrow import EscrowCreate, EscrowResponse, EscrowUpdate
+from .escrow import EscrowCreate, EscrowResponse, EscrowUpdate, EscrowSummary
 from .user import UserCreate, UserResponse, UserUpdate
 from .auth import Token, TokenData, LoginRequest
 
 __all__ = [
-    "EscrowCreate", "EscrowResponse", "EscrowUpdate",
+    "EscrowCreate", "EscrowResponse", "EscrowUpdate", "EscrowSummary",
     "UserCreate", "UserResponse", "UserUpdate",
     "Token", "TokenData", "LoginRequest"
 ]
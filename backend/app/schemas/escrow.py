@@ -54,6 +54,24 @@ class EscrowResponse(EscrowBase):
     class Config:
         from_attributes = True
 
+class EscrowSummary(BaseModel):
+    """Compact escrow projection for list views"""
+    id: UUID
+    payer_id: UUID
+    payee_id: Optional[UUID] = None
+    payee_vpa: str
+    amount: int
+    currency: str
+    status: EscrowStatus
+    escrow_code: str
+    escrow_name: Optional[str] = None
+    is_code_active: bool = True
+    description: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 class EscrowWithPaymentOrder(BaseModel):
     """Response when creating escrow with Razorpay payment order"""
     escrow: EscrowResponse
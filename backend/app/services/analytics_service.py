@@ -1,114 +1,135 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_
-from typing import Dict, Any, List
+from sqlalchemy import select, func, and_
+from typing import Dict, Any, List, Set
 from uuid import UUID
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
-from app.models.escrow import Escrow, EscrowStatus
+from app.models.escrow import EscrowStatus, ACTIVE_ESCROW_STATUSES
+from app.models.user_daily_escrow_stats import UserDailyEscrowStats
+from app.services.escrow_stats_service import STATUS_COLUMNS
 
 class AnalyticsService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def get_dashboard_stats(self, user_id: UUID) -> Dict[str, Any]:
-        """Get high-level dashboard statistics"""
-        
-        # Base query for user's escrows (as payer or payee)
-        user_filter = or_(Escrow.payer_id == user_id, Escrow.payee_id == user_id)
+        """Get high-level dashboard statistics (from the daily rollup, like get_dashboard)"""
+        return await self.get_dashboard(user_id, set())
+
+    async def get_dashboard(
+        self,
+        user_id: UUID,
+        include: Set[str],
+        days: int = 30
+    ) -> Dict[str, Any]:
+        """
+        Get dashboard stats plus the requested extra sections in one query
         
-        # Total Volume (Sum of all escrow amounts)
-        volume_query = select(func.sum(Escrow.amount)).where(user_filter)
-        volume_result = await self.db.execute(volume_query)
-        total_volume = volume_result.scalar() or 0
+        Reads the user's daily rollup rows (O(days)) rather than their escrows.
         
-        # Active Escrows (INITIATED, HELD, DISPUTED)
-        active_statuses = [EscrowStatus.INITIATED, EscrowStatus.HELD, EscrowStatus.DISPUTED]
-        active_query = select(func.count(Escrow.id)).where(
-            and_(user_filter, Escrow.status.in_(active_statuses))
+        Args:
+            user_id: User UUID
+            include: Extra sections to return ("distribution", "history")
+            days: History window in days
+            
+        Returns:
+            Stats dict with "distribution" and/or "history" keys added
+        """
+        result = await self.db.execute(
+            select(UserDailyEscrowStats).where(UserDailyEscrowStats.user_id == user_id)
         )
-        active_result = await self.db.execute(active_query)
-        active_count = active_result.scalar() or 0
+        rows = list(result.scalars().all())
+        
+        status_counts = {
+            status: sum(getattr(row, column) for row in rows)
+            for status, column in STATUS_COLUMNS.items()
+        }
         
-        # Completed Escrows (RELEASED)
-        completed_query = select(func.count(Escrow.id)).where(
-            and_(user_filter, Escrow.status == EscrowStatus.RELEASED)
+        dashboard = self._build_stats(
+            total_volume=sum(row.volume for row in rows),
+            active_count=sum(status_counts[status] for status in ACTIVE_ESCROW_STATUSES),
+            completed_count=status_counts[EscrowStatus.RELEASED],
+            total_count=sum(row.count for row in rows)
         )
-        completed_result = await self.db.execute(completed_query)
-        completed_count = completed_result.scalar() or 0
         
-        # Total Count
-        total_query = select(func.count(Escrow.id)).where(user_filter)
-        total_result = await self.db.execute(total_query)
-        total_count = total_result.scalar() or 0
+        if "distribution" in include:
+            dashboard["distribution"] = self._build_distribution(status_counts)
         
+        if "history" in include:
+            start_day = self._history_start(days)
+            dashboard["history"] = self._build_history(
+                sorted((row for row in rows if row.day >= start_day and row.count > 0), key=lambda r: r.day)
+            )
+        
+        return dashboard
+
+    @staticmethod
+    def _build_stats(
+        total_volume: int,
+        active_count: int,
+        completed_count: int,
+        total_count: int
+    ) -> Dict[str, Any]:
         # Success Rate
         success_rate = (completed_count / total_count * 100) if total_count > 0 else 0
         
         return {
-            "total_volume": total_volume,
+            "total_volume": total_volume or 0,
             "active_count": active_count,
             "completed_count": completed_count,
             "success_rate": round(success_rate, 1),
             "total_count": total_count
         }
 
+    @staticmethod
+    def _history_start(days: int) -> date:
+        return (datetime.now(timezone.utc) - timedelta(days=days)).date()
+
+    @staticmethod
+    def _build_history(rows: List[UserDailyEscrowStats]) -> List[Dict[str, Any]]:
+        return [
+            {"date": row.day.strftime("%Y-%m-%d"), "volume": row.volume, "count": row.count}
+            for row in rows
+        ]
+
+    @staticmethod
+    def _build_distribution(status_counts: Dict[EscrowStatus, int]) -> List[Dict[str, Any]]:
+        return [
+            {"name": status.value, "value": count}
+            for status, count in status_counts.items()
+            if count > 0
+        ]
+
     async def get_transaction_history(self, user_id: UUID, days: int = 30) -> List[Dict[str, Any]]:
         """Get daily transaction volume for the last N days"""
         
-        start_date = datetime.now(timezone.utc) - timedelta(days=days)
-        
-        # Create labeled column for date truncation
-        date_column = func.date_trunc('day', Escrow.created_at).label('date')
-        
-        # Query to group by date and sum amount
-        query = select(
-            date_column,
-            func.sum(Escrow.amount).label('volume'),
-            func.count(Escrow.id).label('count')
-        ).where(
+        query = select(UserDailyEscrowStats).where(
             and_(
-                or_(Escrow.payer_id == user_id, Escrow.payee_id == user_id),
-                Escrow.created_at >= start_date
+                UserDailyEscrowStats.user_id == user_id,
+                UserDailyEscrowStats.day >= self._history_start(days),
+                UserDailyEscrowStats.count > 0
             )
-        ).group_by(
-            date_column
         ).order_by(
-            date_column
+            UserDailyEscrowStats.day
         )
         
         result = await self.db.execute(query)
-        rows = result.all()
-        
-        history = []
-        for row in rows:
-            history.append({
-                "date": row.date.strftime("%Y-%m-%d"),
-                "volume": row.volume,
-                "count": row.count
-            })
-            
-        return history
+        return self._build_history(list(result.scalars().all()))
 
     async def get_status_distribution(self, user_id: UUID) -> List[Dict[str, Any]]:
         """Get distribution of escrows by status"""
         
         query = select(
-            Escrow.status,
-            func.count(Escrow.id).label('count')
+            *[func.coalesce(func.sum(getattr(UserDailyEscrowStats, column)), 0).label(column)
+              for column in STATUS_COLUMNS.values()]
         ).where(
-            or_(Escrow.payer_id == user_id, Escrow.payee_id == user_id)
-        ).group_by(
-            Escrow.status
+            UserDailyEscrowStats.user_id == user_id
         )
         
         result = await self.db.execute(query)
-        rows = result.all()
+        row = result.one()
         
-        distribution = []
-        for row in rows:
-            distribution.append({
-                "name": row.status.value,
-                "value": row.count
-            })
-            
-        return distribution
+        return self._build_distribution({
+            status: getattr(row, column)
+            for status, column in STATUS_COLUMNS.items()
+        })
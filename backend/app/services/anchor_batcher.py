@@ -0,0 +1,231 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.merkle import build_tree, get_proof, hash_event
+from app.models.blockchain_log import BlockchainLog
+from app.services.receipt_tracker import submitted_log_values
+
+logger = logging.getLogger(__name__)
+
+
+class AnchorBatcher:
+    """
+    Anchors escrow state transitions on chain in Merkle batches.
+
+    Transitions are buffered for up to `window_seconds` or `max_batch_size`
+    events. Each batch is hashed into a Merkle tree and only the root is sent
+    to the contract (`anchorBatch`), so one transaction covers the whole
+    batch. Every event gets a blockchain_logs row holding its leaf, its
+    inclusion proof and the batch root. Events buffered with `add` are kept
+    in memory until anchored; `anchor` instead waits for the event's row
+    and fails if its batch isn't sent, leaving the retry to the caller.
+    """
+
+    def __init__(self, window_seconds: float = 30.0, max_batch_size: int = 500):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max(1, max_batch_size)
+
+        # Buffered events, each with the future of an `anchor` caller (or None)
+        self._pending: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]] = []
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.events_added = 0
+        self.batches_anchored = 0
+        self.events_anchored = 0
+        self.failed_batches = 0
+        self.events_skipped = 0
+
+    def add(self, escrow_id: str, event_type: str, amount: int, currency: str,
+            occurred_at: Optional[datetime] = None):
+        """
+        Buffer a state transition for the next batch (never waits)
+
+        Args:
+            escrow_id: Escrow UUID
+            event_type: Transition being anchored (HELD, RELEASED, ...)
+            amount: Escrow amount in paise
+            currency: Escrow currency
+            occurred_at: When the transition happened (defaults to now)
+        """
+        self._buffer(escrow_id, event_type, amount, currency, occurred_at, None)
+
+    async def anchor(self, escrow_id: str, event_type: str, amount: int, currency: str,
+                     occurred_at: Optional[datetime] = None):
+        """
+        Buffer a state transition and wait until its blockchain_logs row is written
+
+        Takes the same arguments as `add`. Returns right away if the
+        blockchain is not configured.
+
+        Raises:
+            RuntimeError: The batcher is not running or the batch holding
+                the event was not sent
+        """
+        if self._task is None or self._stopping:
+            # Nothing would flush the event; the caller retries it later
+            raise RuntimeError(f"Anchor batcher not running, {event_type} for escrow {escrow_id} not queued")
+        done = asyncio.get_running_loop().create_future()
+        self._buffer(escrow_id, event_type, amount, currency, occurred_at, done)
+        await done
+
+    def _buffer(self, escrow_id: str, event_type: str, amount: int, currency: str,
+                occurred_at: Optional[datetime], done: Optional[asyncio.Future]):
+        self._pending.append(({
+            "escrow_id": str(escrow_id),
+            "event": event_type,
+            "amount": amount,
+            "currency": currency,
+            "occurred_at": (occurred_at or datetime.now(timezone.utc)).isoformat()
+        }, done))
+        self.events_added += 1
+        if len(self._pending) >= self.max_batch_size and self._full is not None:
+            self._full.set()
+
+    def start(self):
+        """Start the flush loop on the running event loop"""
+        if self._task is not None:
+            return
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="anchor-batcher")
+        logger.info(f"Anchor batcher started (window={self.window_seconds}s, "
+                    f"max_batch_size={self.max_batch_size})")
+
+    async def stop(self):
+        """Stop the loop (letting a flush in progress finish) and anchor whatever is still buffered"""
+        if self._task is not None:
+            self._stopping = True
+            self._full.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._stopping = False
+        while self._pending:
+            if not await self.flush():
+                break
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.window_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            if self._stopping:
+                break  # stop() drains what is left
+
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Anchor batch flush error: {e}", exc_info=True)
+
+    async def flush(self) -> bool:
+        """
+        Anchor up to one batch of buffered events
+
+        Returns:
+            True if a batch was anchored (or nothing was pending)
+        """
+        # Drop events whose `anchor` caller gave up; it retries them itself
+        self._pending = [(event, done) for event, done in self._pending
+                         if done is None or not done.cancelled()]
+        if not self._pending:
+            return True
+
+        from app.services.registry import services
+
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+
+        if not services.blockchain.enabled:
+            self.events_skipped += len(batch)
+            logger.info(f"Blockchain not configured, skipping anchor batch of {len(batch)} events")
+            self._settle(batch)
+            return True
+
+        try:
+            anchored = await self._anchor_batch([event for event, _ in batch])
+        except BaseException as e:
+            self._retry(batch, e if isinstance(e, Exception) else RuntimeError("Anchor batch interrupted"))
+            raise
+        if anchored:
+            self._settle(batch)
+        else:
+            self._retry(batch, RuntimeError(f"Anchor batch of {len(batch)} events not sent"))
+            logger.warning(f"Anchor batch of {len(batch)} events not sent; will retry")
+        return anchored
+
+    @staticmethod
+    def _settle(batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]):
+        for _, done in batch:
+            if done is not None and not done.done():
+                done.set_result(None)
+
+    def _retry(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]], error: Exception):
+        # Failed or cancelled before its logs were written: `add` events go
+        # back to the buffer for the next window; `anchor` callers get the
+        # error and retry themselves
+        self._pending[:0] = [(event, done) for event, done in batch if done is None]
+        for _, done in batch:
+            if done is not None and not done.done():
+                done.set_exception(error)
+        self.failed_batches += 1
+
+    async def _anchor_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        from app.services.registry import services
+
+        leaves = [hash_event(event) for event in batch]
+        levels = build_tree(leaves)
+        root = levels[-1][0]
+
+        tx = await services.blockchain.anchor_batch(root, len(batch))
+        if not tx:
+            return False
+
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                BlockchainLog(
+                    escrow_id=event["escrow_id"],
+                    event_type=event["event"],
+                    payload_json={
+                        "event": event,
+                        "leaf": "0x" + leaf.hex(),
+                        "proof": ["0x" + node.hex() for node in get_proof(levels, index)],
+                        "index": index,
+                        "batch_root": "0x" + root.hex(),
+                        "batch_size": len(batch)
+                    },
+                    **submitted_log_values(tx)
+                )
+                for index, (event, leaf) in enumerate(zip(batch, leaves))
+            ])
+            await db.commit()
+
+        self.batches_anchored += 1
+        self.events_anchored += len(batch)
+        logger.info(f"Anchored {len(batch)} escrow events under root 0x{root.hex()}: {tx['tx_hash']}")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Batching counters"""
+        return {
+            "pending": len(self._pending),
+            "events_added": self.events_added,
+            "batches_anchored": self.batches_anchored,
+            "events_anchored": self.events_anchored,
+            "failed_batches": self.failed_batches,
+            "events_skipped": self.events_skipped
+        }
+
+
+# Global anchor batcher instance
+anchor_batcher = AnchorBatcher(
+    window_seconds=settings.BLOCKCHAIN_ANCHOR_WINDOW_SECONDS,
+    max_batch_size=settings.BLOCKCHAIN_ANCHOR_BATCH_SIZE
+)
@@ -1,11 +1,13 @@
-from web3 import Web3
+from web3 import AsyncWeb3
 from eth_account import Account
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.services.nonce_manager import NonceManager
 
 class BlockchainService:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(settings.POLYGON_RPC_URL))
+        # Async provider: RPC round trips never block the event loop
+        self.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(settings.POLYGON_RPC_URL))
         
         # Only initialize account if we have a valid private key
         if settings.PRIVATE_KEY and settings.PRIVATE_KEY.startswith('0x') and len(settings.PRIVATE_KEY) > 10:
@@ -17,6 +19,15 @@ class BlockchainService:
         else:
             self.account = None
         
+        # Nonces are allocated locally so transactions can be pipelined
+        self.nonces = NonceManager(
+            self._fetch_pending_nonce,
+            fill_gap=self._fill_nonce_gap,
+            resync_interval=settings.BLOCKCHAIN_NONCE_RESYNC_SECONDS
+        )
+        
+        self._chain_id: Optional[int] = None
+        
         self.contract_address = settings.CONTRACT_ADDRESS
         
         # Minimal contract ABI for escrow functions
@@ -45,14 +56,24 @@ class BlockchainService:
                 "outputs": [],
                 "stateMutability": "nonpayable",
                 "type": "function"
+            },
+            {
+                "inputs": [
+                    {"name": "root", "type": "bytes32"},
+                    {"name": "count", "type": "uint256"}
+                ],
+                "name": "anchorBatch",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function"
             }
         ]
         
-        # Only initialize contract if we have a valid address
+        # Only initialize contract if we have a valid address (connectivity is
+        # checked by is_connected(), not on construction)
         if (self.contract_address and 
             self.contract_address.startswith('0x') and 
-            len(self.contract_address) == 42 and 
-            self.w3.is_connected()):
+            len(self.contract_address) == 42):
             try:
                 self.contract = self.w3.eth.contract(
                     address=self.contract_address,
@@ -64,93 +85,158 @@ class BlockchainService:
         else:
             self.contract = None
     
-    async def create_escrow_on_chain(self, escrow_id: str, metadata_hash: str, amount: int) -> Optional[str]:
+    @property
+    def enabled(self) -> bool:
+        """True when a signer and contract are configured"""
+        return self.contract is not None and self.account is not None
+    
+    async def is_connected(self) -> bool:
+        """Probe the RPC endpoint"""
+        try:
+            return await self.w3.is_connected()
+        except Exception:
+            return False
+    
+    async def _fetch_pending_nonce(self) -> int:
+        return await self.w3.eth.get_transaction_count(self.account.address, 'pending')
+    
+    async def _fill_nonce_gap(self, nonce: int):
+        """Use up a nonce with a zero-value transfer to ourselves"""
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+        
+        signed_txn = self.account.sign_transaction({
+            'to': self.account.address,
+            'value': 0,
+            'gas': 21000,
+            'gasPrice': await self.w3.eth.gas_price,
+            'nonce': nonce,
+            'chainId': self._chain_id,
+        })
+        await self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    
+    async def _send_transaction(self, function) -> Dict[str, Any]:
+        """
+        Estimate, sign and broadcast a contract call
+        
+        Returns:
+            The submitted transaction: tx_hash, nonce, gas, gas_price and
+            call data (enough to rebroadcast it with a higher fee)
+        """
+        gas_estimate = await function.estimate_gas({'from': self.account.address})
+        gas_price = await self.w3.eth.gas_price
+        
+        for attempt in range(2):
+            nonce = await self.nonces.allocate()
+            try:
+                transaction = await function.build_transaction({
+                    'from': self.account.address,
+                    'gas': gas_estimate,
+                    'gasPrice': gas_price,
+                    'nonce': nonce,
+                })
+                
+                signed_txn = self.account.sign_transaction(transaction)
+            except Exception:
+                # Never reached the node: the nonce is free
+                self.nonces.release(nonce)
+                raise
+            
+            try:
+                tx_hash = await self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            except Exception as e:
+                if "nonce too low" in str(e).lower() and attempt == 0:
+                    # Nonce was used elsewhere (another process, or a replaced tx)
+                    self.nonces.mark_sent(nonce)
+                    await self.nonces.resync()
+                    continue
+                # The node may have accepted it (e.g. a timeout); the chain decides
+                self.nonces.mark_unknown(nonce)
+                raise
+            
+            self.nonces.mark_sent(nonce)
+            return {
+                "tx_hash": tx_hash.hex(),
+                "nonce": nonce,
+                "gas": gas_estimate,
+                "gas_price": gas_price,
+                "data": transaction["data"]
+            }
+    
+    async def rebroadcast(self, nonce: int, data: str, gas: int, gas_price: int) -> str:
+        """
+        Re-sign a contract call with the same nonce and a new gas price
+        
+        Used to replace a transaction that was dropped or is stuck in the
+        mempool; the node only accepts it if gas_price beats the original.
+        """
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+        
+        signed_txn = self.account.sign_transaction({
+            'to': self.contract.address,
+            'data': data,
+            'gas': gas,
+            'gasPrice': gas_price,
+            'nonce': nonce,
+            'chainId': self._chain_id,
+        })
+        tx_hash = await self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        return tx_hash.hex()
+    
+    async def create_escrow_on_chain(self, escrow_id: str, metadata_hash: str, amount: int) -> Optional[Dict[str, Any]]:
         """Create escrow record on blockchain"""
         
-        if not self.contract or not self.account:
+        if not self.enabled:
             print("Blockchain not configured, skipping on-chain creation")
             return None
         
         try:
-            # Build transaction
             function = self.contract.functions.createEscrow(
                 escrow_id,
                 metadata_hash,
                 amount
             )
-            
-            # Get gas estimate
-            gas_estimate = function.estimate_gas({'from': self.account.address})
-            
-            # Build transaction
-            transaction = function.build_transaction({
-                'from': self.account.address,
-                'gas': gas_estimate,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            })
-            
-            # Sign transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, settings.PRIVATE_KEY)
-            
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            return tx_hash.hex()
+            return await self._send_transaction(function)
             
         except Exception as e:
             print(f"Blockchain error: {str(e)}")
             return None
     
-    async def mark_escrow_held(self, escrow_id: str) -> Optional[str]:
+    async def mark_escrow_held(self, escrow_id: str) -> Optional[Dict[str, Any]]:
         """Mark escrow as held on blockchain"""
         
-        if not self.contract or not self.account:
+        if not self.enabled:
             return None
         
         try:
-            function = self.contract.functions.markHeld(escrow_id)
-            
-            gas_estimate = function.estimate_gas({'from': self.account.address})
-            
-            transaction = function.build_transaction({
-                'from': self.account.address,
-                'gas': gas_estimate,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, settings.PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            return tx_hash.hex()
+            return await self._send_transaction(self.contract.functions.markHeld(escrow_id))
             
         except Exception as e:
             print(f"Blockchain error: {str(e)}")
             return None
     
-    async def release_escrow(self, escrow_id: str) -> Optional[str]:
+    async def release_escrow(self, escrow_id: str) -> Optional[Dict[str, Any]]:
         """Release escrow on blockchain"""
         
-        if not self.contract or not self.account:
+        if not self.enabled:
             return None
         
         try:
-            function = self.contract.functions.requestRelease(escrow_id)
+            return await self._send_transaction(self.contract.functions.requestRelease(escrow_id))
             
-            gas_estimate = function.estimate_gas({'from': self.account.address})
-            
-            transaction = function.build_transaction({
-                'from': self.account.address,
-                'gas': gas_estimate,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, settings.PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            return tx_hash.hex()
+        except Exception as e:
+            print(f"Blockchain error: {str(e)}")
+            return None
+    
+    async def anchor_batch(self, root: bytes, count: int) -> Optional[Dict[str, Any]]:
+        """Anchor the Merkle root of a batch of escrow events"""
+        
+        if not self.enabled:
+            return None
+        
+        try:
+            return await self._send_transaction(self.contract.functions.anchorBatch(root, count))
             
         except Exception as e:
             print(f"Blockchain error: {str(e)}")
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.blockchain_log import BlockchainLog
+from app.services.receipt_tracker import submitted_log_values
+
+logger = logging.getLogger(__name__)
+
+
+class ChainOperation:
+    CREATE = "create"        # BlockchainService.create_escrow_on_chain
+    MARK_HELD = "mark_held"  # BlockchainService.mark_escrow_held
+    RELEASE = "release"      # BlockchainService.release_escrow
+
+# Operation -> event type recorded in blockchain_logs
+CHAIN_EVENT_TYPES = {
+    ChainOperation.CREATE: "CREATED",
+    ChainOperation.MARK_HELD: "HELD",
+    ChainOperation.RELEASE: "RELEASED",
+}
+
+# Operation -> BlockchainService coroutine method
+CHAIN_METHODS = {
+    ChainOperation.CREATE: "create_escrow_on_chain",
+    ChainOperation.MARK_HELD: "mark_escrow_held",
+    ChainOperation.RELEASE: "release_escrow",
+}
+
+
+class ChainTransactionWorker:
+    """
+    Runs blockchain anchoring off the request and webhook path.
+
+    `submit` only appends to an in-process queue; worker tasks drain the
+    queue and send the transactions through the shared BlockchainService.
+    A full queue drops the operation with an error log instead of applying
+    backpressure. `execute` queues the same way but waits until the
+    transaction is sent and its blockchain_logs row is written (the outbox
+    uses it, so an anchor is only acknowledged once it is durable).
+    """
+
+    def __init__(self, concurrency: int = 1, max_queue_size: int = 10000):
+        self.concurrency = max(1, concurrency)
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+        self.dropped = 0
+        self.in_flight = 0
+
+    def submit(self, operation: str, escrow_id: str, **kwargs: Any) -> bool:
+        """
+        Queue a chain operation without waiting for it
+
+        Args:
+            operation: One of ChainOperation
+            escrow_id: Escrow the operation anchors
+            **kwargs: Extra arguments for the BlockchainService method
+
+        Returns:
+            True if queued, False if the queue is full or not running
+        """
+        return self._enqueue(operation, escrow_id, kwargs, None)
+
+    async def execute(self, operation: str, escrow_id: str, **kwargs: Any):
+        """
+        Queue a chain operation and wait until its transaction is recorded
+
+        Returns once the blockchain_logs row exists (or right away if the
+        blockchain is not configured).
+
+        Raises:
+            RuntimeError: Not queued (full or not running) or not sent
+        """
+        done = asyncio.get_running_loop().create_future()
+        if not self._enqueue(operation, escrow_id, kwargs, done):
+            raise RuntimeError(f"Chain {operation} for escrow {escrow_id} not queued")
+        await done
+
+    def _enqueue(self, operation: str, escrow_id: str, kwargs: Dict[str, Any],
+                 done: Optional[asyncio.Future]) -> bool:
+        if operation not in CHAIN_METHODS:
+            raise ValueError(f"Unknown chain operation: {operation}")
+
+        if self._queue is None:
+            logger.warning(f"Chain worker not running, dropping {operation} for escrow {escrow_id}")
+            self.dropped += 1
+            return False
+
+        try:
+            self._queue.put_nowait((operation, escrow_id, kwargs, done))
+        except asyncio.QueueFull:
+            logger.error(f"Chain queue full, dropping {operation} for escrow {escrow_id}")
+            self.dropped += 1
+            return False
+
+        self.submitted += 1
+        return True
+
+    def start(self):
+        """Spawn the workers on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"chain-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"Chain transaction worker started with {self.concurrency} workers")
+
+    async def stop(self):
+        """Stop the workers; operations still queued are logged and dropped (waiters fail)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._queue is not None and not self._queue.empty():
+            logger.warning(f"Dropping {self._queue.qsize()} queued chain operations on shutdown")
+            while not self._queue.empty():
+                _, _, _, done = self._queue.get_nowait()
+                self._settle(done, RuntimeError("Chain worker stopped"))
+        self._queue = None
+
+    @staticmethod
+    def _settle(done: Optional[asyncio.Future], error: Optional[BaseException] = None):
+        if done is None or done.done():
+            return
+        if error is None:
+            done.set_result(None)
+        else:
+            done.set_exception(error)
+
+    async def _worker(self, index: int):
+        while True:
+            operation, escrow_id, kwargs, done = await self._queue.get()
+            self.in_flight += 1
+            try:
+                await self._run(operation, escrow_id, kwargs)
+                self._settle(done)
+            except asyncio.CancelledError:
+                self._settle(done, RuntimeError("Chain worker stopped"))
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Chain worker {index}: {operation} failed for escrow {escrow_id}: {e}")
+                self._settle(done, e)
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    async def _run(self, operation: str, escrow_id: str, kwargs: Dict[str, Any]):
+        from app.services.registry import services
+
+        method = getattr(services.blockchain, CHAIN_METHODS[operation])
+        tx = await method(escrow_id, **kwargs)
+        if not tx:
+            if services.blockchain.enabled:
+                # BlockchainService logs the cause and returns None
+                raise RuntimeError(f"Chain {operation} for escrow {escrow_id} was not sent")
+            self.skipped += 1
+            return
+
+        self.sent += 1
+        logger.info(f"Chain {operation} sent for escrow {escrow_id}: {tx['tx_hash']}")
+
+        # Recorded for the receipt tracker
+        async with AsyncSessionLocal() as db:
+            db.add(BlockchainLog(
+                escrow_id=escrow_id,
+                event_type=CHAIN_EVENT_TYPES[operation],
+                payload_json={"operation": operation},
+                **submitted_log_values(tx)
+            ))
+            await db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue and worker counters"""
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "dropped": self.dropped
+        }
+
+
+# Global chain transaction worker instance
+chain_worker = ChainTransactionWorker(
+    concurrency=settings.BLOCKCHAIN_WORKER_CONCURRENCY,
+    max_queue_size=settings.BLOCKCHAIN_QUEUE_MAX_SIZE
+)
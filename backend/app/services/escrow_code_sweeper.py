@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.escrow import Escrow, EscrowStatus
+
+logger = logging.getLogger(__name__)
+
+# Funded escrows keep their code past expires_at: it is still needed to settle them
+FUNDED_ESCROW_STATUSES = [EscrowStatus.HELD, EscrowStatus.DISPUTED]
+
+
+class EscrowCodeSweeper:
+    """
+    Deactivates the join codes of expired, unfunded escrows.
+
+    Codes are unique only among active escrows (partial unique index), so
+    deactivating a code returns it to the pool and the 36^6 code space never
+    fills up. Settled escrows release their code in `update_status`; this
+    loop catches escrows that ran past `expires_at` without being funded
+    (HELD and DISPUTED escrows keep their code until they settle). Each pass updates
+    at most `batch_size` rows, found through the partial index on active
+    codes, so a backlog never holds long row locks.
+    """
+
+    def __init__(self, interval: float = 300.0, batch_size: int = 1000):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+        self.sweeps = 0
+        self.codes_released = 0
+
+    def start(self):
+        """Start the sweep loop on the running event loop"""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="escrow-code-sweeper")
+        logger.info(f"Escrow code sweeper started (interval={self.interval}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                while await self.sweep() == self.batch_size:
+                    pass  # More expired codes waiting
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Escrow code sweep error: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        """
+        Deactivate one batch of expired codes
+
+        Returns:
+            Number of codes released
+        """
+        expired = (
+            select(Escrow.id)
+            .where(
+                Escrow.is_code_active,
+                Escrow.expires_at < func.now(),
+                Escrow.status.notin_(FUNDED_ESCROW_STATUSES)
+            )
+            .limit(self.batch_size)
+            .scalar_subquery()
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Escrow)
+                .where(Escrow.id.in_(expired))
+                .values(is_code_active=False)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        self.sweeps += 1
+        self.codes_released += result.rowcount
+        if result.rowcount:
+            logger.info(f"Released {result.rowcount} expired escrow codes")
+        return result.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "sweeps": self.sweeps,
+            "codes_released": self.codes_released
+        }
+
+
+# Global escrow code sweeper instance
+escrow_code_sweeper = EscrowCodeSweeper(
+    interval=settings.ESCROW_CODE_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.ESCROW_CODE_SWEEP_BATCH_SIZE
+)
@@ -1,24 +1,45 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import load_only
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta, timezone
+import base64
 import logging
 import random
 import string
 
-from app.models.escrow import Escrow, EscrowStatus
+from app.models.escrow import Escrow, EscrowStatus, ACTIVE_ESCROW_STATUSES, ESCROW_TRANSITIONS
 from app.models.confirmation import Confirmation
 from app.models.payment_log import PaymentLog
+from app.models.blockchain_log import BlockchainLog
+from app.models.outbox_event import OutboxEvent, OutboxEventType
 from app.schemas.escrow import EscrowCreate
 from app.services.setu_service import SetuService
 from app.services.blockchain_service import BlockchainService
+from app.services.chain_queue import chain_worker, ChainOperation, CHAIN_EVENT_TYPES
+from app.services.anchor_batcher import anchor_batcher
 from app.services.razorpay_service import RazorpayService
+from app.services.registry import services
+from app.services.escrow_stats_service import EscrowStatsRollup
 from app.services.websocket_manager import manager
+from app.services.outbox import add_outbox_event, outbox_dispatcher
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
 
+# Columns loaded for the compact escrow list (see EscrowSummary)
+ESCROW_SUMMARY_COLUMNS = [
+    Escrow.id, Escrow.payer_id, Escrow.payee_id, Escrow.payee_vpa,
+    Escrow.amount, Escrow.currency, Escrow.status, Escrow.escrow_code,
+    Escrow.escrow_name, Escrow.is_code_active, Escrow.description, Escrow.created_at
+]
+
+# Fresh codes tried per escrow before giving up (collisions only hit active codes)
+ESCROW_CODE_MAX_ATTEMPTS = 10
+
 # Random escrow names for friendly identification
 ESCROW_NAMES = [
     "Swift Eagle", "Golden Phoenix", "Silver Hawk", "Blue Falcon", "Red Dragon",
@@ -29,65 +50,189 @@ ESCROW_NAMES = [
     "Amber Viper", "Coral Serpent", "Ivory Mongoose", "Onyx Badger", "Quartz Otter"
 ]
 
+class EscrowTransitionError(ValueError):
+    """The requested status change is not in ESCROW_TRANSITIONS"""
+
+
+class EscrowConflictError(EscrowTransitionError):
+    """The escrow's status or version changed since it was read"""
+
+
 class EscrowService:
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        blockchain_service: Optional[BlockchainService] = None,
+        razorpay_service: Optional[RazorpayService] = None
+    ):
         self.db = db
-        self.blockchain_service = BlockchainService()
-        self.razorpay_service = RazorpayService()
+        # Reuse the process-wide clients instead of rebuilding them per request
+        self.blockchain_service = blockchain_service or services.blockchain
+        self.razorpay_service = razorpay_service or services.razorpay
+        self.stats_rollup = EscrowStatsRollup(db)
+    
+    def _anchor(self, escrow: Escrow, operation: str, occurred_at: Optional[datetime] = None):
+        """Stage on-chain anchoring of a state transition (delivered via the outbox)"""
+        add_outbox_event(self.db, OutboxEventType.ANCHOR, escrow.id, {
+            "operation": operation,
+            "amount": escrow.amount,
+            "currency": escrow.currency,
+            "occurred_at": (occurred_at or datetime.now(timezone.utc)).isoformat()
+        })
+    
+    async def _commit(self):
+        """Commit the state change with its outbox events and wake the dispatcher"""
+        await self.db.commit()
+        outbox_dispatcher.notify()
+    
+    async def get_anchor_proofs(self, escrow_id: UUID) -> List[Dict[str, Any]]:
+        """
+        Merkle inclusion proofs for an escrow's batch-anchored events
+        
+        Args:
+            escrow_id: Escrow UUID
+            
+        Returns:
+            One entry per anchored event, oldest first
+        """
+        result = await self.db.execute(
+            select(BlockchainLog)
+            .where(BlockchainLog.escrow_id == escrow_id)
+            .order_by(BlockchainLog.created_at)
+        )
+        proofs = []
+        for log in result.scalars().all():
+            payload = log.payload_json or {}
+            if "batch_root" not in payload:
+                continue
+            proofs.append({
+                "event_type": log.event_type,
+                "tx_hash": log.tx_hash,
+                "block_number": log.block_number,
+                "status": log.status,
+                "event": payload["event"],
+                "leaf": payload["leaf"],
+                "proof": payload["proof"],
+                "root": payload["batch_root"],
+                "batch_size": payload["batch_size"]
+            })
+        return proofs
     
     def _generate_escrow_code(self) -> str:
         """Generate a unique 6-character alphanumeric escrow code (e.g., 67A9G2)"""
         characters = string.ascii_uppercase + string.digits
         return ''.join(random.choices(characters, k=6))
     
-    async def _get_unique_escrow_code(self) -> str:
-        """Generate a unique escrow code that doesn't exist in database"""
-        max_attempts = 10
-        for _ in range(max_attempts):
-            code = self._generate_escrow_code()
-            # Check if code already exists
-            result = await self.db.execute(
-                select(Escrow).where(Escrow.escrow_code == code)
+    async def _insert_with_unique_code(self, values: Dict[str, Any]) -> Escrow:
+        """
+        Insert an escrow under a freshly generated code
+        
+        The insert itself claims the code: ON CONFLICT DO NOTHING against the
+        partial unique index on active codes returns no row on a collision,
+        and another code is tried. No pre-check query is needed, and the
+        transaction stays usable after a collision.
+        """
+        for _ in range(ESCROW_CODE_MAX_ATTEMPTS):
+            stmt = (
+                pg_insert(Escrow)
+                .values(escrow_code=self._generate_escrow_code(), **values)
+                .on_conflict_do_nothing(
+                    index_elements=[Escrow.escrow_code],
+                    index_where=Escrow.is_code_active
+                )
+                .returning(Escrow)
             )
-            if not result.scalar_one_or_none():
-                return code
+            escrow = (await self.db.scalars(stmt)).first()
+            if escrow is not None:
+                return escrow
         raise Exception("Failed to generate unique escrow code after multiple attempts")
     
     def _generate_escrow_name(self) -> str:
         """Generate a random friendly name for the escrow"""
         return random.choice(ESCROW_NAMES)
     
-    async def _notify_escrow_update(self, escrow: Escrow, event_type: str = "status_change"):
-        """Send WebSocket notification for escrow updates"""
-        try:
-            update_data = {
-                "escrow_id": str(escrow.id),
-                "status": escrow.status.value,
-                "amount": float(escrow.amount),
-                "event_type": event_type,
-                "payee_id": str(escrow.payee_id) if escrow.payee_id else None,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
+    async def update_status(self, escrow: Escrow, new_status: EscrowStatus, **values: Any) -> bool:
+        """
+        Move an escrow to a new status with one compare-and-swap UPDATE
+        
+        The row only changes if it still has the status and version the
+        escrow was read with, so concurrent webhooks, confirmations and
+        workers can't both win a transition, and no row is locked up front.
+        Re-entering the current status only applies `values`. The analytics
+        rollup and the WebSocket notification are written in the same
+        transaction; the caller is responsible for committing.
+        
+        Args:
+            escrow: Escrow as read by the caller (refreshed in place)
+            new_status: Target status, allowed by ESCROW_TRANSITIONS
+            **values: Other columns to set in the same statement
             
-            await manager.broadcast_escrow_update(str(escrow.id), update_data)
-        except Exception as e:
-            logger.error(f"Error sending WebSocket notification: {e}")
+        Returns:
+            True if the status changed, False if it already was new_status
+            
+        Raises:
+            EscrowTransitionError: The transition is not allowed
+            EscrowConflictError: The escrow changed since it was read
+        """
+        old_status = escrow.status
+        changed = old_status != new_status
+        if changed and new_status not in ESCROW_TRANSITIONS[old_status]:
+            raise EscrowTransitionError(
+                f"Cannot move escrow from {old_status.value} to {new_status.value}"
+            )
+        if changed and new_status not in ACTIVE_ESCROW_STATUSES:
+            # Settled escrows can't be joined; free the code for reuse
+            values["is_code_active"] = False
+        
+        # Pending attribute changes must not be flushed after we read the version
+        await self.db.flush()
+        result = await self.db.scalars(
+            update(Escrow)
+            .where(
+                Escrow.id == escrow.id,
+                Escrow.status == old_status,
+                Escrow.version == escrow.version
+            )
+            .values(status=new_status, version=Escrow.version + 1, **values)
+            .returning(Escrow)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        if result.one_or_none() is None:
+            raise EscrowConflictError(f"Escrow {escrow.id} was changed concurrently; reload and retry")
+        
+        if changed:
+            await self.stats_rollup.record_status_change(escrow, old_status, new_status)
+            self._notify_escrow_update(escrow)
+        return changed
+    
+    def _notify_escrow_update(self, escrow: Escrow, event_type: str = "status_change"):
+        """Stage a WebSocket notification for escrow updates (delivered after commit)"""
+        add_outbox_event(self.db, OutboxEventType.NOTIFY, escrow.id, {
+            "escrow_id": str(escrow.id),
+            "status": escrow.status.value,
+            "amount": float(escrow.amount),
+            "event_type": event_type,
+            "payee_id": str(escrow.payee_id) if escrow.payee_id else None,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        })
     
     async def create_escrow(self, payer_id: UUID, escrow_data: EscrowCreate) -> Tuple[Escrow, Dict[str, Any]]:
         """
         Create a new escrow transaction and generate Razorpay payment order
         
+        The escrow, its rollup counts and its PaymentLog are written in one
+        transaction; the commit hands the pooled connection back before the
+        gateway call, and the gateway result is then applied with a single
+        UPDATE ... RETURNING.
+        
         Returns:
             Tuple of (escrow_object, razorpay_order_data)
         """
+        now = datetime.now(timezone.utc)
         
         try:
-            # Generate unique escrow code and name
-            escrow_code = await self._get_unique_escrow_code()
-            escrow_name = self._generate_escrow_name()
-            
-            # Create escrow record
-            escrow = Escrow(
+            # Create escrow record (the code is allocated by the insert)
+            escrow = await self._insert_with_unique_code(dict(
                 payer_id=payer_id,
                 payee_vpa=escrow_data.payee_vpa,
                 amount=escrow_data.amount,
@@ -96,22 +241,30 @@ class EscrowService:
                 order_id=escrow_data.order_id,
                 condition=escrow_data.condition,
                 status=EscrowStatus.INITIATED,
-                escrow_code=escrow_code,
-                escrow_name=escrow_name,
+                escrow_name=self._generate_escrow_name(),
                 is_code_active=True,
-                expires_at=datetime.now(timezone.utc) + timedelta(days=7),  # 7 days expiry
-                payment_initiated_at=datetime.now(timezone.utc)
+                created_at=now,
+                expires_at=now + timedelta(days=7),  # 7 days expiry
+                payment_initiated_at=now
+            ))
+            await self.stats_rollup.record_created(escrow)
+            
+            # Payment log starts as initiated; the gateway result is filled in below
+            payment_log = PaymentLog(
+                escrow_id=escrow.id,
+                event_type="payment",
+                event_status="initiated",
+                amount=escrow_data.amount,
+                currency=escrow_data.currency
             )
+            self.db.add(payment_log)
+            await self.db.commit()
         except Exception as e:
-            logger.error(f"Error creating escrow object: {e}")
+            logger.error(f"Error creating escrow: {e}")
+            await self.db.rollback()
             raise
         
-        self.db.add(escrow)
-        await self.db.commit()
-        await self.db.refresh(escrow)
-        
-        # Create Razorpay payment order
-        razorpay_order = None
+        # Create Razorpay payment order (no database connection held)
         try:
             razorpay_order = await self.razorpay_service.create_payment_order(
                 amount=escrow_data.amount,
@@ -124,47 +277,18 @@ class EscrowService:
                     "description": escrow_data.description or "Escrow payment"
                 }
             )
-            
-            # Update escrow with Razorpay order ID
-            escrow.razorpay_order_id = razorpay_order.get("id")
-            escrow.status = EscrowStatus.INITIATED
-            
-            # Create payment log
-            payment_log = PaymentLog(
-                escrow_id=escrow.id,
-                event_type="payment",
-                event_status="initiated",
-                razorpay_id=razorpay_order.get("id"),
-                razorpay_order_id=razorpay_order.get("id"),
-                amount=escrow_data.amount,
-                currency=escrow_data.currency
-            )
-            self.db.add(payment_log)
-            
-            await self.db.commit()
-            await self.db.refresh(escrow)
-            
+            escrow_values = {"razorpay_order_id": razorpay_order.get("id")}
+            log_values = {
+                "razorpay_id": razorpay_order.get("id"),
+                "razorpay_order_id": razorpay_order.get("id")
+            }
             logger.info(f"Escrow created with Razorpay order: escrow_id={escrow.id}, order_id={razorpay_order.get('id')}")
             
         except Exception as e:
             # Handle Razorpay API error
             logger.error(f"Razorpay API error: {e}")
-            escrow.status = EscrowStatus.INITIATED
-            escrow.last_payment_error = str(e)
-            
-            # Create payment log for failure
-            payment_log = PaymentLog(
-                escrow_id=escrow.id,
-                event_type="payment",
-                event_status="failed",
-                amount=escrow_data.amount,
-                currency=escrow_data.currency,
-                error_message=str(e)
-            )
-            self.db.add(payment_log)
-            
-            await self.db.commit()
-            await self.db.refresh(escrow)
+            escrow_values = {"last_payment_error": str(e)}
+            log_values = {"event_status": "failed", "error_message": str(e)}
             
             # Return escrow with empty order data
             razorpay_order = {
@@ -172,15 +296,40 @@ class EscrowService:
                 "message": "Payment order creation failed. Please try again."
             }
         
-        # Ensure all attributes are loaded
-        await self.db.refresh(escrow)
+        escrow = await self._apply_payment_order(escrow.id, payment_log.id, escrow_values, log_values)
         
         # Add Razorpay key to the payment order response for frontend
-        if razorpay_order and "error" not in razorpay_order:
+        if "error" not in razorpay_order:
             razorpay_order["key"] = settings.RAZORPAY_KEY_ID
         
         return escrow, razorpay_order
     
+    async def _apply_payment_order(
+        self,
+        escrow_id: UUID,
+        payment_log_id: UUID,
+        escrow_values: Dict[str, Any],
+        log_values: Dict[str, Any]
+    ) -> Escrow:
+        """Update the escrow and its payment log in one statement and return the fresh escrow"""
+        log_update = (
+            update(PaymentLog)
+            .where(PaymentLog.id == payment_log_id)
+            .values(**log_values)
+            .cte("payment_log_update")
+        )
+        stmt = (
+            update(Escrow)
+            .add_cte(log_update)
+            .where(Escrow.id == escrow_id)
+            .values(**escrow_values)
+            .returning(Escrow)
+            .execution_options(populate_existing=True)
+        )
+        escrow = (await self.db.scalars(stmt)).one()
+        await self.db.commit()
+        return escrow
+    
     async def get_escrow(self, escrow_id: UUID) -> Optional[Escrow]:
         """Get escrow by ID"""
         result = await self.db.execute(
@@ -188,10 +337,88 @@ class EscrowService:
         )
         return result.scalar_one_or_none()
     
-    async def get_user_escrows(self, user_id: UUID, user_vpa: str = None) -> List[Escrow]:
-        """Get all escrows for a user (as payer or payee)"""
-        from sqlalchemy import or_
+    @staticmethod
+    def _party_filter(user_id: UUID, user_vpa: Optional[str] = None):
+        """WHERE clause matching escrows the user is a party to"""
+        conditions = [Escrow.payer_id == user_id, Escrow.payee_id == user_id]
+        if user_vpa:
+            conditions.append(Escrow.payee_vpa == user_vpa)
+        return or_(*conditions)
+    
+    async def get_active_escrow_ids(self, user_id: UUID, user_vpa: Optional[str] = None) -> List[UUID]:
+        """Ids of the user's active escrows (served by the partial active indexes)"""
+        result = await self.db.execute(
+            select(Escrow.id).where(
+                self._party_filter(user_id, user_vpa),
+                Escrow.status.in_(ACTIVE_ESCROW_STATUSES)
+            )
+        )
+        return list(result.scalars().all())
+    
+    async def filter_party_escrow_ids(
+        self,
+        user_id: UUID,
+        escrow_ids: List[UUID],
+        user_vpa: Optional[str] = None
+    ) -> List[UUID]:
+        """
+        Keep only the escrows the user is a party to
         
+        Args:
+            user_id: User UUID
+            escrow_ids: Candidate escrow ids
+            user_vpa: User's VPA (payee match before the payee joined)
+            
+        Returns:
+            The subset of escrow_ids the user may see, in one query
+        """
+        if not escrow_ids:
+            return []
+        result = await self.db.execute(
+            select(Escrow.id).where(
+                Escrow.id.in_(escrow_ids),
+                self._party_filter(user_id, user_vpa)
+            )
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    def encode_cursor(escrow: Escrow) -> str:
+        """Build an opaque keyset cursor pointing just after this escrow"""
+        raw = f"{escrow.created_at.isoformat()}|{escrow.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+        """Parse a cursor produced by encode_cursor"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            created_at, escrow_id = raw.split("|", 1)
+            return datetime.fromisoformat(created_at), UUID(escrow_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
+    async def get_user_escrows(
+        self,
+        user_id: UUID,
+        user_vpa: str = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        summary: bool = False
+    ) -> List[Escrow]:
+        """
+        Get escrows for a user (as payer or payee), newest first
+        
+        Args:
+            user_id: User UUID
+            user_vpa: User's VPA, to include escrows where they are the payee
+            limit: Page size (None for all escrows)
+            cursor: Keyset cursor from a previous page (see encode_cursor)
+            summary: Load only the columns used by EscrowSummary
+            
+        Returns:
+            List of escrows ordered by (created_at, id) descending
+        """
         # Build query to find escrows where user is payer OR payee
         conditions = [Escrow.payer_id == user_id]
         
@@ -199,16 +426,31 @@ class EscrowService:
         if user_vpa:
             conditions.append(Escrow.payee_vpa == user_vpa)
         
-        result = await self.db.execute(
-            select(Escrow).where(or_(*conditions)).order_by(Escrow.created_at.desc())
-        )
+        query = select(Escrow).where(or_(*conditions))
+        
+        if cursor:
+            created_at, escrow_id = self.decode_cursor(cursor)
+            query = query.where(tuple_(Escrow.created_at, Escrow.id) < tuple_(created_at, escrow_id))
+        
+        if summary:
+            query = query.options(load_only(*ESCROW_SUMMARY_COLUMNS))
+        
+        query = query.order_by(Escrow.created_at.desc(), Escrow.id.desc())
+        
+        if limit is not None:
+            query = query.limit(limit)
+        
+        result = await self.db.execute(query)
         return list(result.scalars().all())
     
     async def join_escrow_by_code(self, user_id: UUID, user_vpa: str, escrow_code: str) -> Escrow:
         """Join an escrow using its code"""
-        # Find escrow by code
+        # Find escrow by code; codes are reused, so prefer the active holder
         result = await self.db.execute(
-            select(Escrow).where(Escrow.escrow_code == escrow_code)
+            select(Escrow)
+            .where(Escrow.escrow_code == escrow_code)
+            .order_by(Escrow.is_code_active.desc(), Escrow.created_at.desc())
+            .limit(1)
         )
         escrow = result.scalar_one_or_none()
         
@@ -232,14 +474,21 @@ class EscrowService:
             should_update = True
             
         if escrow.payee_id != user_id:
+            previous_payee_id = escrow.payee_id
             escrow.payee_id = user_id
             should_update = True
             
+            # Move the escrow into the joining user's analytics
+            if previous_payee_id is not None and previous_payee_id != escrow.payer_id:
+                await self.stats_rollup.record_participant_removed(escrow, previous_payee_id)
+            if user_id != escrow.payer_id:
+                await self.stats_rollup.record_participant_added(escrow, user_id)
+            
         if should_update:
-            await self.db.commit()
-            await self.db.refresh(escrow)
             # Notify that participant has joined
-            await self._notify_escrow_update(escrow, event_type="participant_joined")
+            self._notify_escrow_update(escrow, event_type="participant_joined")
+            await self._commit()
+            await self.db.refresh(escrow)
             
         return escrow
 
@@ -279,6 +528,13 @@ class EscrowService:
                     "message": "Both parties confirmed. Payout initiated.",
                     "status": "releasing"
                 }
+            except EscrowConflictError:
+                # The other party's confirmation released it first
+                await self.db.rollback()
+                return {
+                    "message": "Both parties confirmed. Payout initiated.",
+                    "status": "releasing"
+                }
             except Exception as e:
                 logger.error(f"Failed to initiate payout for escrow {escrow_id}: {e}")
                 return {
@@ -296,8 +552,8 @@ class EscrowService:
         if not escrow:
             raise ValueError("Escrow not found")
         
-        escrow.status = EscrowStatus.DISPUTED
-        await self.db.commit()
+        await self.update_status(escrow, EscrowStatus.DISPUTED)
+        await self._commit()
         
         return {"message": "Dispute raised successfully", "escrow_id": str(escrow_id)}
 
@@ -323,12 +579,26 @@ class EscrowService:
         if not escrow:
             raise ValueError(f"Escrow not found: {escrow_id}")
         
+        if escrow.razorpay_payment_id == payment_id and escrow.status != EscrowStatus.INITIATED:
+            logger.info(f"Payment {payment_id} already applied to escrow {escrow_id}")
+            return escrow
+        
         try:
             # Update escrow status to HELD
-            escrow.status = EscrowStatus.HELD
-            escrow.razorpay_payment_id = payment_id
-            escrow.payment_completed_at = datetime.now(timezone.utc)
-            escrow.last_payment_error = None  # Clear any previous errors
+            try:
+                await self.update_status(
+                    escrow,
+                    EscrowStatus.HELD,
+                    razorpay_payment_id=payment_id,
+                    payment_completed_at=datetime.now(timezone.utc),
+                    last_payment_error=None  # Clear any previous errors
+                )
+            except EscrowConflictError:
+                raise  # Transient; the webhook is retried against the new state
+            except EscrowTransitionError:
+                if escrow.status not in (EscrowStatus.REFUNDED, EscrowStatus.EXPIRED):
+                    raise
+                return await self._refund_late_payment(escrow, payment_id, order_id)
             
             # Create payment log
             payment_log = PaymentLog(
@@ -342,16 +612,11 @@ class EscrowService:
             )
             self.db.add(payment_log)
             
-            await self.db.commit()
-            await self.db.refresh(escrow)
+            # Record on blockchain (via the outbox; never gates the payment on RPC latency)
+            self._anchor(escrow, ChainOperation.MARK_HELD, escrow.payment_completed_at)
             
-            # Record on blockchain
-            try:
-                await self.blockchain_service.mark_escrow_held(str(escrow_id))
-                logger.info(f"Blockchain updated for escrow {escrow_id}")
-            except Exception as e:
-                logger.error(f"Blockchain update failed for escrow {escrow_id}: {e}")
-                # Don't fail the payment if blockchain update fails
+            await self._commit()
+            await self.db.refresh(escrow)
             
             logger.info(f"Payment successful for escrow {escrow_id}: payment_id={payment_id}")
             return escrow
@@ -360,6 +625,42 @@ class EscrowService:
             logger.error(f"Error handling payment success for escrow {escrow_id}: {e}")
             raise
 
+    async def _refund_late_payment(self, escrow: Escrow, payment_id: str, order_id: str) -> Escrow:
+        """
+        Return a payment captured after the escrow was cancelled or expired
+        
+        The escrow can no longer hold the money, so retrying the webhook
+        would only dead-letter it. The payment is recorded and a full refund
+        is staged through the outbox in the same transaction instead.
+        """
+        now = datetime.now(timezone.utc)
+        values: Dict[str, Any] = {}
+        if not escrow.razorpay_payment_id:
+            values.update(razorpay_payment_id=payment_id, payment_completed_at=now)
+        await self.update_status(escrow, EscrowStatus.REFUNDED, **values)
+        
+        payment_log = PaymentLog(
+            escrow_id=escrow.id,
+            event_type="payment",
+            event_status="success",
+            razorpay_id=payment_id,
+            razorpay_order_id=order_id,
+            amount=escrow.amount,
+            currency=escrow.currency
+        )
+        self.db.add(payment_log)
+        
+        add_outbox_event(self.db, OutboxEventType.REFUND, escrow.id, {
+            "amount": None,  # Full refund
+            "reason": "Payment captured after the escrow was closed",
+            "payment_id": payment_id
+        })
+        await self._commit()
+        await self.db.refresh(escrow)
+        
+        logger.warning(f"Payment {payment_id} captured for closed escrow {escrow.id}; refund queued")
+        return escrow
+
     async def release_funds(
         self,
         escrow_id: UUID,
@@ -394,22 +695,47 @@ class EscrowService:
         if len(confirmations) < 2:
             raise ValueError("Both parties must confirm before releasing funds")
         
+        # Update status to RELEASING (only one concurrent caller can win this)
+        await self.update_status(  # Will be updated to RELEASED after payout success
+            escrow,
+            EscrowStatus.RELEASED,
+            payout_initiated_at=datetime.now(timezone.utc)
+        )
+        
+        # The Razorpay payout runs from the outbox once this commits
+        event = add_outbox_event(self.db, OutboxEventType.PAYOUT, escrow.id, {
+            "payee_upi": payee_upi,
+            "account_number": account_number
+        })
+        await self._commit()
+        
+        logger.info(f"Payout queued for escrow {escrow_id}: outbox_event={event.id}")
+        return {"status": "queued", "escrow_id": str(escrow_id), "outbox_event_id": str(event.id)}
+    
+    async def execute_payout(self, event: OutboxEvent):
+        """
+        Create the Razorpay payout staged by release_funds (outbox handler)
+        
+        The outbox event id is the payout idempotency key, so a retried or
+        re-claimed event can't pay out twice. Failures are recorded on the
+        escrow and re-raised for the dispatcher to retry.
+        """
+        escrow = await self.get_escrow(event.escrow_id)
+        if not escrow:
+            raise ValueError(f"Escrow not found: {event.escrow_id}")
+        
         try:
-            # Update status to RELEASING
-            escrow.status = EscrowStatus.RELEASED  # Will be updated to RELEASED after payout success
-            escrow.payout_initiated_at = datetime.now(timezone.utc)
-            
-            # Create payout via Razorpay
             # Note: In production, you'll need a valid Razorpay account number
             # For now, we'll use a placeholder or the one from settings
             payout = await self.razorpay_service.create_payout(
-                account_number=account_number or "default_account",  # Replace with actual account
+                account_number=event.payload.get("account_number") or "default_account",  # Replace with actual account
                 amount=escrow.amount,
                 currency=escrow.currency,
                 mode="UPI",
-                payee_vpa=payee_upi,
+                payee_vpa=event.payload["payee_upi"],
                 reference_id=f"escrow_{escrow.id}",
-                narration=f"Escrow release: {escrow.description or escrow.id}"
+                narration=f"Escrow release: {escrow.description or escrow.id}",
+                idempotency_key=str(event.id)
             )
             
             # Update escrow with payout ID
@@ -427,13 +753,11 @@ class EscrowService:
             self.db.add(payment_log)
             
             await self.db.commit()
-            await self.db.refresh(escrow)
             
-            logger.info(f"Payout initiated for escrow {escrow_id}: payout_id={payout.get('id')}")
-            return payout
+            logger.info(f"Payout initiated for escrow {escrow.id}: payout_id={payout.get('id')}")
             
         except Exception as e:
-            logger.error(f"Error initiating payout for escrow {escrow_id}: {e}")
+            logger.error(f"Error initiating payout for escrow {escrow.id}: {e}")
             
             # Update error tracking
             escrow.last_payment_error = str(e)
@@ -475,10 +799,13 @@ class EscrowService:
         
         try:
             # Update escrow status to RELEASED
-            escrow.status = EscrowStatus.RELEASED
-            escrow.razorpay_payout_id = payout_id
-            escrow.payout_completed_at = datetime.now(timezone.utc)
-            escrow.last_payment_error = None  # Clear any previous errors
+            await self.update_status(
+                escrow,
+                EscrowStatus.RELEASED,
+                razorpay_payout_id=payout_id,
+                payout_completed_at=datetime.now(timezone.utc),
+                last_payment_error=None  # Clear any previous errors
+            )
             
             # Create payment log
             payment_log = PaymentLog(
@@ -491,16 +818,11 @@ class EscrowService:
             )
             self.db.add(payment_log)
             
-            await self.db.commit()
-            await self.db.refresh(escrow)
+            # Record on blockchain (via the outbox; never gates the payout on RPC latency)
+            self._anchor(escrow, ChainOperation.RELEASE, escrow.payout_completed_at)
             
-            # Record on blockchain
-            try:
-                await self.blockchain_service.release_escrow(str(escrow_id))
-                logger.info(f"Blockchain updated for escrow release {escrow_id}")
-            except Exception as e:
-                logger.error(f"Blockchain update failed for escrow {escrow_id}: {e}")
-                # Don't fail the payout if blockchain update fails
+            await self._commit()
+            await self.db.refresh(escrow)
             
             logger.info(f"Payout successful for escrow {escrow_id}: payout_id={payout_id}")
             return escrow
@@ -537,20 +859,88 @@ class EscrowService:
         if escrow.status == EscrowStatus.REFUNDED:
             raise ValueError("Escrow already refunded")
         
+        await self.update_status(escrow, EscrowStatus.REFUNDED)
+        
+        # The Razorpay refund runs from the outbox once this commits
+        event = add_outbox_event(self.db, OutboxEventType.REFUND, escrow.id, {
+            "amount": amount,  # None for full refund
+            "reason": reason
+        })
+        await self._commit()
+        
+        logger.info(f"Refund queued for escrow {escrow_id}: outbox_event={event.id}")
+        
+        # TODO: Send notification to payer about refund
+        
+        return {"status": "queued", "escrow_id": str(escrow_id), "outbox_event_id": str(event.id)}
+    
+    async def cancel_escrow(self, escrow_id: UUID, reason: str) -> Dict[str, Any]:
+        """
+        Cancel an escrow, refunding the payer if a payment was made
+        
+        Args:
+            escrow_id: Escrow UUID
+            reason: Reason for cancellation
+            
+        Returns:
+            Cancellation result
+        """
+        escrow = await self.get_escrow(escrow_id)
+        
+        if not escrow:
+            raise ValueError(f"Escrow not found: {escrow_id}")
+        
+        if escrow.razorpay_payment_id:
+            refund = await self.process_refund(escrow_id=escrow_id, reason=reason)
+            return {
+                "message": "Escrow cancelled and refund initiated",
+                "escrow_id": str(escrow_id),
+                "refund_status": refund["status"],  # Razorpay refund id follows on the escrow
+                "status": "refunded"
+            }
+        
+        # No payment made, just cancel
+        await self.update_status(escrow, EscrowStatus.REFUNDED)
+        await self._commit()
+        
+        logger.info(f"Escrow {escrow_id} cancelled before payment: {reason}")
+        return {
+            "message": "Escrow cancelled (no payment to refund)",
+            "escrow_id": str(escrow_id),
+            "status": "cancelled"
+        }
+    
+    async def execute_refund(self, event: OutboxEvent):
+        """
+        Create the Razorpay refund staged by process_refund (outbox handler)
+        
+        Failures are logged against the escrow and re-raised for the
+        dispatcher to retry.
+        """
+        escrow = await self.get_escrow(event.escrow_id)
+        if not escrow:
+            raise ValueError(f"Escrow not found: {event.escrow_id}")
+        
+        amount = event.payload.get("amount")
+        # Late payments name their own payment; see _refund_late_payment
+        payment_id = event.payload.get("payment_id") or escrow.razorpay_payment_id
+        own_payment = payment_id == escrow.razorpay_payment_id
+        if own_payment and escrow.razorpay_refund_id:
+            return  # Already created by an earlier attempt
+        
         try:
             # Create refund via Razorpay
             refund = await self.razorpay_service.create_refund(
-                payment_id=escrow.razorpay_payment_id,
+                payment_id=payment_id,
                 amount=amount,  # None for full refund
                 notes={
                     "escrow_id": str(escrow.id),
-                    "reason": reason
+                    "reason": event.payload.get("reason")
                 }
             )
             
-            # Update escrow
-            escrow.status = EscrowStatus.REFUNDED
-            escrow.razorpay_refund_id = refund.get("id")
+            if own_payment:
+                escrow.razorpay_refund_id = refund.get("id")
             
             # Create payment log
             payment_log = PaymentLog(
@@ -564,16 +954,12 @@ class EscrowService:
             self.db.add(payment_log)
             
             await self.db.commit()
-            await self.db.refresh(escrow)
-            
-            logger.info(f"Refund initiated for escrow {escrow_id}: refund_id={refund.get('id')}")
             
-            # TODO: Send notification to payer about refund
-            
-            return refund
+            logger.info(f"Refund initiated for escrow {escrow.id}: refund_id={refund.get('id')}")
             
         except Exception as e:
-            logger.error(f"Error processing refund for escrow {escrow_id}: {e}")
+            logger.error(f"Error processing refund for escrow {escrow.id}: {e}")
+            escrow.last_payment_error = str(e)
             
             # Create payment log for failure
             payment_log = PaymentLog(
@@ -644,3 +1030,45 @@ class EscrowService:
                 logger.error(f"All payout retries exhausted for escrow {escrow_id}")
             
             raise
+
+
+async def _deliver_notification(event: OutboxEvent):
+    await manager.broadcast_escrow_update(str(event.escrow_id), event.payload)
+
+
+async def _deliver_anchor(event: OutboxEvent):
+    # Acknowledged only once the transaction's blockchain_logs row exists;
+    # until then a full queue, a failed send or a restart retries the event
+    operation = event.payload["operation"]
+    if settings.BLOCKCHAIN_ANCHOR_MODE == "batch":
+        await anchor_batcher.anchor(
+            event.escrow_id,
+            CHAIN_EVENT_TYPES[operation],
+            event.payload["amount"],
+            event.payload["currency"],
+            datetime.fromisoformat(event.payload["occurred_at"])
+        )
+    else:
+        await chain_worker.execute(operation, str(event.escrow_id))
+
+
+async def _deliver_payout(event: OutboxEvent):
+    async with AsyncSessionLocal() as db:
+        await EscrowService(db).execute_payout(event)
+
+
+async def _deliver_refund(event: OutboxEvent):
+    async with AsyncSessionLocal() as db:
+        await EscrowService(db).execute_refund(event)
+
+
+outbox_dispatcher.register_handler(OutboxEventType.NOTIFY, _deliver_notification, settings.OUTBOX_NOTIFY_CONCURRENCY)
+# A batched anchor waits for its whole window, so a full batch must be able to wait at once
+outbox_dispatcher.register_handler(
+    OutboxEventType.ANCHOR,
+    _deliver_anchor,
+    settings.BLOCKCHAIN_ANCHOR_BATCH_SIZE if settings.BLOCKCHAIN_ANCHOR_MODE == "batch"
+    else settings.OUTBOX_CHAIN_CONCURRENCY
+)
+outbox_dispatcher.register_handler(OutboxEventType.PAYOUT, _deliver_payout, settings.OUTBOX_GATEWAY_CONCURRENCY)
+outbox_dispatcher.register_handler(OutboxEventType.REFUND, _deliver_refund, settings.OUTBOX_GATEWAY_CONCURRENCY)
@@ -0,0 +1,97 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, Optional, Set
+from uuid import UUID
+from datetime import date, datetime, timezone
+
+from app.models.escrow import Escrow, EscrowStatus
+from app.models.user_daily_escrow_stats import UserDailyEscrowStats
+
+# Rollup column holding the count for each status
+STATUS_COLUMNS = {
+    EscrowStatus.INITIATED: "initiated_count",
+    EscrowStatus.HELD: "held_count",
+    EscrowStatus.RELEASED: "released_count",
+    EscrowStatus.REFUNDED: "refunded_count",
+    EscrowStatus.DISPUTED: "disputed_count",
+    EscrowStatus.EXPIRED: "expired_count",
+}
+
+
+class EscrowStatsRollup:
+    """
+    Keeps user_daily_escrow_stats in step with the escrows table.
+
+    Every method only issues upserts on the caller's session, so the rollup
+    change commits (or rolls back) together with the escrow change.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def escrow_day(escrow: Escrow) -> date:
+        """UTC day an escrow is bucketed under"""
+        created_at = escrow.created_at or datetime.now(timezone.utc)
+        return created_at.astimezone(timezone.utc).date()
+
+    @staticmethod
+    def participants(escrow: Escrow) -> Set[UUID]:
+        """Users whose analytics include this escrow (payer and payee)"""
+        return {user_id for user_id in (escrow.payer_id, escrow.payee_id) if user_id is not None}
+
+    async def _apply(self, user_id: UUID, day: date, deltas: Dict[str, int]):
+        # Counters never go below zero: a decrement can hit a day with no row
+        # (or a short one) when the escrow predates the backfill
+        table = UserDailyEscrowStats.__table__
+        stmt = insert(table).values(
+            user_id=user_id,
+            day=day,
+            **{column: max(delta, 0) for column, delta in deltas.items()}
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day],
+            set_={
+                **{column: func.greatest(table.c[column] + delta, 0) for column, delta in deltas.items()},
+                "updated_at": datetime.now(timezone.utc),
+            }
+        )
+        await self.db.execute(stmt)
+
+    def _escrow_deltas(self, escrow: Escrow, sign: int = 1) -> Dict[str, int]:
+        deltas = {"volume": sign * escrow.amount, "count": sign}
+        deltas[STATUS_COLUMNS[escrow.status]] = sign
+        return deltas
+
+    async def record_created(self, escrow: Escrow):
+        """Count a newly created escrow for each participant"""
+        day = self.escrow_day(escrow)
+        for user_id in self.participants(escrow):
+            await self._apply(user_id, day, self._escrow_deltas(escrow))
+
+    async def record_participant_added(self, escrow: Escrow, user_id: UUID):
+        """Count an existing escrow for a user who just became a participant"""
+        await self._apply(user_id, self.escrow_day(escrow), self._escrow_deltas(escrow))
+
+    async def record_participant_removed(self, escrow: Escrow, user_id: UUID):
+        """Stop counting an escrow for a user who is no longer a participant"""
+        await self._apply(user_id, self.escrow_day(escrow), self._escrow_deltas(escrow, sign=-1))
+
+    async def record_status_change(
+        self,
+        escrow: Escrow,
+        old_status: Optional[EscrowStatus],
+        new_status: EscrowStatus
+    ):
+        """Move an escrow between status counters for each participant"""
+        if old_status == new_status:
+            return
+
+        deltas = {STATUS_COLUMNS[new_status]: 1}
+        if old_status is not None:
+            deltas[STATUS_COLUMNS[old_status]] = -1
+
+        day = self.escrow_day(escrow)
+        for user_id in self.participants(escrow):
+            await self._apply(user_id, day, deltas)
@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class NonceManager:
+    """
+    Hands out transaction nonces for one signer without an RPC per send.
+
+    The pending nonce is fetched from the node once; after that nonces are
+    allocated locally, so many transactions can be signed and broadcast
+    concurrently. A nonce whose transaction provably never reached the node
+    is released and reused by the next allocation. A send that failed after
+    the broadcast started (a timeout, say) may or may not have been accepted,
+    so its nonce is only marked unknown and never reused. `resync` re-reads
+    the chain (after "nonce too low", or periodically when idle) and skips
+    past nonces used elsewhere; `check_gaps` does the same while released or
+    unknown nonces are outstanding. If the chain's pending count stops at one
+    of them while higher nonces are out, nothing will ever be mined after it,
+    so the gap is filled with `fill_gap` (a no-op transaction). Other nonces
+    the node doesn't report yet are never handed out again: their
+    transactions may still be pending (or being fee-bumped by the receipt
+    tracker), and reusing them would replace one anchor with another.
+    """
+
+    def __init__(
+        self,
+        fetch_pending_nonce: Callable[[], Awaitable[int]],
+        fill_gap: Optional[Callable[[int], Awaitable[None]]] = None,
+        resync_interval: float = 60.0
+    ):
+        self._fetch = fetch_pending_nonce
+        self._fill_gap = fill_gap
+        self.resync_interval = resync_interval
+
+        self._lock: Optional[asyncio.Lock] = None
+        self._next: Optional[int] = None
+        self._released: List[int] = []  # Min-heap of nonces to reuse first
+        self._reserved: Set[int] = set()  # Allocated, not yet broadcast
+        self._unknown: Set[int] = set()  # Broadcast failed midway; may or may not be pending
+        self._synced_at = 0.0
+
+        self.allocated = 0
+        self.reused = 0
+        self.resyncs = 0
+        self.gaps_filled = 0
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def allocate(self) -> int:
+        """Reserve the next nonce; call `mark_sent` or `release` afterwards"""
+        async with self._get_lock():
+            stale = time.monotonic() - self._synced_at > self.resync_interval
+            if self._next is None or (stale and not self._reserved):
+                await self._sync()
+
+            if self._released:
+                nonce = heapq.heappop(self._released)
+                self.reused += 1
+            else:
+                nonce = self._next
+                self._next += 1
+
+            self._reserved.add(nonce)
+            self.allocated += 1
+            return nonce
+
+    def mark_sent(self, nonce: int):
+        """The transaction using `nonce` was accepted by the node"""
+        self._reserved.discard(nonce)
+
+    def release(self, nonce: int):
+        """The transaction using `nonce` never reached the node; reuse the nonce"""
+        if nonce in self._reserved:
+            self._reserved.discard(nonce)
+            heapq.heappush(self._released, nonce)
+
+    def mark_unknown(self, nonce: int):
+        """The broadcast failed but may have reached the node; let the chain decide"""
+        if nonce in self._reserved:
+            self._reserved.discard(nonce)
+            self._unknown.add(nonce)
+
+    async def resync(self):
+        """Re-read the pending nonce from the node (e.g. after "nonce too low")"""
+        async with self._get_lock():
+            await self._sync()
+
+    async def check_gaps(self):
+        """Resync if released or unknown nonces are outstanding, filling a gap the chain is stuck on"""
+        if not (self._released or self._unknown):
+            return
+        async with self._get_lock():
+            await self._sync()
+
+    async def _sync(self):
+        chain_next = await self._fetch()
+        self._synced_at = time.monotonic()
+        self.resyncs += 1
+
+        # Nonces below the chain's pending count are used, whoever sent them
+        self._released = [n for n in self._released if n >= chain_next]
+        heapq.heapify(self._released)
+        self._unknown = {n for n in self._unknown if n >= chain_next}
+
+        # A lower chain count only means our sends aren't all visible yet
+        if self._next is None or chain_next > self._next:
+            if self._next is not None:
+                logger.warning(f"Nonce resync: chain is ahead ({chain_next} > {self._next})")
+            self._next = chain_next
+            return
+
+        # Stuck on a nonce we know was never (or may not have been) accepted,
+        # with higher ones already out: fill it so those can be mined
+        stuck = chain_next in self._unknown or (self._released and self._released[0] == chain_next)
+        holes = self._unknown.union(self._released)
+        blocking = any(n not in holes for n in range(chain_next + 1, self._next))
+        if stuck and blocking and self._fill_gap is not None:
+            try:
+                await self._fill_gap(chain_next)
+            except Exception as e:
+                logger.error(f"Nonce gap at {chain_next} not filled: {e}")
+                return
+            logger.warning(f"Nonce gap at {chain_next} filled")
+            self._unknown.discard(chain_next)
+            if self._released and self._released[0] == chain_next:
+                heapq.heappop(self._released)
+            self.gaps_filled += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Allocator counters"""
+        return {
+            "next_nonce": self._next,
+            "reserved": len(self._reserved),
+            "reusable": len(self._released),
+            "allocated": self.allocated,
+            "reused": self.reused,
+            "unknown": len(self._unknown),
+            "resyncs": self.resyncs,
+            "gaps_filled": self.gaps_filled
+        }
@@ -0,0 +1,313 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update, delete, exists, func, case, tuple_, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.outbox_event import OutboxEvent, OutboxEventStatus
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[OutboxEvent], Awaitable[None]]
+
+
+def add_outbox_event(
+    db: AsyncSession,
+    event_type: str,
+    escrow_id: Optional[UUID],
+    payload: Dict[str, Any]
+) -> OutboxEvent:
+    """
+    Stage a side effect in the caller's transaction
+
+    The event is written by the caller's commit, together with the state
+    change that caused it, and delivered afterwards by the dispatcher.
+
+    Args:
+        db: Session holding the state change (not committed here)
+        event_type: OutboxEventType, used to pick the handler
+        escrow_id: Escrow the event belongs to
+        payload: JSON-serializable handler input
+
+    Returns:
+        The staged event
+    """
+    event = OutboxEvent(
+        id=uuid.uuid4(),
+        event_type=event_type,
+        escrow_id=escrow_id,
+        payload=payload,
+        status=OutboxEventStatus.PENDING,
+        attempts=0
+    )
+    db.add(event)
+    return event
+
+
+class OutboxDispatcher:
+    """
+    Delivers outbox_events written alongside escrow state changes.
+
+    A single loop claims due events with FOR UPDATE SKIP LOCKED (several app
+    processes can share the table), never more of one type than that type's
+    free concurrency, and hands them to delivery tasks without waiting for
+    them. A slow gateway call therefore only occupies its own type's slots,
+    and other types are refilled as soon as their events are delivered.
+    Events of one escrow and type form a group delivered in creation order;
+    a group stops at its first failure and the rest go back to the queue,
+    where they aren't claimed again until the failed event is delivered or
+    dead. Each group is acknowledged (deleted) as soon as it finishes.
+    Failed events are retried with exponential backoff and kept as dead
+    after `max_attempts`. A claim that outlives its lease is picked up again,
+    so handlers must tolerate running twice.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        poll_interval: float = 0.5,
+        max_attempts: int = 8,
+        lease_seconds: float = 60.0
+    ):
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+
+        self._handlers: Dict[str, Tuple[OutboxHandler, int]] = {}
+        self._claimed: Dict[str, int] = defaultdict(int)  # Per type, claimed and not yet finished
+        self._groups: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.batches = 0
+        self.delivered: Dict[str, int] = defaultdict(int)
+        self.failed: Dict[str, int] = defaultdict(int)
+        self.dead_lettered = 0
+        self.in_flight = 0
+
+    def register_handler(self, event_type: str, handler: OutboxHandler, concurrency: int = 1):
+        """Register the coroutine that delivers events of a type, and how many may be claimed at once"""
+        self._handlers[event_type] = (handler, max(1, concurrency))
+
+    def notify(self):
+        """Wake the dispatcher after events were committed (or slots were freed)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the dispatch loop on the running event loop"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="outbox-dispatcher")
+        logger.info(f"Outbox dispatcher started (batch={self.batch_size}, "
+                    f"handlers={sorted(self._handlers)})")
+
+    async def stop(self):
+        """Stop dispatching; claimed events are released by lease expiry"""
+        tasks = [task for task in (self._task, *self._groups) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._groups.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                claimed = await self.dispatch_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox dispatch error: {e}", exc_info=True)
+                claimed = 0
+
+            # Claiming something means more may be waiting; otherwise wait
+            # for a commit, a finished group or the next poll
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def _free_slots(self) -> Dict[str, int]:
+        return {
+            event_type: min(concurrency - self._claimed[event_type], self.batch_size)
+            for event_type, (_, concurrency) in self._handlers.items()
+            if concurrency > self._claimed[event_type]
+        }
+
+    async def _claim(self, db: AsyncSession, slots: Dict[str, int]) -> List[OutboxEvent]:
+        now = datetime.now(timezone.utc)
+        event = OutboxEvent
+        older = aliased(OutboxEvent)
+
+        # An older event of the same escrow and type that is waiting for a
+        # retry (or held by another dispatcher) keeps this one queued
+        blocked = exists().where(
+            older.escrow_id == event.escrow_id,
+            older.event_type == event.event_type,
+            tuple_(older.created_at, older.id) < tuple_(event.created_at, event.id),
+            or_(
+                and_(older.status == OutboxEventStatus.PENDING, older.available_at > now),
+                and_(older.status == OutboxEventStatus.PROCESSING, older.locked_until >= now)
+            )
+        )
+        ranked = select(
+            event.id,
+            event.event_type,
+            func.row_number().over(
+                partition_by=event.event_type,
+                order_by=(event.created_at, event.id)
+            ).label("rank")
+        ).where(
+            event.event_type.in_(list(slots)),
+            or_(
+                and_(event.status == OutboxEventStatus.PENDING, event.available_at <= now),
+                and_(event.status == OutboxEventStatus.PROCESSING, event.locked_until < now)
+            ),
+            ~blocked
+        ).subquery()
+        due = select(ranked.c.id).where(
+            ranked.c.rank <= case(slots, value=ranked.c.event_type, else_=0)
+        )
+
+        result = await db.execute(
+            select(event).where(
+                event.id.in_(due)
+            ).order_by(
+                event.created_at, event.id
+            ).with_for_update(skip_locked=True)
+        )
+        claimed = list(result.scalars().all())
+        if not claimed:
+            await db.rollback()
+            return []
+
+        for item in claimed:
+            item.status = OutboxEventStatus.PROCESSING
+            item.locked_until = now + timedelta(seconds=self.lease_seconds)
+            item.attempts += 1
+        await db.commit()
+        return claimed
+
+    async def dispatch_batch(self) -> int:
+        """
+        Claim due events up to each type's free slots and start delivering them
+
+        Returns:
+            Number of events claimed
+        """
+        slots = self._free_slots()
+        if not slots:
+            return 0
+        async with AsyncSessionLocal() as db:
+            events = await self._claim(db, slots)
+        if not events:
+            return 0
+
+        # Same escrow and type: in order; everything else: concurrently
+        groups: "OrderedDict[Any, List[OutboxEvent]]" = OrderedDict()
+        for event in events:
+            groups.setdefault((event.escrow_id or event.id, event.event_type), []).append(event)
+
+        for group in groups.values():
+            self._claimed[group[0].event_type] += len(group)
+            task = asyncio.create_task(self._deliver_group(group))
+            self._groups.add(task)
+            task.add_done_callback(self._groups.discard)
+
+        self.batches += 1
+        return len(events)
+
+    async def _deliver_group(self, events: List[OutboxEvent]):
+        event_type = events[0].event_type
+        handler, _ = self._handlers[event_type]
+        delivered = []
+        try:
+            for index, event in enumerate(events):
+                self.in_flight += 1
+                try:
+                    await handler(event)
+                except Exception as e:
+                    logger.error(f"Outbox {event_type} {event.id} failed "
+                                 f"(attempt {event.attempts}/{self.max_attempts}): {e}")
+                    self.failed[event_type] += 1
+                    await self._fail(event, str(e), requeue=events[index + 1:])
+                    break
+                finally:
+                    self.in_flight -= 1
+                delivered.append(event.id)
+                self.delivered[event_type] += 1
+
+            if delivered:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(delivered)))
+                    await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The claims expire and the events are delivered again
+            logger.error(f"Outbox {event_type} acknowledgement failed: {e}", exc_info=True)
+        finally:
+            self._claimed[event_type] -= len(events)
+            self.notify()
+
+    async def _fail(self, event: OutboxEvent, error: str, requeue: List[OutboxEvent]):
+        values: Dict[str, Any] = {"locked_until": None, "last_error": error}
+        if event.attempts >= self.max_attempts:
+            logger.error(f"Outbox event {event.id} dead-lettered after {event.attempts} attempts")
+            self.dead_lettered += 1
+            values["status"] = OutboxEventStatus.DEAD
+        else:
+            backoff = min(2 ** event.attempts, 300)
+            values["status"] = OutboxEventStatus.PENDING
+            values["available_at"] = datetime.now(timezone.utc) + timedelta(seconds=backoff)
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(OutboxEvent).where(OutboxEvent.id == event.id).values(**values)
+            )
+            if requeue:
+                # Never attempted: give back the claim and its attempt
+                await db.execute(
+                    update(OutboxEvent).where(
+                        OutboxEvent.id.in_([item.id for item in requeue])
+                    ).values(
+                        status=OutboxEventStatus.PENDING,
+                        locked_until=None,
+                        attempts=OutboxEvent.attempts - 1
+                    )
+                )
+            await db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Dispatch counters"""
+        return {
+            "running": self._task is not None,
+            "claimed": {event_type: count for event_type, count in self._claimed.items() if count},
+            "in_flight": self.in_flight,
+            "batches": self.batches,
+            "delivered": dict(self.delivered),
+            "failed": dict(self.failed),
+            "dead_lettered": self.dead_lettered
+        }
+
+
+# Global outbox dispatcher instance
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    lease_seconds=settings.OUTBOX_LEASE_SECONDS
+)
@@ -1,32 +1,88 @@
-import razorpay
-from typing import Dict, Any, Optional
+import httpx
+import hashlib
+import hmac
+from typing import Dict, Any, Optional, Tuple
 from app.core.config import settings
+from app.core.http import create_async_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class RazorpayBadRequestError(Exception):
+    """Razorpay rejected the request (4xx)"""
+
+
+class RazorpayServerError(Exception):
+    """Razorpay failed or could not be reached (5xx, timeout, connection error)"""
+
+
 class RazorpayService:
-    """Service for handling Razorpay payment operations"""
+    """
+    Service for handling Razorpay payment operations
+    
+    Talks to the Razorpay REST API on a shared keep-alive httpx client, so
+    gateway calls never block the event loop and reuse pooled connections.
+    """
     
     def __init__(self):
         """Initialize Razorpay client with API credentials"""
+        self.base_url = settings.RAZORPAY_BASE_URL
+        self._auth: Optional[Tuple[str, str]] = None
+        self._client: Optional[httpx.AsyncClient] = None
         if not settings.RAZORPAY_KEY_ID or not settings.RAZORPAY_KEY_SECRET:
             logger.warning("Razorpay credentials not configured. Payment operations will fail.")
-            self.client = None
         else:
-            try:
-                self.client = razorpay.Client(
-                    auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-                )
-                logger.info("Razorpay client initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize Razorpay client: {e}")
-                self.client = None
+            self._auth = (settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+            logger.info("Razorpay client initialized successfully")
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = create_async_client(base_url=self.base_url)
+        return self._client
+    
+    async def aclose(self):
+        """Close pooled connections (called on app shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def _ensure_client(self):
-        """Ensure Razorpay client is initialized"""
-        if not self.client:
+        """Ensure Razorpay credentials are configured"""
+        if self._auth is None:
             raise Exception("Razorpay client not initialized. Check API credentials.")
+    
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """
+        Authenticated Razorpay API call
+        
+        Raises:
+            RazorpayBadRequestError: The request was rejected (4xx)
+            RazorpayServerError: Razorpay failed or was unreachable
+        """
+        self._ensure_client()
+        try:
+            response = await self.client.request(method, path, auth=self._auth, **kwargs)
+        except httpx.TransportError as e:
+            raise RazorpayServerError(f"{type(e).__name__}: {e}")
+        
+        if response.status_code >= 400:
+            try:
+                error = response.json().get("error", {})
+                description = error.get("description") or response.text
+            except ValueError:
+                description = response.text
+            if response.status_code >= 500:
+                raise RazorpayServerError(description)
+            raise RazorpayBadRequestError(description)
+        return response.json()
+    
+    @staticmethod
+    def _signature_matches(secret: str, message: bytes, signature: str) -> bool:
+        expected = hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
 
     async def create_payment_order(
         self, 
@@ -71,15 +127,15 @@ class RazorpayService:
             }
             
             logger.info(f"Creating Razorpay order: amount={amount}, currency={currency}")
-            order = self.client.order.create(data=order_data)
+            order = await self._request("POST", "/orders", json=order_data)
             logger.info(f"Razorpay order created successfully: {order.get('id')}")
             
             return order
             
-        except razorpay.errors.BadRequestError as e:
+        except RazorpayBadRequestError as e:
             logger.error(f"Razorpay bad request error: {e}")
             raise Exception(f"Invalid payment order request: {str(e)}")
-        except razorpay.errors.ServerError as e:
+        except RazorpayServerError as e:
             logger.error(f"Razorpay server error: {e}")
             raise Exception("Payment service temporarily unavailable. Please try again.")
         except Exception as e:
@@ -102,13 +158,11 @@ class RazorpayService:
             return True  # Allow in development without webhook secret
         
         try:
-            self._ensure_client()
-            
-            # Razorpay utility method for signature verification
-            is_valid = self.client.utility.verify_webhook_signature(
-                body.decode('utf-8') if isinstance(body, bytes) else body,
-                signature,
-                settings.RAZORPAY_WEBHOOK_SECRET
+            # HMAC-SHA256 of the raw body with the webhook secret
+            is_valid = self._signature_matches(
+                settings.RAZORPAY_WEBHOOK_SECRET,
+                body if isinstance(body, bytes) else body.encode("utf-8"),
+                signature
             )
             
             if is_valid:
@@ -131,7 +185,8 @@ class RazorpayService:
         fund_account_id: str = None,
         payee_vpa: str = None,
         reference_id: str = None,
-        narration: str = "Escrow release"
+        narration: str = "Escrow release",
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create a payout to release escrow funds
@@ -145,6 +200,8 @@ class RazorpayService:
             payee_vpa: UPI VPA for new fund account (required if fund_account_id not provided)
             reference_id: Reference ID for tracking
             narration: Payment description
+            idempotency_key: Sent as X-Payout-Idempotency so a retried request
+                can't pay out twice
             
         Returns:
             Payout details including payout_id
@@ -177,15 +234,16 @@ class RazorpayService:
                 raise ValueError("Either fund_account_id or payee_vpa must be provided")
             
             logger.info(f"Creating Razorpay payout: amount={amount}, mode={mode}, reference={reference_id}")
-            payout = self.client.payout.create(data=payout_data)
+            headers = {"X-Payout-Idempotency": idempotency_key} if idempotency_key else None
+            payout = await self._request("POST", "/payouts", json=payout_data, headers=headers)
             logger.info(f"Razorpay payout created successfully: {payout.get('id')}")
             
             return payout
             
-        except razorpay.errors.BadRequestError as e:
+        except RazorpayBadRequestError as e:
             logger.error(f"Razorpay payout bad request: {e}")
             raise Exception(f"Invalid payout request: {str(e)}")
-        except razorpay.errors.ServerError as e:
+        except RazorpayServerError as e:
             logger.error(f"Razorpay payout server error: {e}")
             raise Exception("Payout service temporarily unavailable. Please try again.")
         except Exception as e:
@@ -223,15 +281,15 @@ class RazorpayService:
             if notes:
                 refund_data["notes"] = notes
             
-            refund = self.client.payment.refund(payment_id, refund_data)
+            refund = await self._request("POST", f"/payments/{payment_id}/refund", json=refund_data)
             logger.info(f"Razorpay refund created successfully: {refund.get('id')}")
             
             return refund
             
-        except razorpay.errors.BadRequestError as e:
+        except RazorpayBadRequestError as e:
             logger.error(f"Razorpay refund bad request: {e}")
             raise Exception(f"Invalid refund request: {str(e)}")
-        except razorpay.errors.ServerError as e:
+        except RazorpayServerError as e:
             logger.error(f"Razorpay refund server error: {e}")
             raise Exception("Refund service temporarily unavailable. Please try again.")
         except Exception as e:
@@ -252,15 +310,15 @@ class RazorpayService:
         
         try:
             logger.info(f"Fetching payment details: payment_id={payment_id}")
-            payment = self.client.payment.fetch(payment_id)
+            payment = await self._request("GET", f"/payments/{payment_id}")
             logger.info(f"Payment details fetched: status={payment.get('status')}")
             
             return payment
             
-        except razorpay.errors.BadRequestError as e:
+        except RazorpayBadRequestError as e:
             logger.error(f"Razorpay payment fetch bad request: {e}")
             raise Exception(f"Invalid payment ID: {str(e)}")
-        except razorpay.errors.ServerError as e:
+        except RazorpayServerError as e:
             logger.error(f"Razorpay payment fetch server error: {e}")
             raise Exception("Payment service temporarily unavailable. Please try again.")
         except Exception as e:
@@ -287,20 +345,18 @@ class RazorpayService:
         self._ensure_client()
         
         try:
-            params_dict = {
-                'razorpay_order_id': order_id,
-                'razorpay_payment_id': payment_id,
-                'razorpay_signature': signature
-            }
+            # HMAC-SHA256 of "order_id|payment_id" with the key secret
+            if not self._signature_matches(
+                settings.RAZORPAY_KEY_SECRET,
+                f"{order_id}|{payment_id}".encode("utf-8"),
+                signature
+            ):
+                logger.warning(f"Invalid payment signature: order_id={order_id}, payment_id={payment_id}")
+                return False
             
-            # Razorpay utility method for payment signature verification
-            self.client.utility.verify_payment_signature(params_dict)
             logger.info(f"Payment signature verified: order_id={order_id}, payment_id={payment_id}")
             return True
             
-        except razorpay.errors.SignatureVerificationError as e:
-            logger.warning(f"Invalid payment signature: {e}")
-            return False
         except Exception as e:
             logger.error(f"Payment signature verification error: {e}")
             return False
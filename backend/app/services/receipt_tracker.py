@@ -0,0 +1,303 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.http import create_async_client
+from app.models.blockchain_log import BlockchainLog, BlockchainTxStatus
+
+logger = logging.getLogger(__name__)
+
+# Replacement transactions must beat the original fee (geth requires +10%)
+FEE_BUMP_NUMERATOR = 1125
+FEE_BUMP_DENOMINATOR = 1000
+
+# Send errors meaning the nonce is already taken by a mined (or pending) transaction
+NONCE_USED_ERRORS = ("nonce too low", "already known")
+
+
+def submitted_log_values(tx: Dict[str, Any]) -> Dict[str, Any]:
+    """BlockchainLog columns for a transaction returned by BlockchainService"""
+    return {
+        "tx_hash": tx["tx_hash"],
+        "status": BlockchainTxStatus.SUBMITTED,
+        "nonce": tx["nonce"],
+        "gas_limit": tx["gas"],
+        "gas_price": tx["gas_price"],
+        "call_data": tx["data"],
+        "attempts": 1,
+        "submitted_at": datetime.now(timezone.utc)
+    }
+
+
+class ReceiptTracker:
+    """
+    Follows submitted blockchain transactions until they are final.
+
+    Every `poll_interval` the open transactions in blockchain_logs are
+    checked with a single JSON-RPC batch request (eth_blockNumber plus one
+    eth_getTransactionReceipt per hash), so polling costs one HTTP round trip
+    per batch rather than one per transaction. Mined transactions get their
+    block number and become confirmed (or failed, if reverted) once they
+    have `confirmations` blocks on top. A transaction with no receipt after
+    `drop_after` seconds is re-signed with the same nonce and a bumped gas
+    price, up to `max_rebroadcasts` times. Any of the transaction's hashes
+    (the current one or one it replaced) can be the one that gets mined, so
+    all of them are polled. Each pass also lets the signer's NonceManager
+    fill a nonce gap left by a failed send (`check_gaps`).
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 5.0,
+        batch_size: int = 100,
+        confirmations: int = 3,
+        drop_after: float = 120.0,
+        max_rebroadcasts: int = 5
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.confirmations = confirmations
+        self.drop_after = drop_after
+        self.max_rebroadcasts = max_rebroadcasts
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.polls = 0
+        self.confirmed = 0
+        self.failed = 0
+        self.rebroadcasts = 0
+        self.dropped = 0
+
+    def start(self):
+        """Start the polling loop on the running event loop"""
+        if self._task is not None:
+            return
+        self._client = create_async_client()
+        self._task = asyncio.create_task(self._run(), name="receipt-tracker")
+        logger.info(f"Receipt tracker started (poll={self.poll_interval}s, batch={self.batch_size})")
+
+    async def stop(self):
+        """Stop polling and close the RPC client"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll()
+                await self._check_nonce_gaps()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Receipt tracker poll error: {e}", exc_info=True)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _check_nonce_gaps(self):
+        from app.services.registry import services
+        if services.blockchain.enabled:
+            await services.blockchain.nonces.check_gaps()
+
+    async def _rpc_batch(self, calls: List[Dict[str, Any]]) -> List[Any]:
+        """Send several JSON-RPC calls in one HTTP request; results in call order"""
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": call["method"], "params": call["params"]}
+            for i, call in enumerate(calls)
+        ]
+        response = await self._client.post(settings.POLYGON_RPC_URL, json=payload)
+        response.raise_for_status()
+
+        items = response.json()
+        if not isinstance(items, list):
+            # Providers answer a rejected batch with a single error object
+            logger.warning(f"RPC batch of {len(calls)} calls failed: {items}")
+            return [None] * len(calls)
+
+        by_id = {item.get("id"): item for item in items if isinstance(item, dict)}
+        results = []
+        for i in range(len(calls)):
+            item = by_id.get(i, {})
+            if "error" in item:
+                logger.warning(f"RPC {calls[i]['method']} failed: {item['error']}")
+            results.append(item.get("result"))
+        return results
+
+    async def poll(self):
+        """Check one batch of open transactions"""
+        # One row per transaction, oldest first (batch rows share these columns)
+        tx_columns = [
+            BlockchainLog.tx_hash, BlockchainLog.prior_tx_hashes, BlockchainLog.nonce,
+            BlockchainLog.gas_limit, BlockchainLog.gas_price, BlockchainLog.call_data,
+            BlockchainLog.attempts, BlockchainLog.submitted_at
+        ]
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(*tx_columns)
+                .where(BlockchainLog.status == BlockchainTxStatus.SUBMITTED)
+                .group_by(*tx_columns)
+                .order_by(BlockchainLog.submitted_at)
+                .limit(self.batch_size)
+            )
+            open_txs = list(result.all())
+        if not open_txs:
+            return
+
+        # A fee-bumped tx may lose to any of the ones it replaced, so check all
+        calls = [{"method": "eth_blockNumber", "params": []}]
+        for log in open_txs:
+            calls.extend(self._receipt_calls(log))
+
+        results = await self._rpc_batch(calls)
+        self.polls += 1
+        if results[0] is None:
+            return
+        head = int(results[0], 16)
+
+        position = 1
+        now = datetime.now(timezone.utc)
+        for log in open_txs:
+            hash_count = 1 + len(log.prior_tx_hashes or [])
+            receipt = next((r for r in results[position:position + hash_count] if r), None)
+            position += hash_count
+
+            if receipt is None:
+                if log.submitted_at and now - log.submitted_at > timedelta(seconds=self.drop_after):
+                    await self._rebroadcast(log)
+                continue
+
+            block_number = int(receipt["blockNumber"], 16)
+            if head - block_number + 1 < self.confirmations:
+                continue
+
+            reverted = receipt.get("status") == "0x0"
+            await self._update(
+                log.tx_hash,
+                tx_hash=receipt["transactionHash"],
+                block_number=str(block_number),
+                status=BlockchainTxStatus.FAILED if reverted else BlockchainTxStatus.CONFIRMED,
+                confirmed_at=now
+            )
+            if reverted:
+                self.failed += 1
+                logger.error(f"Transaction {receipt['transactionHash']} reverted in block {block_number}")
+            else:
+                self.confirmed += 1
+
+    @staticmethod
+    def _receipt_calls(log: Any) -> List[Dict[str, Any]]:
+        hashes = [log.tx_hash, *(log.prior_tx_hashes or [])]
+        return [{"method": "eth_getTransactionReceipt", "params": [tx_hash]} for tx_hash in hashes]
+
+    async def _rebroadcast(self, log: Any):
+        if log.attempts > self.max_rebroadcasts or log.nonce is None or not log.call_data:
+            self.dropped += 1
+            logger.error(f"Transaction {log.tx_hash} dropped after {log.attempts} attempts")
+            await self._update(log.tx_hash, status=BlockchainTxStatus.DROPPED)
+            return
+
+        from app.services.registry import services
+        blockchain = services.blockchain
+        if not blockchain.enabled:
+            return
+
+        gas_price = max(
+            log.gas_price * FEE_BUMP_NUMERATOR // FEE_BUMP_DENOMINATOR + 1,
+            await blockchain.w3.eth.gas_price
+        )
+        try:
+            new_hash = await blockchain.rebroadcast(log.nonce, log.call_data, log.gas_limit, gas_price)
+        except Exception as e:
+            logger.warning(f"Rebroadcast of {log.tx_hash} failed: {e}")
+            if any(error in str(e).lower() for error in NONCE_USED_ERRORS):
+                await self._resolve_used_nonce(log, blockchain.account.address)
+            else:
+                # Counts towards max_rebroadcasts, so a persistent error ends in DROPPED
+                await self._update(
+                    log.tx_hash,
+                    attempts=log.attempts + 1,
+                    submitted_at=datetime.now(timezone.utc)
+                )
+            return
+
+        self.rebroadcasts += 1
+        logger.warning(f"Rebroadcast {log.tx_hash} as {new_hash} (nonce {log.nonce}, gasPrice {gas_price})")
+        await self._update(
+            log.tx_hash,
+            tx_hash=new_hash,
+            prior_tx_hashes=[*(log.prior_tx_hashes or []), log.tx_hash],
+            gas_price=gas_price,
+            attempts=log.attempts + 1,
+            submitted_at=datetime.now(timezone.utc)
+        )
+
+    async def _resolve_used_nonce(self, log: Any, address: str):
+        """
+        Settle a transaction whose nonce the node says is taken
+
+        If one of its hashes has a receipt by now, the next poll confirms it.
+        If the nonce is mined but none of its hashes are, something else used
+        the nonce and the transaction will never be mined: mark it dropped.
+        Otherwise a version of it is still pending; wait another drop_after.
+        """
+        results = await self._rpc_batch([
+            {"method": "eth_getTransactionCount", "params": [address, "latest"]},
+            *self._receipt_calls(log)
+        ])
+        mined_nonce_count = results[0]
+        if any(results[1:]):
+            await self._update(log.tx_hash, submitted_at=datetime.now(timezone.utc))
+        elif mined_nonce_count is not None and int(mined_nonce_count, 16) > log.nonce:
+            self.dropped += 1
+            logger.error(f"Transaction {log.tx_hash} dropped: nonce {log.nonce} was used by another transaction")
+            await self._update(log.tx_hash, status=BlockchainTxStatus.DROPPED)
+        else:
+            await self._update(
+                log.tx_hash,
+                attempts=log.attempts + 1,
+                submitted_at=datetime.now(timezone.utc)
+            )
+
+    async def _update(self, tx_hash: str, **values: Any):
+        # Rows of a Merkle batch share the transaction, so update them together
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(BlockchainLog)
+                .where(
+                    BlockchainLog.tx_hash == tx_hash,
+                    BlockchainLog.status == BlockchainTxStatus.SUBMITTED
+                )
+                .values(**values)
+            )
+            await db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Tracking counters"""
+        return {
+            "running": self._task is not None,
+            "polls": self.polls,
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "rebroadcasts": self.rebroadcasts,
+            "dropped": self.dropped
+        }
+
+
+# Global receipt tracker instance
+receipt_tracker = ReceiptTracker(
+    poll_interval=settings.BLOCKCHAIN_RECEIPT_POLL_SECONDS,
+    batch_size=settings.BLOCKCHAIN_RECEIPT_BATCH_SIZE,
+    confirmations=settings.BLOCKCHAIN_CONFIRMATIONS,
+    drop_after=settings.BLOCKCHAIN_DROP_AFTER_SECONDS,
+    max_rebroadcasts=settings.BLOCKCHAIN_MAX_REBROADCASTS
+)
@@ -0,0 +1,101 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from app.services.blockchain_service import BlockchainService
+from app.services.razorpay_service import RazorpayService
+from app.services.setu_service import SetuService
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Process-wide holder for stateless external service clients.
+
+    Each service is constructed at most once, on first use or when the app
+    starts (see `init`), so client setup and connectivity probes never run on
+    the request path.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {
+            "blockchain": BlockchainService,
+            "razorpay": RazorpayService,
+            "setu": SetuService,
+        }
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = self._factories[name]()
+                    self._instances[name] = instance
+                    logger.info(f"Service initialized: {name}")
+        return instance
+
+    @property
+    def blockchain(self) -> BlockchainService:
+        return self._get("blockchain")
+
+    @property
+    def razorpay(self) -> RazorpayService:
+        return self._get("razorpay")
+
+    @property
+    def setu(self) -> SetuService:
+        return self._get("setu")
+
+    def init(self):
+        """Eagerly construct every service (called once from the app lifespan)"""
+        for name in self._factories:
+            try:
+                self._get(name)
+            except Exception as e:
+                logger.error(f"Failed to initialize service {name}: {e}")
+
+    def override(self, name: str, instance: Optional[Any]):
+        """Replace a service instance (tests and scripts)"""
+        with self._lock:
+            if instance is None:
+                self._instances.pop(name, None)
+            else:
+                self._instances[name] = instance
+
+    async def shutdown(self):
+        """Release resources held by the services"""
+        with self._lock:
+            instances = list(self._instances.items())
+            self._instances.clear()
+
+        for name, instance in instances:
+            aclose = getattr(instance, "aclose", None)
+            if aclose is None:
+                continue
+            try:
+                await aclose()
+            except Exception as e:
+                logger.error(f"Failed to close service {name}: {e}")
+
+
+# Global service registry instance
+services = ServiceRegistry()
+
+
+def get_blockchain_service() -> BlockchainService:
+    """Dependency that returns the shared BlockchainService"""
+    return services.blockchain
+
+
+def get_razorpay_service() -> RazorpayService:
+    """Dependency that returns the shared RazorpayService"""
+    return services.razorpay
+
+
+def get_setu_service() -> SetuService:
+    """Dependency that returns the shared SetuService"""
+    return services.setu
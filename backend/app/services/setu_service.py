@@ -1,7 +1,10 @@
 import httpx
+import asyncio
 import base64
+import time
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.http import create_async_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,12 +19,47 @@ class SetuService:
         self.webhook_secret = settings.SETU_WEBHOOK_SECRET
         self.scheme_id = settings.SETU_SCHEME_ID
         self._access_token: Optional[str] = None
+        self._token_expires_at: float = 0.0  # time.monotonic() deadline
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = create_async_client(base_url=self.base_url)
+        return self._client
+    
+    async def aclose(self):
+        """Close pooled connections (called on app shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _token_valid(self) -> bool:
+        margin = settings.SETU_TOKEN_REFRESH_MARGIN_SECONDS
+        return self._access_token is not None and time.monotonic() < self._token_expires_at - margin
     
     async def _get_access_token(self) -> str:
-        """Get OAuth access token from Setu"""
-        if self._access_token:
+        """
+        Get OAuth access token from Setu
+        
+        The token is cached until shortly before it expires. Refresh is
+        single-flight: concurrent callers wait on one /auth/token request.
+        """
+        if self._token_valid():
             return self._access_token
         
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        
+        async with self._token_lock:
+            # Another caller may have refreshed while we waited
+            if self._token_valid():
+                return self._access_token
+            return await self._fetch_access_token()
+    
+    async def _fetch_access_token(self) -> str:
         # Create Basic Auth header
         credentials = f"{self.client_id}:{self.client_secret}"
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
@@ -31,29 +69,41 @@ class SetuService:
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/auth/token",
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                token_data = response.json()
-                self._access_token = token_data.get("access_token")
-                logger.info("Setu access token obtained successfully")
-                return self._access_token
-            else:
-                logger.error(f"Failed to get Setu access token: {response.text}")
-                raise Exception(f"Setu auth error: {response.text}")
+        requested_at = time.monotonic()
+        response = await self.client.post("/auth/token", headers=headers)
+        
+        if response.status_code == 200:
+            token_data = response.json()
+            self._access_token = token_data.get("access_token")
+            expires_in = token_data.get("expires_in") or token_data.get("expiresIn") or 300
+            self._token_expires_at = requested_at + float(expires_in)
+            logger.info(f"Setu access token obtained successfully (expires in {expires_in}s)")
+            return self._access_token
+        else:
+            logger.error(f"Failed to get Setu access token: {response.text}")
+            raise Exception(f"Setu auth error: {response.text}")
     
-    async def _get_headers(self) -> Dict[str, str]:
-        """Get headers with access token"""
-        token = await self._get_access_token()
-        return {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
+    def _invalidate_token(self, token: str):
+        # Only drop the token we used, not one a concurrent refresh just fetched
+        if self._access_token == token:
+            self._access_token = None
+            self._token_expires_at = 0.0
+    
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Authenticated request on the shared client; retries once if the token was rejected"""
+        for attempt in range(2):
+            token = await self._get_access_token()
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+                "merchantId": self.merchant_id
+            }
+            response = await self.client.request(method, path, headers=headers, **kwargs)
+            if response.status_code != 401 or attempt == 1:
+                return response
+            logger.warning("Setu rejected the access token, refreshing")
+            self._invalidate_token(token)
+        return response
     
     async def create_collect_request(
         self, 
@@ -78,9 +128,6 @@ class SetuService:
         Returns:
             Collect request details from Setu
         """
-        headers = await self._get_headers()
-        headers["merchantId"] = self.merchant_id
-        
         payload = {
             "amount": amount / 100,  # Convert paise to rupees
             "customerVpa": customer_vpa,
@@ -91,20 +138,18 @@ class SetuService:
             "transactionNote": transaction_note
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/v1/merchants/collect",
-                json=payload,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code in [200, 201]:
-                logger.info(f"Setu collect request created: reference_id={reference_id}")
-                return response.json()
-            else:
-                logger.error(f"Setu collect request failed: {response.status_code} - {response.text}")
-                raise Exception(f"Setu API error: {response.text}")
+        response = await self._request(
+            "POST",
+            "/api/v1/merchants/collect",
+            json=payload
+        )
+        
+        if response.status_code in [200, 201]:
+            logger.info(f"Setu collect request created: reference_id={reference_id}")
+            return response.json()
+        else:
+            logger.error(f"Setu collect request failed: {response.status_code} - {response.text}")
+            raise Exception(f"Setu API error: {response.text}")
     
     async def get_collect_status(self, collect_id: str) -> Dict[str, Any]:
         """
@@ -116,22 +161,14 @@ class SetuService:
         Returns:
             Collect request status and details
         """
-        headers = await self._get_headers()
-        headers["merchantId"] = self.merchant_id
+        response = await self._request("GET", f"/api/v1/merchants/collect/{collect_id}")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/api/v1/merchants/collect/{collect_id}",
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"Setu collect status retrieved: collect_id={collect_id}")
-                return response.json()
-            else:
-                logger.error(f"Setu collect status failed: {response.status_code} - {response.text}")
-                raise Exception(f"Setu API error: {response.text}")
+        if response.status_code == 200:
+            logger.info(f"Setu collect status retrieved: collect_id={collect_id}")
+            return response.json()
+        else:
+            logger.error(f"Setu collect status failed: {response.status_code} - {response.text}")
+            raise Exception(f"Setu API error: {response.text}")
     
     async def create_payout(
         self,
@@ -152,9 +189,6 @@ class SetuService:
         Returns:
             Payout details from Setu
         """
-        headers = await self._get_headers()
-        headers["merchantId"] = self.merchant_id
-        
         payload = {
             "amount": amount / 100,  # Convert paise to rupees
             "payeeVpa": payee_vpa,
@@ -163,20 +197,18 @@ class SetuService:
             "merchantVpa": self.merchant_vpa
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/v1/merchants/payout",
-                json=payload,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code in [200, 201]:
-                logger.info(f"Setu payout created: reference_id={reference_id}, amount={amount/100}")
-                return response.json()
-            else:
-                logger.error(f"Setu payout failed: {response.status_code} - {response.text}")
-                raise Exception(f"Setu payout error: {response.text}")
+        response = await self._request(
+            "POST",
+            "/api/v1/merchants/payout",
+            json=payload
+        )
+        
+        if response.status_code in [200, 201]:
+            logger.info(f"Setu payout created: reference_id={reference_id}, amount={amount/100}")
+            return response.json()
+        else:
+            logger.error(f"Setu payout failed: {response.status_code} - {response.text}")
+            raise Exception(f"Setu payout error: {response.text}")
     
     async def get_payout_status(self, payout_id: str) -> Dict[str, Any]:
         """
@@ -188,22 +220,14 @@ class SetuService:
         Returns:
             Payout status and details
         """
-        headers = await self._get_headers()
-        headers["merchantId"] = self.merchant_id
+        response = await self._request("GET", f"/api/v1/merchants/payout/{payout_id}")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/api/v1/merchants/payout/{payout_id}",
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"Setu payout status retrieved: payout_id={payout_id}")
-                return response.json()
-            else:
-                logger.error(f"Setu payout status failed: {response.status_code} - {response.text}")
-                raise Exception(f"Setu API error: {response.text}")
+        if response.status_code == 200:
+            logger.info(f"Setu payout status retrieved: payout_id={payout_id}")
+            return response.json()
+        else:
+            logger.error(f"Setu payout status failed: {response.status_code} - {response.text}")
+            raise Exception(f"Setu API error: {response.text}")
     
     async def create_refund(
         self,
@@ -224,9 +248,6 @@ class SetuService:
         Returns:
             Refund details from Setu
         """
-        headers = await self._get_headers()
-        headers["merchantId"] = self.merchant_id
-        
         payload = {
             "collectId": collect_id,
             "referenceId": reference_id or f"refund_{collect_id}",
@@ -236,20 +257,18 @@ class SetuService:
         if amount is not None:
             payload["amount"] = amount / 100  # Convert paise to rupees
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/v1/merchants/refund",
-                json=payload,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code in [200, 201]:
-                logger.info(f"Setu refund created: collect_id={collect_id}")
-                return response.json()
-            else:
-                logger.error(f"Setu refund failed: {response.status_code} - {response.text}")
-                raise Exception(f"Setu refund error: {response.text}")
+        response = await self._request(
+            "POST",
+            "/api/v1/merchants/refund",
+            json=payload
+        )
+        
+        if response.status_code in [200, 201]:
+            logger.info(f"Setu refund created: collect_id={collect_id}")
+            return response.json()
+        else:
+            logger.error(f"Setu refund failed: {response.status_code} - {response.text}")
+            raise Exception(f"Setu refund error: {response.text}")
     
     async def verify_webhook_signature(
         self,
@@ -0,0 +1,329 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, exists, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.webhook_event import InboundWebhookEvent, WebhookEventStatus
+
+logger = logging.getLogger(__name__)
+
+WebhookHandler = Callable[[InboundWebhookEvent, AsyncSession], Awaitable[None]]
+
+# Headers never worth persisting
+DROPPED_HEADERS = {"authorization", "cookie"}
+
+
+class WebhookDeduplicator:
+    """
+    Recognises redelivered webhooks before they reach the database.
+
+    Keeps the most recently seen (provider, dedup key) pairs in memory; the
+    unique index on inbound_webhook_events catches anything the cache misses
+    (other workers, restarts).
+    """
+
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self._recent: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+
+        self.accepted = 0
+        self.duplicates = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def dedup_key(event_id: Optional[str], body: bytes) -> str:
+        """Gateway event id when present, otherwise a hash of the payload"""
+        if event_id:
+            return event_id
+        return "sha256:" + hashlib.sha256(body).hexdigest()
+
+    def seen(self, provider: str, key: str) -> bool:
+        if (provider, key) in self._recent:
+            self._recent.move_to_end((provider, key))
+            self.cache_hits += 1
+            self.duplicates += 1
+            return True
+        return False
+
+    def remember(self, provider: str, key: str):
+        self._recent[(provider, key)] = None
+        self._recent.move_to_end((provider, key))
+        while len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Deduplication counters"""
+        return {
+            "accepted": self.accepted,
+            "deduplicated": self.duplicates,
+            "deduplicated_from_cache": self.cache_hits,
+            "cache_size": len(self._recent)
+        }
+
+
+# Global webhook deduplicator instance
+webhook_dedup = WebhookDeduplicator(max_size=settings.WEBHOOK_DEDUP_CACHE_SIZE)
+
+
+async def enqueue_webhook(
+    db: AsyncSession,
+    provider: str,
+    event_type: str,
+    body: bytes,
+    headers: Dict[str, str],
+    ordering_key: Optional[str] = None,
+    event_id: Optional[str] = None
+) -> bool:
+    """
+    Persist a verified webhook delivery for asynchronous processing
+
+    Args:
+        db: Database session (committed here)
+        provider: Webhook source, used to pick the handler
+        event_type: Provider event name
+        body: Raw request body
+        headers: Request headers
+        ordering_key: Events sharing a key are processed strictly in arrival order
+        event_id: Gateway event id used for deduplication (payload hash if missing)
+
+    Returns:
+        True if the event was queued, False if it is a duplicate delivery
+    """
+    dedup_key = webhook_dedup.dedup_key(event_id, body)
+    if webhook_dedup.seen(provider, dedup_key):
+        return False
+
+    table = InboundWebhookEvent.__table__
+    result = await db.execute(
+        insert(table).values(
+            id=uuid.uuid4(),
+            provider=provider,
+            event_type=event_type,
+            ordering_key=ordering_key,
+            dedup_key=dedup_key,
+            body=body.decode("utf-8"),
+            headers={k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS},
+            status=WebhookEventStatus.PENDING,
+            attempts=0,
+        ).on_conflict_do_nothing(
+            index_elements=[table.c.provider, table.c.dedup_key]
+        ).returning(table.c.id)
+    )
+    inserted = result.scalar_one_or_none() is not None
+    await db.commit()
+
+    webhook_dedup.remember(provider, dedup_key)
+    if not inserted:
+        webhook_dedup.duplicates += 1
+        return False
+
+    webhook_dedup.accepted += 1
+    webhook_workers.notify()
+    return True
+
+
+class WebhookWorkerPool:
+    """
+    Drains inbound_webhook_events with a pool of async workers.
+
+    Workers claim events with FOR UPDATE SKIP LOCKED, so several app
+    processes can share the table. An event is only claimable when no older
+    open event has the same ordering key, which keeps per-escrow ordering.
+    Failed events are retried with exponential backoff and dead-lettered
+    after `max_attempts`; a claim that outlives its lease is picked up again.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_attempts: int = 5,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0
+    ):
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+
+        self._handlers: Dict[str, WebhookHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        self.processed = 0
+        self.failed = 0
+        self.dead_lettered = 0
+        self.in_flight = 0
+
+    def register_handler(self, provider: str, handler: WebhookHandler):
+        """Register the coroutine that processes events from a provider"""
+        self._handlers[provider] = handler
+
+    def notify(self):
+        """Wake idle workers after a new event was stored"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        """Spawn the workers on the running event loop"""
+        if self._tasks:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"webhook-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"Webhook worker pool started with {self.concurrency} workers")
+
+    async def stop(self):
+        """Stop the workers; claimed events are released by lease expiry"""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, index: int):
+        while not self._stopping:
+            try:
+                claimed = await self._process_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook worker {index} error: {e}", exc_info=True)
+                claimed = False
+
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def _claim(self, db: AsyncSession) -> Optional[InboundWebhookEvent]:
+        now = datetime.now(timezone.utc)
+        event = InboundWebhookEvent
+        earlier = aliased(InboundWebhookEvent)
+
+        # An older open event with the same key must finish first
+        blocked = exists().where(
+            earlier.ordering_key == event.ordering_key,
+            earlier.status.in_([WebhookEventStatus.PENDING, WebhookEventStatus.PROCESSING]),
+            or_(
+                earlier.received_at < event.received_at,
+                and_(earlier.received_at == event.received_at, earlier.id < event.id)
+            )
+        )
+
+        result = await db.execute(
+            select(event).where(
+                or_(
+                    and_(event.status == WebhookEventStatus.PENDING, event.available_at <= now),
+                    and_(event.status == WebhookEventStatus.PROCESSING, event.locked_until < now)
+                ),
+                ~blocked
+            ).order_by(
+                event.received_at
+            ).limit(1).with_for_update(skip_locked=True)
+        )
+        claimed = result.scalar_one_or_none()
+        if claimed is None:
+            await db.rollback()
+            return None
+
+        claimed.status = WebhookEventStatus.PROCESSING
+        claimed.locked_until = now + timedelta(seconds=self.lease_seconds)
+        claimed.attempts += 1
+        await db.commit()
+        return claimed
+
+    async def _process_next(self) -> bool:
+        async with AsyncSessionLocal() as db:
+            event = await self._claim(db)
+        if event is None:
+            return False
+
+        self.in_flight += 1
+        try:
+            handler = self._handlers.get(event.provider)
+            if handler is None:
+                raise RuntimeError(f"No webhook handler registered for provider {event.provider}")
+
+            async with AsyncSessionLocal() as db:
+                await handler(event, db)
+
+            await self._finish(event, WebhookEventStatus.DONE)
+            self.processed += 1
+        except Exception as e:
+            logger.error(f"Webhook {event.provider}/{event.event_type} {event.id} failed "
+                         f"(attempt {event.attempts}/{self.max_attempts}): {e}")
+            self.failed += 1
+            await self._fail(event, str(e))
+        finally:
+            self.in_flight -= 1
+        return True
+
+    async def _finish(self, event: InboundWebhookEvent, status: str, **values: Any):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(InboundWebhookEvent)
+                .where(InboundWebhookEvent.id == event.id)
+                .values(
+                    status=status,
+                    locked_until=None,
+                    processed_at=datetime.now(timezone.utc),
+                    **values
+                )
+            )
+            await db.commit()
+
+    async def _fail(self, event: InboundWebhookEvent, error: str):
+        if event.attempts >= self.max_attempts:
+            logger.error(f"Webhook {event.id} dead-lettered after {event.attempts} attempts")
+            self.dead_lettered += 1
+            await self._finish(event, WebhookEventStatus.DEAD, last_error=error)
+            return
+
+        backoff = min(2 ** event.attempts, 300)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(InboundWebhookEvent)
+                .where(InboundWebhookEvent.id == event.id)
+                .values(
+                    status=WebhookEventStatus.PENDING,
+                    locked_until=None,
+                    last_error=error,
+                    available_at=datetime.now(timezone.utc) + timedelta(seconds=backoff)
+                )
+            )
+            await db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker pool counters"""
+        return {
+            "workers": len(self._tasks),
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dead_lettered": self.dead_lettered
+        }
+
+
+# Global webhook worker pool instance
+webhook_workers = WebhookWorkerPool(
+    concurrency=settings.WEBHOOK_WORKER_CONCURRENCY,
+    max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+    poll_interval=settings.WEBHOOK_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.WEBHOOK_LEASE_SECONDS
+)
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+from app.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Called with each published envelope on every worker
+DeliverCallback = Callable[[Dict[str, Any]], None]
+
+
+class Backplane(ABC):
+    """
+    Fans WebSocket messages out to every app worker.
+
+    `publish` is called once per message by the worker that produced it;
+    every subscribed worker (including the publisher) receives the envelope
+    in its `deliver` callback and hands it to its local sockets.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._deliver: Optional[DeliverCallback] = None
+        self.published = 0
+        self.received = 0
+
+    async def start(self, deliver: DeliverCallback):
+        self._deliver = deliver
+
+    async def stop(self):
+        self._deliver = None
+
+    @abstractmethod
+    async def publish(self, envelope: Dict[str, Any]):
+        """Send an envelope to every subscribed worker"""
+
+    def _dispatch(self, envelope: Dict[str, Any]):
+        self.received += 1
+        if self._deliver is not None:
+            self._deliver(envelope)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "published": self.published,
+            "received": self.received
+        }
+
+
+class InProcessBackplane(Backplane):
+    """Single-worker backplane: delivers straight to this process (dev and tests)"""
+
+    name = "memory"
+
+    async def publish(self, envelope: Dict[str, Any]):
+        self.published += 1
+        self._dispatch(envelope)
+
+
+class RedisBackplane(Backplane):
+    """Redis pub/sub backplane shared by all workers and replicas on REDIS_URL"""
+
+    name = "redis"
+
+    def __init__(self, redis_url: str, channel: str):
+        super().__init__()
+        self.redis_url = redis_url
+        self.channel = channel
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self.publish_errors = 0
+
+    async def start(self, deliver: DeliverCallback):
+        import redis.asyncio as redis
+
+        await super().start(deliver)
+        self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        self._listener = asyncio.create_task(self._listen(), name="ws-backplane-listener")
+        logger.info(f"WebSocket backplane subscribed to Redis channel {self.channel}")
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+        await super().stop()
+
+    async def publish(self, envelope: Dict[str, Any]):
+        try:
+            await self._redis.publish(self.channel, dumps(envelope))
+            self.published += 1
+        except Exception as e:
+            # Better to reach local sockets than nobody
+            self.publish_errors += 1
+            logger.error(f"Backplane publish failed, delivering locally only: {e}")
+            self._dispatch(envelope)
+
+    async def _listen(self):
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        self._dispatch(json.loads(message["data"]))
+                    except Exception as e:
+                        logger.error(f"Backplane delivery error: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane subscription lost, resubscribing: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["publish_errors"] = self.publish_errors
+        return stats
+
+
+def create_backplane(kind: str, redis_url: str, channel: str) -> Backplane:
+    """Build the backplane selected by WEBSOCKET_BACKPLANE ("memory" or "redis")"""
+    if kind == "redis":
+        return RedisBackplane(redis_url, channel)
+    if kind != "memory":
+        raise ValueError(f"Unknown WebSocket backplane: {kind}")
+    return InProcessBackplane()
@@ -1,91 +1,406 @@
-from typing import Dict, Set
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Union
 from fastapi import WebSocket
-import json
+from app.core.config import settings
+from app.core.serialization import dumps
+from app.services.websocket_backplane import Backplane
+from app.services.websocket_replay import RESYNC, ReplayBuffer
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Close code sent to clients that cannot keep up (RFC 6455 "Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientConnection:
+    """
+    One WebSocket plus its bounded outbound queue.
+
+    Messages are queued with `send`, which never waits on the network; a
+    dedicated writer task drains the queue to the socket. Messages are never
+    merged or skipped, since clients track every seq; if the queue is full
+    the client cannot keep up and the connection is closed (it catches up
+    through replay when it reconnects). Live messages of a stream that is
+    being replayed are held back (`hold`) and queued after the replay
+    (`release`), so they can't overtake the messages they follow.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: str, max_queue: int, send_timeout: float):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+
+        self._pending: Deque[Union[dict, str]] = deque()
+        self._held: Dict[str, List[Union[dict, str]]] = {}  # Stream -> live messages awaiting its replay
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+
+        self.sent = 0
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop(), name=f"ws-writer-{self.user_id}")
+
+    def send(self, message: Union[dict, str], stream: Optional[str] = None) -> bool:
+        """
+        Queue a message for this client
+
+        Args:
+            message: JSON-serializable message, or JSON text already encoded
+                for a broadcast (sent as-is to every recipient)
+            stream: Stream of a live sequenced message (held during its replay)
+
+        Returns:
+            False if the connection is closed or was dropped as a slow consumer
+        """
+        if self.closed:
+            return False
+
+        if self.queued >= self.max_queue:
+            logger.warning(f"Dropping slow WebSocket consumer for user {self.user_id} "
+                           f"({self.queued} messages queued)")
+            self.close(SLOW_CONSUMER_CLOSE_CODE, "Client too slow")
+            return False
+
+        held = self._held.get(stream) if stream is not None else None
+        if held is not None:
+            held.append(message)
+            return True
+
+        self._pending.append(message)
+        self._ready.set()
+        return True
+
+    def hold(self, streams: Iterable[str]):
+        """Keep live messages of these streams back until `release` (call before subscribing)"""
+        for stream in streams:
+            self._held.setdefault(stream, [])
+
+    def release(self, streams: Iterable[str]):
+        """Queue the live messages held for these streams, after anything queued so far"""
+        for stream in streams:
+            for message in self._held.pop(stream, ()):
+                if not self.send(message):
+                    return
+
+    async def _write_loop(self):
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._pending:
+                    message = self._pending.popleft()
+                    if not isinstance(message, str):
+                        message = dumps(message)
+                    await asyncio.wait_for(self.websocket.send_text(message), timeout=self.send_timeout)
+                    self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket writer for user {self.user_id} stopped: {e}")
+            self.close(SLOW_CONSUMER_CLOSE_CODE, "Send failed")
+
+    def close(self, code: int = 1000, reason: str = ""):
+        """Stop the writer and close the socket (the receive loop then disconnects)"""
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        self._held.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        asyncio.create_task(self._close_socket(code, reason))
+
+    async def _close_socket(self, code: int, reason: str):
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass  # Already closed by the client
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending) + sum(len(held) for held in self._held.values())
+
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time updates"""
-    
-    def __init__(self):
+    """
+    Manages WebSocket connections for real-time updates
+
+    Connections and subscriptions are local to this worker. Outbound updates
+    are published once on the backplane, and every worker delivers them to
+    its own sockets, so clients may connect to any worker or replica.
+
+    Each outbound message carries its stream ("escrow:<id>" or "user:<id>")
+    and that stream's sequence number, and is kept in the replay buffer; a
+    client that reconnects with its last seen numbers is sent only what it
+    missed (see `replay`).
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 100,
+        send_timeout: float = 10.0,
+        compaction_interval: float = 300.0,
+        replay: Optional[ReplayBuffer] = None
+    ):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.compaction_interval = compaction_interval
+        self.replay_buffer = replay or ReplayBuffer()
+
         # Store active connections by user_id
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self.active_connections: Dict[str, Set[ClientConnection]] = {}
         # Store escrow subscriptions: escrow_id -> set of user_ids
         self.escrow_subscriptions: Dict[str, Set[str]] = {}
-    
-    async def connect(self, websocket: WebSocket, user_id: str):
-        """Accept and store a new WebSocket connection"""
+        # Reverse index: user_id -> set of escrow_ids (drops a user's subscriptions in one pass)
+        self.user_subscriptions: Dict[str, Set[str]] = {}
+
+        # Cross-worker fan-out; until `start` runs, messages are delivered locally
+        self.backplane: Optional[Backplane] = None
+        self._compactor: Optional[asyncio.Task] = None
+
+        self.slow_consumers_dropped = 0
+        self.compactions = 0
+        self.compacted_entries = 0
+
+    async def connect(self, websocket: WebSocket, user_id: str, hold: Iterable[str] = ()) -> ClientConnection:
+        """
+        Accept and store a new WebSocket connection
+
+        Args:
+            websocket: The accepted socket
+            user_id: Authenticated user
+            hold: Streams to hold live messages for until they are replayed
+        """
         await websocket.accept()
-        
+
+        connection = ClientConnection(websocket, user_id, self.max_queue, self.send_timeout)
+        connection.hold(hold)
+        connection.start()
+
         if user_id not in self.active_connections:
             self.active_connections[user_id] = set()
-        
-        self.active_connections[user_id].add(websocket)
+
+        self.active_connections[user_id].add(connection)
         logger.info(f"User {user_id} connected. Total connections: {len(self.active_connections[user_id])}")
-    
-    def disconnect(self, websocket: WebSocket, user_id: str):
+        return connection
+
+    def disconnect(self, connection: ClientConnection, user_id: str):
         """Remove a WebSocket connection"""
+        connection.close()
+
         if user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
-            
-            # Clean up empty sets
+            self.active_connections[user_id].discard(connection)
+
+            # Last socket gone: drop the connection set and every subscription
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
-        
+                self._drop_user_subscriptions(user_id)
+
         logger.info(f"User {user_id} disconnected")
-    
+
+    def _drop_user_subscriptions(self, user_id: str):
+        for escrow_id in self.user_subscriptions.pop(user_id, ()):
+            subscribers = self.escrow_subscriptions.get(escrow_id)
+            if subscribers is not None:
+                subscribers.discard(user_id)
+                if not subscribers:
+                    del self.escrow_subscriptions[escrow_id]
+
     async def subscribe_to_escrow(self, user_id: str, escrow_id: str):
         """Subscribe a user to escrow updates"""
         if escrow_id not in self.escrow_subscriptions:
             self.escrow_subscriptions[escrow_id] = set()
-        
+
         self.escrow_subscriptions[escrow_id].add(user_id)
+        self.user_subscriptions.setdefault(user_id, set()).add(escrow_id)
         logger.info(f"User {user_id} subscribed to escrow {escrow_id}")
-    
+
+    def subscribe_many(self, user_id: str, escrow_ids: Iterable[str]):
+        """Subscribe a user to several escrows in one pass"""
+        user_escrows = self.user_subscriptions.setdefault(user_id, set())
+        count = 0
+        for escrow_id in escrow_ids:
+            self.escrow_subscriptions.setdefault(escrow_id, set()).add(user_id)
+            user_escrows.add(escrow_id)
+            count += 1
+        if not user_escrows:
+            del self.user_subscriptions[user_id]
+        logger.info(f"User {user_id} subscribed to {count} escrows")
+
     def unsubscribe_from_escrow(self, user_id: str, escrow_id: str):
         """Unsubscribe a user from escrow updates"""
         if escrow_id in self.escrow_subscriptions:
             self.escrow_subscriptions[escrow_id].discard(user_id)
-            
+
             # Clean up empty sets
             if not self.escrow_subscriptions[escrow_id]:
                 del self.escrow_subscriptions[escrow_id]
-        
+
+        if user_id in self.user_subscriptions:
+            self.user_subscriptions[user_id].discard(escrow_id)
+            if not self.user_subscriptions[user_id]:
+                del self.user_subscriptions[user_id]
+
         logger.info(f"User {user_id} unsubscribed from escrow {escrow_id}")
-    
-    async def send_personal_message(self, message: dict, user_id: str):
-        """Send a message to a specific user's connections"""
-        if user_id in self.active_connections:
-            disconnected = set()
-            
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message to user {user_id}: {e}")
-                    disconnected.add(connection)
-            
-            # Clean up disconnected connections
-            for connection in disconnected:
+
+    def compact(self) -> int:
+        """
+        Drop state that no live socket can use
+
+        Removes closed connections, subscriptions of users with no connection
+        on this worker, and empty sets. Disconnect already cleans up; this
+        pass catches anything a missed disconnect left behind.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for user_id, connections in list(self.active_connections.items()):
+            closed = {c for c in connections if c.closed}
+            if closed:
+                connections -= closed
+                removed += len(closed)
+            if not connections:
+                del self.active_connections[user_id]
+
+        for user_id in list(self.user_subscriptions):
+            if user_id not in self.active_connections:
+                removed += len(self.user_subscriptions[user_id])
+                self._drop_user_subscriptions(user_id)
+
+        for escrow_id, subscribers in list(self.escrow_subscriptions.items()):
+            orphans = {u for u in subscribers if u not in self.active_connections}
+            if orphans:
+                subscribers -= orphans
+                removed += len(orphans)
+            if not subscribers:
+                del self.escrow_subscriptions[escrow_id]
+
+        self.compactions += 1
+        self.compacted_entries += removed
+        return removed
+
+    async def _compact_periodically(self):
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            removed = self.compact()
+            if removed:
+                logger.info(f"WebSocket compaction removed {removed} stale entries")
+
+    def _enqueue(self, message: str, user_id: str, stream: str):
+        for connection in list(self.active_connections.get(user_id, ())):
+            if not connection.send(message, stream):
+                self.slow_consumers_dropped += 1
                 self.disconnect(connection, user_id)
-    
+
+    async def _sequenced(self, stream: str, message: dict) -> str:
+        """Number a message on its stream, encode it once and keep it for replay"""
+        message["stream"] = stream
+        try:
+            message["seq"] = await self.replay_buffer.next_seq(stream)
+            text = dumps(message)
+            await self.replay_buffer.record(stream, message["seq"], text)
+            return text
+        except Exception as e:
+            # Still deliver live; clients resync on their next reconnect
+            logger.error(f"WebSocket replay buffer unavailable for {stream}: {e}")
+            message.pop("seq", None)
+            return dumps(message)
+
+    async def replay(self, connection: ClientConnection, last_seqs: Dict[str, int]) -> List[str]:
+        """
+        Resend the messages a reconnecting client missed
+
+        Hold the streams on the connection before (re)subscribing and call
+        this afterwards: nothing published meanwhile is lost, and live
+        messages are only queued once the replayed ones are. A message may
+        then arrive twice; clients drop any seq at or below the last one
+        they handled on that stream.
+
+        Args:
+            connection: The client's new connection
+            last_seqs: Stream -> last sequence number the client received
+
+        Returns:
+            Streams whose missed messages are no longer buffered; the client
+            has to refetch those
+        """
+        try:
+            missed = await self.replay_buffer.since(last_seqs)
+            resync = []
+            for stream, messages in missed.items():
+                if messages is RESYNC:
+                    resync.append(stream)
+                    continue
+                for text in messages:
+                    connection.send(text)
+            return resync
+        finally:
+            connection.release(last_seqs)
+
+    async def send_personal_message(self, message: dict, user_id: str):
+        """Send a message to a user's connections on every worker (does not wait for delivery)"""
+        text = await self._sequenced(f"user:{user_id}", message)
+        await self._publish({"kind": "user", "user_id": user_id, "text": text})
+
     async def broadcast_escrow_update(self, escrow_id: str, update_data: dict):
-        """Broadcast an update to all users subscribed to an escrow"""
-        if escrow_id not in self.escrow_subscriptions:
-            return
-        
+        """Broadcast an update to all users subscribed to an escrow, on every worker"""
         message = {
             "type": "escrow_update",
             "escrow_id": escrow_id,
             "data": update_data
         }
-        
-        # Send to all subscribed users
-        for user_id in self.escrow_subscriptions[escrow_id]:
-            await self.send_personal_message(message, user_id)
-    
+
+        # Encoded once here; every worker and socket sends the same text
+        text = await self._sequenced(f"escrow:{escrow_id}", message)
+        await self._publish({"kind": "escrow", "escrow_id": escrow_id, "text": text})
+
+    async def _publish(self, envelope: dict):
+        if self.backplane is None:
+            self.deliver_local(envelope)
+        else:
+            await self.backplane.publish(envelope)
+
+    def deliver_local(self, envelope: dict):
+        """Hand a backplane envelope to the sockets connected to this worker"""
+        message = envelope["text"]
+        if envelope["kind"] == "user":
+            user_id = envelope["user_id"]
+            self._enqueue(message, user_id, f"user:{user_id}")
+            return
+
+        escrow_id = envelope["escrow_id"]
+        for user_id in list(self.escrow_subscriptions.get(escrow_id, ())):
+            self._enqueue(message, user_id, f"escrow:{escrow_id}")
+
+    async def start(self, backplane: Backplane, replay: Optional[ReplayBuffer] = None):
+        """Attach the cross-worker backplane and replay buffer (called from the app lifespan)"""
+        if replay is not None:
+            await replay.start()
+            self.replay_buffer = replay
+        await backplane.start(self.deliver_local)
+        self.backplane = backplane
+        if self._compactor is None:
+            self._compactor = asyncio.create_task(self._compact_periodically(), name="ws-compactor")
+
+    async def stop(self):
+        """Detach the backplane and close local connections"""
+        if self._compactor is not None:
+            self._compactor.cancel()
+            await asyncio.gather(self._compactor, return_exceptions=True)
+            self._compactor = None
+        if self.backplane is not None:
+            await self.backplane.stop()
+            self.backplane = None
+        await self.replay_buffer.stop()
+        for user_id, connections in list(self.active_connections.items()):
+            for connection in list(connections):
+                self.disconnect(connection, user_id)
+
     async def notify_payment_status(self, escrow_id: str, status: str, user_id: str):
         """Notify about payment status changes"""
         message = {
@@ -94,9 +409,9 @@ class ConnectionManager:
             "status": status,
             "timestamp": None  # Will be set by client
         }
-        
+
         await self.send_personal_message(message, user_id)
-    
+
     async def notify_escrow_status_change(self, escrow_id: str, old_status: str, new_status: str):
         """Notify all parties about escrow status changes"""
         message = {
@@ -105,9 +420,34 @@ class ConnectionManager:
             "old_status": old_status,
             "new_status": new_status
         }
-        
+
         await self.broadcast_escrow_update(escrow_id, message)
 
+    def stats(self) -> Dict[str, Any]:
+        """Connection and queue gauges for this worker"""
+        connections = [c for conns in self.active_connections.values() for c in conns]
+        return {
+            "users": len(self.active_connections),
+            "connections": len(connections),
+            "subscribed_escrows": len(self.escrow_subscriptions),
+            "subscribed_users": len(self.user_subscriptions),
+            "subscriptions": sum(len(escrows) for escrows in self.user_subscriptions.values()),
+            "queued_messages": sum(c.queued for c in connections),
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+            "compactions": self.compactions,
+            "compacted_entries": self.compacted_entries,
+            "backplane": self.backplane.stats() if self.backplane is not None else None,
+            "replay": self.replay_buffer.stats()
+        }
+
 
 # Global connection manager instance
-manager = ConnectionManager()
+manager = ConnectionManager(
+    max_queue=settings.WEBSOCKET_SEND_QUEUE_SIZE,
+    send_timeout=settings.WEBSOCKET_SEND_TIMEOUT_SECONDS,
+    compaction_interval=settings.WEBSOCKET_COMPACTION_INTERVAL_SECONDS,
+    replay=ReplayBuffer(
+        size=settings.WEBSOCKET_REPLAY_BUFFER_SIZE,
+        max_streams=settings.WEBSOCKET_REPLAY_MAX_STREAMS
+    )
+)
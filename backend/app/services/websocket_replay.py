@@ -0,0 +1,208 @@
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Replay result for a stream whose missed messages are no longer buffered
+RESYNC = None
+
+
+def _initial_seq() -> int:
+    # A (re)created stream starts at the current time in ms, so its numbers
+    # stay above anything a client saw before a restart or eviction
+    return int(time.time() * 1000) - 1
+
+
+def _missed(current: Optional[int], last_seq: int, entries: List[Tuple[int, str]]) -> Optional[List[str]]:
+    """
+    Messages a client that saw `last_seq` still needs
+
+    Sequence numbers are contiguous within a stream, so a replay is only
+    complete if it starts right after `last_seq`. Anything else (unknown
+    stream, trimmed buffer, numbers from before a restart) means the client
+    must refetch instead.
+    """
+    if current is None or last_seq > current:
+        return RESYNC
+    if last_seq == current:
+        return []
+    if not entries or entries[0][0] != last_seq + 1:
+        return RESYNC
+    return [text for _, text in entries]
+
+
+class ReplayBuffer:
+    """
+    Per-stream sequence numbers and a bounded buffer of recent messages.
+
+    A stream is one escrow ("escrow:<id>") or one user's personal messages
+    ("user:<id>"). Every outbound message gets the stream's next sequence
+    number and is kept in a ring buffer of the last `size` messages, so a
+    reconnecting client can send its `last_seq` and receive only what it
+    missed. This in-process buffer suits a single worker; at most
+    `max_streams` streams are kept (least recently used are evicted).
+    """
+
+    name = "memory"
+
+    def __init__(self, size: int = 200, max_streams: int = 10000):
+        self.size = max(1, size)
+        self.max_streams = max(1, max_streams)
+        self._streams: "OrderedDict[str, Tuple[int, Deque[Tuple[int, str]]]]" = OrderedDict()
+
+        self.recorded = 0
+        self.replayed = 0
+        self.resyncs = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def next_seq(self, stream: str) -> int:
+        """Allocate the next sequence number of a stream"""
+        seq, buffer = self._streams.pop(stream, (_initial_seq(), None))
+        if buffer is None:
+            buffer = deque(maxlen=self.size)
+        seq += 1
+        self._streams[stream] = (seq, buffer)
+        while len(self._streams) > self.max_streams:
+            self._streams.popitem(last=False)
+        return seq
+
+    async def record(self, stream: str, seq: int, text: str):
+        """Keep an encoded message for replay"""
+        entry = self._streams.get(stream)
+        if entry is not None:
+            entry[1].append((seq, text))
+            self.recorded += 1
+
+    async def since(self, last_seqs: Dict[str, int]) -> Dict[str, Optional[List[str]]]:
+        """
+        Messages missed on each stream
+
+        Args:
+            last_seqs: Stream -> last sequence number the client received
+
+        Returns:
+            Stream -> encoded messages to resend in order, or None (RESYNC)
+            if they are no longer buffered
+        """
+        missed = {}
+        for stream, last_seq in last_seqs.items():
+            entry = self._streams.get(stream)
+            if entry is None:
+                missed[stream] = _missed(None, last_seq, [])
+            else:
+                seq, buffer = entry
+                missed[stream] = _missed(seq, last_seq, [e for e in buffer if e[0] > last_seq])
+        self._count(missed)
+        return missed
+
+    def _count(self, missed: Dict[str, Optional[List[str]]]):
+        for messages in missed.values():
+            if messages is RESYNC:
+                self.resyncs += 1
+            else:
+                self.replayed += len(messages)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "streams": len(self._streams),
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "resyncs": self.resyncs
+        }
+
+
+class RedisReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer shared by all workers through REDIS_URL
+
+    Sequence numbers come from INCR, so every worker numbers a stream the
+    same way; buffers are sorted sets scored by sequence number. Both keys
+    expire `ttl` seconds after the stream's last message.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis_url: str, prefix: str, size: int = 200, ttl: int = 3600):
+        super().__init__(size=size)
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.ttl = ttl
+        self._redis = None
+
+    async def start(self):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(self.redis_url, decode_responses=True)
+
+    async def stop(self):
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def _keys(self, stream: str) -> Tuple[str, str]:
+        return f"{self.prefix}:seq:{stream}", f"{self.prefix}:buf:{stream}"
+
+    async def next_seq(self, stream: str) -> int:
+        seq_key, _ = self._keys(stream)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(seq_key, _initial_seq(), nx=True)
+            pipe.incr(seq_key)
+            pipe.expire(seq_key, self.ttl)
+            _, seq, _ = await pipe.execute()
+        return int(seq)
+
+    async def record(self, stream: str, seq: int, text: str):
+        _, buf_key = self._keys(stream)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(buf_key, {text: seq})
+            pipe.zremrangebyrank(buf_key, 0, -(self.size + 1))
+            pipe.expire(buf_key, self.ttl)
+            await pipe.execute()
+        self.recorded += 1
+
+    async def since(self, last_seqs: Dict[str, int]) -> Dict[str, Optional[List[str]]]:
+        if not last_seqs:
+            return {}
+
+        # One round trip for all streams
+        streams = list(last_seqs)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for stream in streams:
+                seq_key, buf_key = self._keys(stream)
+                pipe.get(seq_key)
+                pipe.zrangebyscore(buf_key, f"({last_seqs[stream]}", "+inf", withscores=True)
+            results = await pipe.execute()
+
+        missed = {}
+        for i, stream in enumerate(streams):
+            current, entries = results[2 * i], results[2 * i + 1]
+            missed[stream] = _missed(
+                int(current) if current is not None else None,
+                last_seqs[stream],
+                [(int(score), text) for text, score in entries]
+            )
+        self._count(missed)
+        return missed
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        del stats["streams"]  # Kept in Redis, not counted here
+        return stats
+
+
+def create_replay_buffer(kind: str, redis_url: str, prefix: str, size: int, ttl: int,
+                         max_streams: int) -> ReplayBuffer:
+    """Build the replay buffer matching WEBSOCKET_BACKPLANE ("memory" or "redis")"""
+    if kind == "redis":
+        return RedisReplayBuffer(redis_url, prefix, size=size, ttl=ttl)
+    if kind != "memory":
+        raise ValueError(f"Unknown WebSocket replay backend: {kind}")
+    return ReplayBuffer(size=size, max_streams=max_streams)
@@ -0,0 +1,66 @@
+"""
+Rebuild the user_daily_escrow_stats rollup from the escrows table.
+
+Run once after applying migration c1f5d8e24a67, and any time the rollup
+needs to be recomputed. The rebuild runs in a single transaction, so
+readers see either the old or the new rollup.
+
+Usage:
+    python backfill_escrow_stats.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+REBUILD_SQL = """
+INSERT INTO user_daily_escrow_stats (
+    user_id, day, volume, count,
+    initiated_count, held_count, released_count,
+    refunded_count, disputed_count, expired_count
+)
+SELECT
+    participant.user_id,
+    (e.created_at AT TIME ZONE 'UTC')::date AS day,
+    sum(e.amount),
+    count(*),
+    count(*) FILTER (WHERE e.status = 'INITIATED'),
+    count(*) FILTER (WHERE e.status = 'HELD'),
+    count(*) FILTER (WHERE e.status = 'RELEASED'),
+    count(*) FILTER (WHERE e.status = 'REFUNDED'),
+    count(*) FILTER (WHERE e.status = 'DISPUTED'),
+    count(*) FILTER (WHERE e.status = 'EXPIRED')
+FROM escrows e
+CROSS JOIN LATERAL (
+    SELECT e.payer_id AS user_id
+    UNION
+    SELECT e.payee_id WHERE e.payee_id IS NOT NULL
+) AS participant
+WHERE e.created_at IS NOT NULL
+GROUP BY participant.user_id, day
+"""
+
+
+async def backfill():
+    print("\n📊 Rebuilding user_daily_escrow_stats...\n")
+
+    async with engine.begin() as conn:
+        # Block concurrent escrow writes so no delta is lost between delete and insert
+        await conn.execute(text("LOCK TABLE escrows IN SHARE MODE"))
+        await conn.execute(text("DELETE FROM user_daily_escrow_stats"))
+        result = await conn.execute(text(REBUILD_SQL))
+        print(f"✓ Wrote {result.rowcount} rollup rows")
+
+    await engine.dispose()
+    print("\n✅ Backfill complete\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
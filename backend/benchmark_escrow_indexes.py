@@ -0,0 +1,240 @@
+"""
+Before/after EXPLAIN benchmark for the escrow access-path indexes
+(alembic revision b4e7c2a91d3f).
+
+Seeds a scratch schema with synthetic users, escrows, confirmations and
+payment logs, runs the hot queries from EscrowService, AnalyticsService and
+the refund webhook under EXPLAIN (ANALYZE, BUFFERS), creates the indexes and
+runs them again. Nothing outside the scratch schema is touched.
+
+Usage:
+    python benchmark_escrow_indexes.py                  # 1M escrows
+    python benchmark_escrow_indexes.py --escrows 200000 --keep
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import psycopg2
+
+from app.core.config import settings
+
+SCHEMA = "index_bench"
+
+ACTIVE = "status IN ('INITIATED', 'HELD', 'DISPUTED')"
+
+INDEXES = [
+    "CREATE INDEX ix_escrows_payer_id_created_at ON escrows (payer_id, created_at DESC)",
+    "CREATE INDEX ix_escrows_payee_id_created_at ON escrows (payee_id, created_at DESC)",
+    "CREATE INDEX ix_escrows_payee_vpa_created_at ON escrows (payee_vpa, created_at DESC)",
+    f"CREATE INDEX ix_escrows_payer_id_active ON escrows (payer_id, status) WHERE {ACTIVE}",
+    f"CREATE INDEX ix_escrows_payee_id_active ON escrows (payee_id, status) WHERE {ACTIVE}",
+    "CREATE INDEX ix_escrows_razorpay_payment_id ON escrows (razorpay_payment_id) WHERE razorpay_payment_id IS NOT NULL",
+    "CREATE INDEX ix_confirmations_escrow_id ON confirmations (escrow_id)",
+    "CREATE INDEX ix_payment_logs_escrow_id ON payment_logs (escrow_id)",
+]
+
+# The merchant user (uid 1) owns a large slice of escrows, like our biggest accounts
+QUERIES = {
+    "list_escrows (payer OR payee_vpa)": """
+        SELECT * FROM escrows
+        WHERE payer_id = %(user_id)s OR payee_vpa = %(vpa)s
+        ORDER BY created_at DESC
+    """,
+    "dashboard volume/count": """
+        SELECT sum(amount), count(id) FROM escrows
+        WHERE payer_id = %(user_id)s OR payee_id = %(user_id)s
+    """,
+    "dashboard active count": f"""
+        SELECT count(id) FROM escrows
+        WHERE (payer_id = %(user_id)s OR payee_id = %(user_id)s) AND {ACTIVE}
+    """,
+    "history (30 days)": """
+        SELECT date_trunc('day', created_at) AS date, sum(amount), count(id)
+        FROM escrows
+        WHERE (payer_id = %(user_id)s OR payee_id = %(user_id)s)
+          AND created_at >= now() - interval '30 days'
+        GROUP BY 1 ORDER BY 1
+    """,
+    "status distribution": """
+        SELECT status, count(id) FROM escrows
+        WHERE payer_id = %(user_id)s OR payee_id = %(user_id)s
+        GROUP BY status
+    """,
+    "refund lookup by payment id": """
+        SELECT * FROM escrows WHERE razorpay_payment_id = %(payment_id)s
+    """,
+    "confirmations for escrow": """
+        SELECT * FROM confirmations WHERE escrow_id = %(escrow_id)s
+    """,
+    "payment logs for escrow": """
+        SELECT * FROM payment_logs WHERE escrow_id = %(escrow_id)s
+    """,
+}
+
+
+def connect():
+    url = settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    conn = psycopg2.connect(url)
+    conn.autocommit = True
+    return conn
+
+
+def seed(cur, escrows: int, users: int):
+    print(f"Seeding {SCHEMA}: {users} users, {escrows} escrows...")
+    started = time.time()
+
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path TO {SCHEMA}")
+
+    cur.execute("""
+        CREATE TABLE escrows (
+            id uuid PRIMARY KEY,
+            payer_id uuid NOT NULL,
+            payee_id uuid,
+            payee_vpa varchar(100) NOT NULL,
+            amount integer NOT NULL,
+            currency varchar(3) DEFAULT 'INR',
+            status varchar(20) NOT NULL,
+            escrow_code varchar(6) NOT NULL,
+            razorpay_payment_id varchar(100),
+            description text,
+            created_at timestamptz NOT NULL
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE confirmations (
+            id uuid PRIMARY KEY,
+            escrow_id uuid NOT NULL,
+            user_id uuid,
+            role varchar(20) NOT NULL,
+            confirmed_at timestamptz DEFAULT now()
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE payment_logs (
+            id uuid PRIMARY KEY,
+            escrow_id uuid NOT NULL,
+            event_type varchar(50) NOT NULL,
+            event_status varchar(50) NOT NULL,
+            razorpay_id varchar(100),
+            amount integer NOT NULL,
+            created_at timestamptz DEFAULT now()
+        )
+    """)
+
+    # Deterministic user ids so the queries can target a known user
+    cur.execute("""
+        CREATE FUNCTION bench_uid(n integer) RETURNS uuid
+        LANGUAGE sql IMMUTABLE AS $$ SELECT md5('user' || n)::uuid $$
+    """)
+
+    cur.execute("""
+        INSERT INTO escrows
+        SELECT
+            md5('escrow' || g)::uuid,
+            bench_uid(CASE WHEN random() < 0.02 THEN 1 ELSE 2 + (random() * (%(users)s - 2))::int END),
+            CASE WHEN random() < 0.7 THEN bench_uid(2 + (random() * (%(users)s - 2))::int) END,
+            'user' || (2 + (random() * (%(users)s - 2))::int) || '@upi',
+            (100 + random() * 1000000)::int,
+            'INR',
+            (ARRAY['INITIATED','HELD','RELEASED','RELEASED','RELEASED','REFUNDED','DISPUTED','EXPIRED'])[1 + (random() * 7)::int],
+            upper(substr(md5(g::text), 1, 6)),
+            CASE WHEN random() < 0.8 THEN 'pay_' || substr(md5('pay' || g), 1, 14) END,
+            'Synthetic escrow ' || g,
+            now() - (random() * interval '365 days')
+        FROM generate_series(1, %(escrows)s) AS g
+    """, {"escrows": escrows, "users": users})
+
+    cur.execute("""
+        INSERT INTO confirmations (id, escrow_id, user_id, role)
+        SELECT md5('conf' || e.id || r)::uuid, e.id, e.payer_id, CASE WHEN r = 1 THEN 'payer' ELSE 'payee' END
+        FROM escrows e, generate_series(1, 2) AS r
+        WHERE e.status IN ('RELEASED', 'HELD')
+    """)
+
+    cur.execute("""
+        INSERT INTO payment_logs (id, escrow_id, event_type, event_status, razorpay_id, amount)
+        SELECT md5('log' || e.id)::uuid, e.id, 'payment', 'success', e.razorpay_payment_id, e.amount
+        FROM escrows e
+        WHERE e.razorpay_payment_id IS NOT NULL
+    """)
+
+    cur.execute("ANALYZE")
+    print(f"Seeded in {time.time() - started:.1f}s")
+
+
+def pick_params(cur):
+    cur.execute("SELECT bench_uid(1)")
+    user_id = cur.fetchone()[0]
+    cur.execute("""
+        SELECT id, razorpay_payment_id FROM escrows
+        WHERE razorpay_payment_id IS NOT NULL AND status = 'RELEASED'
+        LIMIT 1
+    """)
+    escrow_id, payment_id = cur.fetchone()
+    return {
+        "user_id": user_id,
+        "vpa": "user1@upi",
+        "escrow_id": escrow_id,
+        "payment_id": payment_id,
+    }
+
+
+def explain(cur, params, label: str):
+    timings = {}
+    print(f"\n===== {label} =====")
+    for name, sql in QUERIES.items():
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+        plan = cur.fetchone()[0][0]
+        timings[name] = plan["Execution Time"]
+        top = plan["Plan"]
+        print(f"\n-- {name}: {plan['Execution Time']:.2f} ms")
+        print(f"   {top['Node Type']}, shared hit/read: "
+              f"{top.get('Shared Hit Blocks', 0)}/{top.get('Shared Read Blocks', 0)}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escrows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    conn = connect()
+    cur = conn.cursor()
+
+    try:
+        seed(cur, args.escrows, args.users)
+        params = pick_params(cur)
+
+        before = explain(cur, params, "BEFORE indexes")
+
+        print("\nCreating indexes...")
+        started = time.time()
+        for ddl in INDEXES:
+            cur.execute(ddl)
+        cur.execute("ANALYZE")
+        print(f"Indexes created in {time.time() - started:.1f}s")
+
+        after = explain(cur, params, "AFTER indexes")
+
+        print("\n===== Summary (ms) =====")
+        print(f"{'query':<40} {'before':>10} {'after':>10} {'speedup':>9}")
+        for name in QUERIES:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            print(f"{name:<40} {before[name]:>10.2f} {after[name]:>10.2f} {speedup:>8.1f}x")
+    finally:
+        if not args.keep:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+import asyncio
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.hashing import password_hasher
+from app.core.user_cache import user_cache
+from app.services.registry import services
+from app.services.webhook_queue import webhook_workers, webhook_dedup
+from app.services.chain_queue import chain_worker
+from app.services.anchor_batcher import anchor_batcher
+from app.services.receipt_tracker import receipt_tracker
+from app.services.escrow_code_sweeper import escrow_code_sweeper
+from app.services.outbox import outbox_dispatcher
+from app.services.websocket_manager import manager
+from app.services.websocket_backplane import create_backplane
+from app.services.websocket_replay import create_replay_buffer
 from app.api.v1.api import api_router
 
 # Create tables on startup
@@ -20,9 +33,46 @@ async def lifespan(app: FastAPI):
         # Don't crash the app, just log the error
         import traceback
         traceback.print_exc()
+    
+    # Build shared service clients once (Web3 provider, Razorpay, Setu)
+    await asyncio.to_thread(services.init)
+    print("✓ Services initialized")
+    
+    chain_worker.start()
+    if services.blockchain.enabled:
+        receipt_tracker.start()
+    if settings.BLOCKCHAIN_ANCHOR_MODE == "batch":
+        anchor_batcher.start()
+    webhook_workers.start()
+    escrow_code_sweeper.start()
+    outbox_dispatcher.start()
+    await manager.start(
+        create_backplane(
+            settings.WEBSOCKET_BACKPLANE,
+            settings.REDIS_URL,
+            settings.WEBSOCKET_BACKPLANE_CHANNEL
+        ),
+        create_replay_buffer(
+            settings.WEBSOCKET_BACKPLANE,
+            settings.REDIS_URL,
+            f"{settings.WEBSOCKET_BACKPLANE_CHANNEL}:replay",
+            size=settings.WEBSOCKET_REPLAY_BUFFER_SIZE,
+            ttl=settings.WEBSOCKET_REPLAY_TTL_SECONDS,
+            max_streams=settings.WEBSOCKET_REPLAY_MAX_STREAMS
+        )
+    )
     yield
-    # Shutdown
-    pass
+    # Shutdown (anchor handlers wait on the batcher and chain worker, so
+    # those drain first and the dispatcher only cancels what's left)
+    await anchor_batcher.stop()
+    await chain_worker.stop()
+    await outbox_dispatcher.stop()
+    await manager.stop()
+    await webhook_workers.stop()
+    await escrow_code_sweeper.stop()
+    await receipt_tracker.stop()
+    await services.shutdown()
+    password_hasher.shutdown()
 
 app = FastAPI(
     title="TrustPay API",
@@ -56,10 +106,28 @@ async def root():
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.get("/metrics")
+async def metrics():
+    """In-process pool and cache metrics for this worker"""
+    return {
+        "password_hasher": password_hasher.stats(),
+        "user_cache": user_cache.stats(),
+        "webhook_workers": webhook_workers.stats(),
+        "webhook_dedup": webhook_dedup.stats(),
+        "chain_worker": chain_worker.stats(),
+        "nonces": services.blockchain.nonces.stats(),
+        "anchor_batcher": anchor_batcher.stats(),
+        "receipt_tracker": receipt_tracker.stats(),
+        "escrow_code_sweeper": escrow_code_sweeper.stats(),
+        "outbox": outbox_dispatcher.stats(),
+        "websockets": manager.stats()
+    }
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        ws_per_message_deflate=settings.WEBSOCKET_PER_MESSAGE_DEFLATE
     )
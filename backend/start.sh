@@ -17,4 +17,4 @@ echo "Migrations completed successfully!"
 echo "================================"
 echo "Starting server on port $PORT..."
 echo "================================"
-exec uvicorn main:app --host 0.0.0.0 --port $PORT
+exec uvicorn main:app --host 0.0.0.0 --port $PORT --ws-per-message-deflate ${WEBSOCKET_PER_MESSAGE_DEFLATE:-true}
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.services.anchor_batcher import AnchorBatcher
+from app.services.registry import services
+
+
+class FakeBlockchain:
+    enabled = True
+
+
+@pytest.fixture
+def batcher(monkeypatch):
+    monkeypatch.setitem(services._instances, "blockchain", FakeBlockchain())
+    batcher = AnchorBatcher(window_seconds=3600, max_batch_size=10)
+    batcher.sent = []
+
+    async def anchor_batch(events):
+        batcher.sent.append([event["escrow_id"] for event in events])
+        return batcher.send_ok
+
+    batcher.send_ok = True
+    batcher._anchor_batch = anchor_batch
+    return batcher
+
+
+async def test_anchor_refused_when_not_running(batcher):
+    with pytest.raises(RuntimeError):
+        await batcher.anchor("escrow-1", "HELD", 100, "INR")
+    assert batcher.stats()["pending"] == 0
+
+
+async def test_anchor_waits_for_its_batch(batcher):
+    batcher.start()
+    waiter = asyncio.create_task(batcher.anchor("escrow-1", "HELD", 100, "INR"))
+    await asyncio.sleep(0)
+
+    assert await batcher.flush()
+    await waiter
+
+    assert batcher.sent == [["escrow-1"]]
+    await batcher.stop()
+
+
+async def test_failed_batch_fails_waiters_and_keeps_added_events(batcher):
+    batcher.start()
+    batcher.send_ok = False
+    batcher.add("escrow-1", "HELD", 100, "INR")
+    waiter = asyncio.create_task(batcher.anchor("escrow-2", "HELD", 100, "INR"))
+    await asyncio.sleep(0)
+
+    assert not await batcher.flush()
+    with pytest.raises(RuntimeError):
+        await waiter
+    assert batcher.stats()["pending"] == 1
+
+    batcher.send_ok = True
+    await batcher.stop()
+    assert batcher.sent[-1] == ["escrow-1"]
+
+
+async def test_cancelled_waiter_is_not_anchored(batcher):
+    batcher.start()
+    waiter = asyncio.create_task(batcher.anchor("escrow-1", "HELD", 100, "INR"))
+    batcher.add("escrow-2", "HELD", 100, "INR")
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+
+    await batcher.stop()
+
+    assert batcher.sent == [["escrow-2"]]
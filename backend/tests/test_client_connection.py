@@ -0,0 +1,74 @@
+import asyncio
+
+from app.services.websocket_manager import SLOW_CONSUMER_CLOSE_CODE, ClientConnection
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+
+def make_connection(max_queue=10):
+    websocket = FakeWebSocket()
+    return ClientConnection(websocket, "user-1", max_queue=max_queue, send_timeout=1.0), websocket
+
+
+async def test_full_queue_drops_slow_consumer():
+    connection, websocket = make_connection(max_queue=2)
+
+    assert connection.send("a") and connection.send("b")
+    assert connection.send("c") is False
+    await asyncio.sleep(0)
+
+    assert connection.closed
+    assert websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert connection.send("d") is False
+    assert connection.queued == 0
+
+
+async def test_held_messages_count_toward_queue():
+    connection, _ = make_connection(max_queue=2)
+    connection.hold(["escrow:1"])
+
+    assert connection.send("live-1", stream="escrow:1")
+    assert connection.send("live-2", stream="escrow:1")
+    assert connection.queued == 2
+    assert connection.send("live-3", stream="escrow:1") is False
+    assert connection.closed
+
+
+async def test_release_queues_held_messages_after_replay():
+    connection, websocket = make_connection()
+    connection.hold(["escrow:1"])
+
+    connection.send("live-1", stream="escrow:1")
+    connection.send("other", stream="escrow:2")
+    connection.send("replay-1")
+    connection.send("replay-2")
+    connection.release(["escrow:1"])
+    connection.send("live-2", stream="escrow:1")
+
+    connection.start()
+    await asyncio.sleep(0.01)
+    connection.close()
+
+    assert websocket.sent == ["other", "replay-1", "replay-2", "live-1", "live-2"]
+    assert connection.sent == 5
+
+
+async def test_writer_encodes_dict_messages():
+    connection, websocket = make_connection()
+    connection.start()
+
+    connection.send({"type": "ping"})
+    await asyncio.sleep(0.01)
+    connection.close()
+
+    assert websocket.sent == ['{"type":"ping"}']
@@ -0,0 +1,144 @@
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.escrow import Escrow, EscrowStatus, ESCROW_TRANSITIONS
+from app.models.outbox_event import OutboxEvent, OutboxEventType
+from app.models.payment_log import PaymentLog
+from app.services.escrow_service import EscrowConflictError, EscrowService, EscrowTransitionError
+
+
+class FakeResult:
+    def __init__(self, row):
+        self._row = row
+
+    def one_or_none(self):
+        return self._row
+
+
+class FakeSession:
+    """Records what EscrowService writes; the CAS UPDATE matches unless `stale`"""
+
+    def __init__(self, escrow, stale=False):
+        self.escrow = escrow
+        self.stale = stale
+        self.added = []
+        self.statements = []
+        self.commits = 0
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+    async def scalars(self, stmt):
+        self.statements.append(stmt)
+        return FakeResult(None if self.stale else self.escrow)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        pass
+
+    def outbox(self, event_type):
+        return [obj for obj in self.added if isinstance(obj, OutboxEvent) and obj.event_type == event_type]
+
+
+def make_escrow(status=EscrowStatus.INITIATED, **values):
+    return Escrow(id=uuid.uuid4(), status=status, version=3, amount=50000, currency="INR", **values)
+
+
+def make_service(db):
+    service = EscrowService(db, blockchain_service=object(), razorpay_service=object())
+    service.stats_rollup.record_status_change = AsyncMock()
+    return service
+
+
+def compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_settled_statuses_are_terminal():
+    assert ESCROW_TRANSITIONS[EscrowStatus.RELEASED] == set()
+    assert ESCROW_TRANSITIONS[EscrowStatus.REFUNDED] == set()
+    assert all(status in ESCROW_TRANSITIONS for status in EscrowStatus)
+
+
+async def test_update_status_is_a_compare_and_swap():
+    escrow = make_escrow()
+    db = FakeSession(escrow)
+    service = make_service(db)
+
+    assert await service.update_status(escrow, EscrowStatus.HELD, razorpay_payment_id="pay_1") is True
+
+    sql = compiled(db.statements[0])
+    assert "escrows.status = " in sql and "escrows.version = " in sql
+    assert "RETURNING" in sql
+    service.stats_rollup.record_status_change.assert_awaited_once_with(
+        escrow, EscrowStatus.INITIATED, EscrowStatus.HELD
+    )
+    assert len(db.outbox(OutboxEventType.NOTIFY)) == 1
+
+
+async def test_update_status_rejects_disallowed_transition():
+    escrow = make_escrow(EscrowStatus.RELEASED)
+    db = FakeSession(escrow)
+
+    with pytest.raises(EscrowTransitionError):
+        await make_service(db).update_status(escrow, EscrowStatus.HELD)
+    assert db.statements == []
+
+
+async def test_update_status_conflict_when_row_changed():
+    escrow = make_escrow()
+    db = FakeSession(escrow, stale=True)
+    service = make_service(db)
+
+    with pytest.raises(EscrowConflictError):
+        await service.update_status(escrow, EscrowStatus.HELD)
+    service.stats_rollup.record_status_change.assert_not_awaited()
+    assert db.outbox(OutboxEventType.NOTIFY) == []
+
+
+async def test_update_status_same_status_only_applies_values():
+    escrow = make_escrow(EscrowStatus.HELD)
+    db = FakeSession(escrow)
+    service = make_service(db)
+
+    assert await service.update_status(escrow, EscrowStatus.HELD, last_payment_error=None) is False
+    assert len(db.statements) == 1
+    service.stats_rollup.record_status_change.assert_not_awaited()
+    assert db.outbox(OutboxEventType.NOTIFY) == []
+
+
+async def test_payment_after_unpaid_cancel_is_refunded():
+    escrow = make_escrow(EscrowStatus.REFUNDED)
+    db = FakeSession(escrow)
+    service = make_service(db)
+    service.get_escrow = AsyncMock(return_value=escrow)
+
+    result = await service.handle_payment_success(escrow.id, "pay_late", "order_1")
+
+    assert result is escrow
+    assert db.commits == 1
+    [refund] = db.outbox(OutboxEventType.REFUND)
+    assert refund.payload["payment_id"] == "pay_late"
+    assert refund.payload["amount"] is None
+    assert any(isinstance(obj, PaymentLog) and obj.razorpay_id == "pay_late" for obj in db.added)
+    assert db.outbox(OutboxEventType.ANCHOR) == []
+
+
+async def test_payment_conflict_is_retried_not_refunded():
+    escrow = make_escrow()
+    db = FakeSession(escrow, stale=True)
+    service = make_service(db)
+    service.get_escrow = AsyncMock(return_value=escrow)
+
+    with pytest.raises(EscrowConflictError):
+        await service.handle_payment_success(escrow.id, "pay_1", "order_1")
+    assert db.outbox(OutboxEventType.REFUND) == []
+    assert db.commits == 0
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from eth_utils import keccak
+
+from app.core.merkle import LEAF_PREFIX, NODE_PREFIX, build_tree, get_proof, hash_event, verify_proof
+
+
+def make_leaves(count):
+    return [hash_event({"escrow_id": f"escrow-{i}", "event": "HELD", "amount": 100 * i}) for i in range(count)]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 4, 5, 7, 8, 9, 33])
+def test_every_leaf_proves_against_root(count):
+    leaves = make_leaves(count)
+    levels = build_tree(leaves)
+    root = levels[-1][0]
+
+    for index, leaf in enumerate(leaves):
+        assert verify_proof(leaf, get_proof(levels, index), root)
+
+
+def test_proof_rejects_other_leaf_and_root():
+    leaves = make_leaves(6)
+    levels = build_tree(leaves)
+    root = levels[-1][0]
+    proof = get_proof(levels, 2)
+
+    assert not verify_proof(leaves[3], proof, root)
+    assert not verify_proof(leaves[2], proof, build_tree(make_leaves(5))[-1][0])
+
+
+def test_single_leaf_is_its_own_root():
+    [leaf] = make_leaves(1)
+    levels = build_tree([leaf])
+
+    assert levels == [[leaf]]
+    assert get_proof(levels, 0) == []
+
+
+def test_empty_tree_is_rejected():
+    with pytest.raises(ValueError):
+        build_tree([])
+
+
+def test_leaf_hash_is_canonical_and_prefixed():
+    event = {"b": 2, "a": 1}
+
+    assert hash_event(event) == hash_event({"a": 1, "b": 2})
+    assert hash_event(event) == keccak(LEAF_PREFIX + json.dumps(event, sort_keys=True, separators=(",", ":")).encode())
+
+
+def test_internal_nodes_are_prefixed_and_order_independent():
+    left, right = make_leaves(2)
+    [_, [root]] = build_tree([left, right])
+
+    assert root == build_tree([right, left])[-1][0]
+    assert root == keccak(NODE_PREFIX + min(left, right) + max(left, right))
+    assert root != keccak(min(left, right) + max(left, right))
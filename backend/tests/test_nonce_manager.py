@@ -0,0 +1,133 @@
+from app.services.nonce_manager import NonceManager
+
+
+class FakeChain:
+    """Pending nonce as the node reports it, plus the gaps filled so far"""
+
+    def __init__(self, pending=0):
+        self.pending = pending
+        self.filled = []
+
+    async def fetch(self):
+        return self.pending
+
+    async def fill_gap(self, nonce):
+        self.filled.append(nonce)
+
+
+def make_manager(chain):
+    return NonceManager(chain.fetch, fill_gap=chain.fill_gap, resync_interval=3600)
+
+
+async def test_allocates_sequentially_after_one_fetch():
+    chain = FakeChain(pending=5)
+    nonces = make_manager(chain)
+
+    assert [await nonces.allocate() for _ in range(3)] == [5, 6, 7]
+    assert nonces.resyncs == 1
+
+
+async def test_released_nonce_is_reused_first():
+    chain = FakeChain(pending=0)
+    nonces = make_manager(chain)
+    first, second = await nonces.allocate(), await nonces.allocate()
+    nonces.mark_sent(second)
+
+    nonces.release(first)
+
+    assert await nonces.allocate() == first
+    assert await nonces.allocate() == 2
+    assert nonces.reused == 1
+
+
+async def test_release_after_mark_sent_is_ignored():
+    nonces = make_manager(FakeChain(pending=0))
+    nonce = await nonces.allocate()
+    nonces.mark_sent(nonce)
+
+    nonces.release(nonce)
+
+    assert await nonces.allocate() == 1
+
+
+async def test_unknown_nonce_is_never_reused():
+    chain = FakeChain(pending=0)
+    nonces = make_manager(chain)
+    nonce = await nonces.allocate()
+
+    nonces.mark_unknown(nonce)
+
+    assert await nonces.allocate() == 1
+    assert nonces.stats()["unknown"] == 1
+
+
+async def test_resync_skips_nonces_used_elsewhere():
+    chain = FakeChain(pending=0)
+    nonces = make_manager(chain)
+    released = await nonces.allocate()
+    nonces.release(released)
+
+    chain.pending = 10
+    await nonces.resync()
+
+    assert await nonces.allocate() == 10
+
+
+async def test_resync_keeps_local_count_when_chain_lags():
+    chain = FakeChain(pending=0)
+    nonces = make_manager(chain)
+    for _ in range(3):
+        nonces.mark_sent(await nonces.allocate())
+
+    await nonces.resync()
+
+    assert await nonces.allocate() == 3
+
+
+async def test_check_gaps_fills_stuck_unknown_nonce():
+    chain = FakeChain(pending=0)
+    nonces = make_manager(chain)
+    lost = await nonces.allocate()
+    nonces.mark_unknown(lost)
+    nonces.mark_sent(await nonces.allocate())
+
+    await nonces.check_gaps()
+
+    assert chain.filled == [lost]
+    assert nonces.gaps_filled == 1
+    assert nonces.stats()["unknown"] == 0
+
+
+async def test_check_gaps_fills_released_nonce_blocking_later_sends():
+    chain = FakeChain(pending=0)
+    nonces = make_manager(chain)
+    released = await nonces.allocate()
+    nonces.mark_sent(await nonces.allocate())
+    nonces.release(released)
+
+    await nonces.check_gaps()
+
+    assert chain.filled == [released]
+    assert await nonces.allocate() == 2
+
+
+async def test_check_gaps_leaves_trailing_hole_alone():
+    chain = FakeChain(pending=0)
+    nonces = make_manager(chain)
+    nonces.mark_sent(await nonces.allocate())
+    nonces.mark_unknown(await nonces.allocate())
+    chain.pending = 1
+
+    await nonces.check_gaps()
+
+    assert chain.filled == []
+
+
+async def test_check_gaps_without_holes_does_not_fetch():
+    chain = FakeChain(pending=0)
+    nonces = make_manager(chain)
+    nonces.mark_sent(await nonces.allocate())
+
+    await nonces.check_gaps()
+
+    assert nonces.resyncs == 1
@@ -0,0 +1,124 @@
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.outbox_event import OutboxEvent, OutboxEventStatus, OutboxEventType
+from app.services import outbox
+from app.services.outbox import OutboxDispatcher
+
+
+class FakeSession:
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        self.log.append(stmt)
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    log = []
+    monkeypatch.setattr(outbox, "AsyncSessionLocal", lambda: FakeSession(log))
+    return log
+
+
+def params(stmt):
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+def make_events(count, attempts=1, event_type=OutboxEventType.REFUND):
+    escrow_id = uuid.uuid4()
+    return [
+        OutboxEvent(id=uuid.uuid4(), event_type=event_type, escrow_id=escrow_id, payload={"n": i}, attempts=attempts)
+        for i in range(count)
+    ]
+
+
+def make_dispatcher(handler, max_attempts=3):
+    dispatcher = OutboxDispatcher(max_attempts=max_attempts)
+    dispatcher.register_handler(OutboxEventType.REFUND, handler, concurrency=4)
+    return dispatcher
+
+
+async def test_group_is_delivered_in_order_and_acknowledged(statements):
+    seen = []
+
+    async def handler(event):
+        seen.append(event.payload["n"])
+
+    events = make_events(3)
+    dispatcher = make_dispatcher(handler)
+    dispatcher._claimed[OutboxEventType.REFUND] = 3
+
+    await dispatcher._deliver_group(events)
+
+    assert seen == [0, 1, 2]
+    [ack] = statements
+    assert ack.is_delete
+    assert set(params(ack)["id_1"]) == {event.id for event in events}
+    assert dispatcher.delivered[OutboxEventType.REFUND] == 3
+    assert dispatcher._claimed[OutboxEventType.REFUND] == 0
+
+
+async def test_group_stops_at_failure_and_requeues_the_rest(statements):
+    seen = []
+
+    async def handler(event):
+        seen.append(event.payload["n"])
+        if event.payload["n"] == 1:
+            raise RuntimeError("gateway down")
+
+    events = make_events(4)
+    dispatcher = make_dispatcher(handler)
+    dispatcher._claimed[OutboxEventType.REFUND] = 4
+
+    await dispatcher._deliver_group(events)
+
+    assert seen == [0, 1]
+    retry, requeue, ack = statements
+    assert params(retry)["status"] == OutboxEventStatus.PENDING
+    assert params(retry)["last_error"] == "gateway down"
+    assert params(retry)["available_at"] is not None
+    assert set(params(requeue)["id_1"]) == {events[2].id, events[3].id}
+    assert params(requeue)["status"] == OutboxEventStatus.PENDING
+    assert "attempts=(outbox_events.attempts -" in str(requeue.compile(dialect=postgresql.dialect()))
+    assert ack.is_delete and params(ack)["id_1"] == [events[0].id]
+    assert dispatcher.failed[OutboxEventType.REFUND] == 1
+    assert dispatcher._claimed[OutboxEventType.REFUND] == 0
+
+
+async def test_last_attempt_is_dead_lettered(statements):
+    async def handler(event):
+        raise RuntimeError("still down")
+
+    [event] = make_events(1, attempts=3)
+    dispatcher = make_dispatcher(handler, max_attempts=3)
+    dispatcher._claimed[OutboxEventType.REFUND] = 1
+
+    await dispatcher._deliver_group([event])
+
+    [dead] = statements
+    assert params(dead)["status"] == OutboxEventStatus.DEAD
+    assert dispatcher.dead_lettered == 1
+
+
+def test_free_slots_respect_type_concurrency():
+    async def handler(event):
+        pass
+
+    dispatcher = OutboxDispatcher(batch_size=10)
+    dispatcher.register_handler(OutboxEventType.REFUND, handler, concurrency=2)
+    dispatcher.register_handler(OutboxEventType.NOTIFY, handler, concurrency=50)
+    dispatcher._claimed[OutboxEventType.REFUND] = 2
+
+    assert dispatcher._free_slots() == {OutboxEventType.NOTIFY: 10}
@@ -0,0 +1,54 @@
+from app.services.websocket_replay import RESYNC, ReplayBuffer, _missed
+
+
+def entries(*seqs):
+    return [(seq, f"m{seq}") for seq in seqs]
+
+
+def test_missed_returns_messages_after_last_seq():
+    assert _missed(12, 10, entries(11, 12)) == ["m11", "m12"]
+
+
+def test_missed_up_to_date_client_gets_nothing():
+    assert _missed(12, 12, []) == []
+
+
+def test_missed_unknown_stream_needs_resync():
+    assert _missed(None, 10, []) is RESYNC
+
+
+def test_missed_seq_ahead_of_stream_needs_resync():
+    # Numbers from before a restart or eviction
+    assert _missed(12, 20, []) is RESYNC
+
+
+def test_missed_trimmed_buffer_needs_resync():
+    assert _missed(15, 10, entries(13, 14, 15)) is RESYNC
+    assert _missed(15, 10, []) is RESYNC
+
+
+async def test_buffer_replays_recorded_messages():
+    buffer = ReplayBuffer(size=10)
+    seqs = []
+    for i in range(3):
+        seq = await buffer.next_seq("escrow:1")
+        await buffer.record("escrow:1", seq, f"m{i}")
+        seqs.append(seq)
+
+    missed = await buffer.since({"escrow:1": seqs[0], "escrow:2": 5})
+
+    assert missed == {"escrow:1": ["m1", "m2"], "escrow:2": RESYNC}
+    assert buffer.replayed == 2
+    assert buffer.resyncs == 1
+
+
+async def test_buffer_resyncs_once_messages_are_trimmed():
+    buffer = ReplayBuffer(size=2)
+    seqs = []
+    for i in range(4):
+        seq = await buffer.next_seq("user:1")
+        await buffer.record("user:1", seq, f"m{i}")
+        seqs.append(seq)
+
+    assert (await buffer.since({"user:1": seqs[0]}))["user:1"] is RESYNC
+    assert (await buffer.since({"user:1": seqs[1]}))["user:1"] == ["m2", "m3"]
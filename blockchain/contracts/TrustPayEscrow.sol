@@ -33,6 +33,10 @@ contract TrustPayEscrow {
     // Mappings
     mapping(string => Escrow) public escrows;
     mapping(string => bool) public escrowExists;
+    mapping(bytes32 => uint256) public batchAnchoredAt;  // Merkle root => block timestamp
+    
+    // Backend wallet allowed to anchor batches
+    address public immutable owner;
     
     // Events
     event EscrowCreated(
@@ -63,7 +67,22 @@ contract TrustPayEscrow {
         uint256 timestamp
     );
     
+    event BatchAnchored(
+        bytes32 indexed root,
+        uint256 count,
+        uint256 timestamp
+    );
+    
+    constructor() {
+        owner = msg.sender;
+    }
+    
     // Modifiers
+    modifier onlyOwner() {
+        require(msg.sender == owner, "Not authorized");
+        _;
+    }
+    
     modifier onlyCreator(string memory escrowId) {
         require(escrows[escrowId].creator == msg.sender, "Not authorized");
         _;
@@ -220,4 +239,46 @@ contract TrustPayEscrow {
     ) external view escrowMustExist(escrowId) returns (bool) {
         return escrows[escrowId].metadataHash == metadataHash;
     }
+    
+    /**
+     * @dev Anchor the Merkle root of a batch of escrow events
+     * @param root Merkle root over keccak256(0x00 || canonical event) leaves
+     * @param count Number of events in the batch
+     */
+    function anchorBatch(
+        bytes32 root,
+        uint256 count
+    ) external onlyOwner {
+        require(count > 0, "Empty batch");
+        require(batchAnchoredAt[root] == 0, "Batch already anchored");
+        
+        batchAnchoredAt[root] = block.timestamp;
+        
+        emit BatchAnchored(root, count, block.timestamp);
+    }
+    
+    /**
+     * @dev Verify that an event hash is included in an anchored batch
+     * @param root Anchored Merkle root
+     * @param leaf Event hash, keccak256(0x00 || canonical event)
+     * @param proof Sibling hashes from the leaf up (nodes are keccak256(0x01 || sorted pair))
+     */
+    function verifyInclusion(
+        bytes32 root,
+        bytes32 leaf,
+        bytes32[] calldata proof
+    ) external view returns (bool) {
+        if (batchAnchoredAt[root] == 0) {
+            return false;
+        }
+        
+        bytes32 node = leaf;
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 sibling = proof[i];
+            node = node < sibling
+                ? keccak256(abi.encodePacked(bytes1(0x01), node, sibling))
+                : keccak256(abi.encodePacked(bytes1(0x01), sibling, node));
+        }
+        return node == root;
+    }
 }
@@ -19,11 +19,8 @@ export default function AnalyticsPage() {
     const fetchAnalytics = async () => {
         try {
             setLoading(true);
-            const [statsData, historyData, distributionData] = await Promise.all([
-                apiClient.getAnalyticsStats(),
-                apiClient.getAnalyticsHistory(days),
-                apiClient.getAnalyticsDistribution()
-            ]);
+            const { history: historyData, distribution: distributionData, ...statsData } =
+                await apiClient.getAnalyticsDashboard(days);
 
             setStats(statsData);
             setHistory(historyData);
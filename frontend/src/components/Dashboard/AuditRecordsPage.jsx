@@ -4,7 +4,9 @@ import api from '../../services/api';
 
 export default function AuditRecordsPage() {
   const [escrows, setEscrows] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filter, setFilter] = useState('all'); // all, blockchain, payment
 
   useEffect(() => {
@@ -14,8 +16,9 @@ export default function AuditRecordsPage() {
   const fetchEscrows = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/escrows/');
-      setEscrows(response.data);
+      const page = await api.listEscrows();
+      setEscrows(page.escrows);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error('Failed to fetch escrows:', error);
     } finally {
@@ -23,6 +26,19 @@ export default function AuditRecordsPage() {
     }
   };
 
+  const fetchMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await api.listEscrows({ cursor: nextCursor });
+      setEscrows(prev => [...prev, ...page.escrows]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to fetch more escrows:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const formatDate = (dateString) => {
     if (!dateString) return 'N/A';
     return new Date(dateString).toLocaleString('en-IN', {
@@ -194,12 +210,23 @@ export default function AuditRecordsPage() {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+          <div className="p-4 text-center border-t border-white/10">
+            <button
+              onClick={fetchMore}
+              disabled={loadingMore}
+              className="px-4 py-2 rounded-lg bg-white/5 text-gray-400 hover:bg-white/10 transition disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more records'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Summary Stats */}
       <div className="grid grid-cols-1 md:grid-cols-4 gap-6 mt-8">
         <div className="bg-white/5 backdrop-blur-xl rounded-xl border border-white/10 p-6">
-          <div className="text-gray-400 text-sm mb-2">Total Escrows</div>
+          <div className="text-gray-400 text-sm mb-2">{nextCursor ? 'Loaded Escrows' : 'Total Escrows'}</div>
           <div className="text-3xl font-bold text-white">{escrows.length}</div>
         </div>
         <div className="bg-white/5 backdrop-blur-xl rounded-xl border border-white/10 p-6">
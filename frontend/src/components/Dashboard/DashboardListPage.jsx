@@ -1,11 +1,14 @@
-import { useState, useMemo, useEffect } from 'react';
+import { useState, useEffect } from 'react';
 import apiClient from '../../services/api';
 import EscrowCard from './EscrowCard';
 
 export default function DashboardListPage({ setActivePage, setSelectedEscrowId }) {
   const [activeTab, setActiveTab] = useState('active');
   const [escrows, setEscrows] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
   // Load escrows from API
@@ -13,13 +16,19 @@ export default function DashboardListPage({ setActivePage, setSelectedEscrowId }
     loadEscrows();
   }, []);
 
+  // First page of escrow summaries plus the totals (which cover every escrow,
+  // not just the loaded pages)
   const loadEscrows = async () => {
     try {
       setLoading(true);
       setError(null);
-      const data = await apiClient.listEscrows();
-      console.log('Loaded escrows:', data);
-      setEscrows(data);
+      const [page, dashboardStats] = await Promise.all([
+        apiClient.listEscrows({ summary: true }),
+        apiClient.getAnalyticsStats()
+      ]);
+      setEscrows(page.escrows);
+      setNextCursor(page.nextCursor);
+      setStats(dashboardStats);
     } catch (err) {
       console.error('Failed to load escrows:', err);
       setError(err.message);
@@ -28,24 +37,25 @@ export default function DashboardListPage({ setActivePage, setSelectedEscrowId }
     }
   };
 
-  // Calculate metrics
-  const metrics = useMemo(() => {
-    const totalEscrows = escrows.length;
-    const activeEscrows = escrows.filter(e => e.status === 'HELD' || e.status === 'INITIATED').length;
-    const completedEscrows = escrows.filter(e => e.status === 'RELEASED').length;
-    const disputedEscrows = escrows.filter(e => e.status === 'DISPUTED').length;
-    const totalValue = escrows.reduce((sum, e) => sum + (e.amount / 100), 0); // Convert paise to rupees
-    const activeValue = escrows.filter(e => e.status === 'HELD' || e.status === 'INITIATED').reduce((sum, e) => sum + (e.amount / 100), 0);
-    
-    return {
-      totalEscrows,
-      activeEscrows,
-      completedEscrows,
-      disputedEscrows,
-      totalValue,
-      activeValue
-    };
-  }, [escrows]);
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await apiClient.listEscrows({ summary: true, cursor: nextCursor });
+      setEscrows(prev => [...prev, ...page.escrows]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Failed to load more escrows:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const metrics = {
+    totalEscrows: stats?.total_count ?? 0,
+    activeEscrows: stats?.active_count ?? 0,
+    completedEscrows: stats?.completed_count ?? 0,
+    totalValue: (stats?.total_volume ?? 0) / 100 // Convert paise to rupees
+  };
 
   const filteredEscrows = escrows.filter(escrow => {
     if (activeTab === 'active') {
@@ -157,7 +167,7 @@ export default function DashboardListPage({ setActivePage, setSelectedEscrowId }
                 : 'text-[#888888] hover:text-white'
             }`}
           >
-            Active ({metrics.activeEscrows + metrics.disputedEscrows})
+            Active ({metrics.activeEscrows})
           </button>
           <button
             onClick={() => setActiveTab('completed')}
@@ -187,7 +197,7 @@ export default function DashboardListPage({ setActivePage, setSelectedEscrowId }
               />
             ))}
           </div>
-        ) : (
+        ) : nextCursor ? null : (
           <div className="text-center py-12 text-[#888888]">
             <p>No escrows found in this category.</p>
             <button
@@ -198,6 +208,18 @@ export default function DashboardListPage({ setActivePage, setSelectedEscrowId }
             </button>
           </div>
         )}
+
+        {nextCursor && (
+          <div className="text-center mt-6">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-6 py-2 border border-[#2a2a2a] text-[#888888] hover:text-white hover:border-[#333333] rounded-lg transition-colors disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
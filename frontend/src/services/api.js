@@ -32,6 +32,12 @@ class ApiClient {
 
   // Generic request method
   async request(endpoint, options = {}) {
+    const { data } = await this.requestWithHeaders(endpoint, options);
+    return data;
+  }
+
+  // Request that also returns the response headers (e.g. X-Next-Cursor)
+  async requestWithHeaders(endpoint, options = {}) {
     const url = `${this.baseURL}${endpoint}`;
     const token = this.getToken();
 
@@ -65,7 +71,7 @@ class ApiClient {
         throw new Error(data?.detail || `HTTP error! status: ${response.status}`);
       }
 
-      return data;
+      return { data, headers: response.headers };
     } catch (error) {
       console.error('API Request Error:', error);
       throw error;
@@ -147,8 +153,17 @@ class ApiClient {
     return this.get(`/api/v1/escrows/${escrowId}`);
   }
 
-  async listEscrows() {
-    return this.get('/api/v1/escrows/');
+  // One page of the user's escrows, newest first. Pass the returned
+  // nextCursor to load the following page (null when there are no more).
+  // summary: true uses the compact /escrows/summary projection.
+  async listEscrows({ cursor = null, limit = 50, summary = false } = {}) {
+    const path = summary ? '/api/v1/escrows/summary' : '/api/v1/escrows/';
+    const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    const { data, headers } = await this.requestWithHeaders(
+      `${path}?limit=${limit}${query}`,
+      { method: 'GET' }
+    );
+    return { escrows: data, nextCursor: headers.get('X-Next-Cursor') };
   }
 
   async confirmEscrow(escrowId) {
@@ -185,6 +200,10 @@ class ApiClient {
     return this.get('/api/v1/analytics/distribution');
   }
 
+  async getAnalyticsDashboard(days = 30) {
+    return this.get(`/api/v1/analytics/stats?include=distribution,history&days=${days}`);
+  }
+
   // ============ Health Check ============
 
   async healthCheck() {
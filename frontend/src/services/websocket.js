@@ -6,6 +6,8 @@ class WebSocketService {
     this.reconnectDelay = 3000;
     this.listeners = new Map();
     this.subscriptions = new Set();
+    // Last seq handled per stream ("escrow:<id>" / "user:<id>"), sent back on reconnect
+    this.lastSeqs = new Map();
   }
 
   connect(token) {
@@ -15,7 +17,11 @@ class WebSocketService {
     }
 
     const wsUrl = import.meta.env.VITE_API_URL.replace(/^http/, 'ws');
-    const url = `${wsUrl}/api/v1/ws?token=${token}`;
+    let url = `${wsUrl}/api/v1/ws?token=${token}`;
+    const userSeq = Array.from(this.lastSeqs).find(([stream]) => stream.startsWith('user:'));
+    if (userSeq) {
+      url += `&last_seq=${userSeq[1]}`;
+    }
 
     console.log('Connecting to WebSocket:', wsUrl);
 
@@ -25,10 +31,21 @@ class WebSocketService {
       console.log('WebSocket connected');
       this.reconnectAttempts = 0;
       
-      // Resubscribe to all escrows
-      this.subscriptions.forEach(escrowId => {
-        this.subscribe(escrowId);
-      });
+      // Resubscribe to all escrows in one message; the server replays what we missed
+      if (this.subscriptions.size > 0) {
+        const lastSeqs = {};
+        this.subscriptions.forEach(escrowId => {
+          const seq = this.lastSeqs.get(`escrow:${escrowId}`);
+          if (seq !== undefined) {
+            lastSeqs[escrowId] = seq;
+          }
+        });
+        this.send({
+          type: 'subscribe_many',
+          escrow_ids: Array.from(this.subscriptions),
+          last_seqs: lastSeqs
+        });
+      }
       
       this.emit('connected', {});
     };
@@ -38,6 +55,25 @@ class WebSocketService {
         const message = JSON.parse(event.data);
         console.log('WebSocket message:', message);
         
+        // Replayed messages can also arrive live; handle each seq once
+        if (message.stream && message.seq !== undefined) {
+          const lastSeq = this.lastSeqs.get(message.stream);
+          if (lastSeq !== undefined && message.seq <= lastSeq) {
+            return;
+          }
+          this.lastSeqs.set(message.stream, message.seq);
+          
+          // A skipped seq was lost on the way; listeners refetch that stream
+          if (lastSeq !== undefined && message.seq > lastSeq + 1) {
+            this.emit('resync_required', { type: 'resync_required', streams: [message.stream] });
+          }
+        }
+        
+        // Missed messages are gone; listeners refetch, positions start over
+        if (message.type === 'resync_required') {
+          message.streams.forEach(stream => this.lastSeqs.delete(stream));
+        }
+        
         this.emit(message.type, message);
         
         // Also emit specific escrow updates
@@ -77,6 +113,7 @@ class WebSocketService {
       this.ws = null;
     }
     this.subscriptions.clear();
+    this.lastSeqs.clear();
   }
 
   subscribe(escrowId) {